@@ -0,0 +1,98 @@
+# absence_index.py
+import calendar
+import datetime
+import numpy as np
+
+# Absence types as produced by database.get_employee_absences (plus the ones listed in the README).
+ABSENCE_TYPES = ("SL", "Fe", "uw", "w", "IW", "Kr", "x")
+ABSENCE_BITS = {absence_type: 1 << i for i, absence_type in enumerate(ABSENCE_TYPES)}
+# Unknown absence types still block the day, they just cannot be told apart.
+OTHER_ABSENCE_BIT = 1 << len(ABSENCE_TYPES)
+
+# Ferien (Fe) and Schule (SL) count as workdays towards the target workload.
+WORKDAY_CREDIT_TYPES = ("Fe", "SL")
+
+
+def absence_mask(*absence_types):
+    """Returns the bitmask that selects the given absence types."""
+    mask = 0
+    for absence_type in absence_types:
+        mask |= ABSENCE_BITS.get(absence_type, OTHER_ABSENCE_BIT)
+    return mask
+
+
+class AbsenceIndex:
+    """
+    Per-employee, per-day bitmask of absence types for a planning period.
+
+    The "DD.MM." strings of the absence records are parsed exactly once when the index is
+    built. Afterwards availability and absence-type checks are plain list lookups.
+
+    Days are addressed 1-based in the order of the `dates` passed to the constructor, which
+    matches the day numbers used by the scheduler for a calendar month.
+    """
+
+    def __init__(self, absences, dates):
+        """
+        Args:
+            absences: Dictionary of employee absences (employee_id: [(date_str, type)]).
+            dates: List of datetime.date objects of the planning period.
+        """
+        self.dates = list(dates)
+        self.num_days = len(self.dates)
+        position = {(day.day, day.month): d for d, day in enumerate(self.dates, start=1)}
+        self.masks = {}
+        for e_id, records in absences.items():
+            masks = [0] * (self.num_days + 1)
+            for date_str, absence_type in records:
+                # date_str is in the format "DD.MM." (e.g. "7.2.")
+                parts = date_str.split('.')
+                if len(parts) < 2:
+                    continue
+                try:
+                    d = position.get((int(parts[0]), int(parts[1])))
+                except ValueError:
+                    continue
+                if d is not None:
+                    masks[d] |= ABSENCE_BITS.get(absence_type, OTHER_ABSENCE_BIT)
+            self.masks[e_id] = masks
+
+    @classmethod
+    def for_month(cls, absences, year, month):
+        """Builds the index for all days of a calendar month."""
+        num_days = calendar.monthrange(year, month)[1]
+        return cls(absences, [datetime.date(year, month, d) for d in range(1, num_days + 1)])
+
+    def matrix(self, employee_ids):
+        """Absence bitmasks as an (employees × days) array; day d is in column d - 1."""
+        result = np.zeros((len(employee_ids), self.num_days), dtype=np.int64)
+        for row, e_id in enumerate(employee_ids):
+            masks = self.masks.get(e_id)
+            if masks:
+                result[row] = masks[1:]
+        return result
+
+    def mask(self, e_id, d):
+        """Bitmask of all absence types of an employee on day d."""
+        masks = self.masks.get(e_id)
+        return masks[d] if masks else 0
+
+    def is_absent(self, e_id, d):
+        """True if the employee has any absence on day d."""
+        return self.mask(e_id, d) != 0
+
+    def has_type(self, e_id, d, *absence_types):
+        """True if the employee has one of the given absence types on day d."""
+        return self.mask(e_id, d) & absence_mask(*absence_types) != 0
+
+    def count_days(self, e_id, *absence_types):
+        """Number of days with one of the given absence types."""
+        masks = self.masks.get(e_id)
+        if not masks:
+            return 0
+        wanted = absence_mask(*absence_types)
+        return sum(1 for m in masks if m & wanted)
+
+    def credited_days(self, e_id):
+        """Number of absence days that count as workdays (Fe, SL)."""
+        return self.count_days(e_id, *WORKDAY_CREDIT_TYPES)
@@ -0,0 +1,179 @@
+# alternatives.py
+"""
+Several diverse, high-quality alternative schedules for the solution selector in app.py.
+
+The first alternative is the optimum. The others must differ from it in at least
+min_distance cells (a no-good cut, see distance_row) and are solved in parallel processes,
+each with its own seed and a small seeded perturbation of the assignment costs, so that they
+settle on different schedules of (nearly) the same quality. The perturbation is integral on
+costs scaled by PERTURBATION_SCALE, so CP-SAT, which needs integer costs, can solve it too.
+Alternatives that are too close to a better one are dropped; missing alternatives are then
+added one by one, each cut off from all accepted ones. The three phases share one time limit.
+"""
+import copy
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import model_builder
+import solver_backends
+import warm_start
+
+NUM_ALTERNATIVES = 3
+# Minimum number of cells (employee × day) in which two alternatives differ.
+MIN_DISTANCE = 10
+# The perturbed model has its costs multiplied by PERTURBATION_SCALE and a random integer cost
+# in [0, PERTURBATION) added to each assignment, i.e. less than 0.5 in the original costs. The
+# smallest difference between shift costs is 2, so the perturbation only decides between
+# otherwise equal schedules.
+PERTURBATION_SCALE = 4
+PERTURBATION = 2
+# Share of the time limit for the optimum when there are alternatives to find as well.
+OPTIMUM_SHARE = 0.5
+
+
+class Alternative:
+    """One alternative schedule with its (unperturbed) objective value."""
+
+    def __init__(self, schedule, objective, status, seed=None, backend=None, wall_time=0.0):
+        self.schedule = schedule
+        self.objective = objective
+        self.status = status
+        self.seed = seed
+        self.backend = backend
+        self.wall_time = wall_time
+
+
+def cell_distance(schedule, other):
+    """Number of cells (employee, day) in which two schedules differ."""
+    return sum(1 for cell in set(schedule) | set(other) if schedule.get(cell) != other.get(cell))
+
+
+def distance_row(model, schedule, min_distance):
+    """
+    No-good cut requiring a solution to differ from the schedule in at least min_distance cells.
+
+    An assigned cell changes if its shift column is 0, a free cell changes if any of its columns
+    is 1, so the number of changed cells is sum(x over free cells) - sum(x over assigned shifts)
+    + number of assigned cells.
+
+    Returns:
+        Tuple (cols, vals, lower, upper) for model_builder.append_rows.
+    """
+    current = warm_start.hint_from_schedule(model, schedule)
+    cell_cols = np.concatenate([model.x_index, model.y_index[:, :, None]], axis=2)
+    cell_cols = cell_cols[:, model.day_offset:model.day_offset + model.num_month_days]
+    valid = cell_cols >= 0
+    is_current = valid & (current[np.where(valid, cell_cols, 0)] == 1.0)
+    assigned = is_current.any(axis=2)
+    ones = cell_cols[is_current]
+    zeros = cell_cols[valid & ~assigned[:, :, None]]
+    cols = np.concatenate([zeros, ones])
+    vals = np.concatenate([np.ones(len(zeros)), -np.ones(len(ones))])
+    return cols, vals, float(min_distance - len(ones)), np.inf
+
+
+def perturbed(model, seed):
+    """
+    Copy of the model with the costs scaled by PERTURBATION_SCALE and a seeded random integer
+    cost in [0, PERTURBATION) on every assignment. Integral costs stay integral.
+    """
+    rng = np.random.default_rng(seed)
+    cols = np.concatenate([model.x_index[model.x_index >= 0], model.y_index[model.y_index >= 0]])
+    col_cost = model.col_cost * PERTURBATION_SCALE
+    col_cost[cols] += rng.integers(0, PERTURBATION, len(cols))
+    changed = copy.copy(model)
+    changed.col_cost = col_cost
+    changed.offset = model.offset * PERTURBATION_SCALE
+    return changed
+
+
+def _solve(model, objective_model, backend, options, seed):
+    start = time.time()
+    result = solver_backends.BACKENDS[backend](model, options)
+    if not result.has_solution:
+        return Alternative(None, None, result.status, seed, backend, time.time() - start)
+    objective = float(objective_model.col_cost @ result.col_value + objective_model.offset)
+    return Alternative(model_builder.extract_schedule(model, result.col_value), objective,
+                       result.status, seed, backend, time.time() - start)
+
+
+def _solve_perturbed(args):
+    model, objective_model, backend, options, seed = args
+    options.seed = seed
+    return _solve(perturbed(model, seed), objective_model, backend, options, seed)
+
+
+def generate_alternatives(model, num_alternatives=NUM_ALTERNATIVES, min_distance=MIN_DISTANCE,
+                          backend=None, options=None, workers=None):
+    """
+    Solves the model for up to num_alternatives diverse schedules.
+
+    Args:
+        model: The MatrixModel.
+        num_alternatives: Number of schedules to return.
+        min_distance: Minimum number of differing cells between two alternatives.
+        backend: Name of the solver backend (default: solver_backends.DEFAULT_BACKEND).
+        options: SolverOptions for every solve; a hint is only used for the optimum. Its
+            time_limit bounds the whole call: the optimum gets OPTIMUM_SHARE of it, the
+            parallel round half of the time left and the alternatives added one by one the
+            rest, so time that a phase does not use goes to the later ones.
+        workers: Number of parallel processes (default: num_alternatives - 1).
+
+    Returns:
+        List of Alternative sorted by objective, the optimum first. It is shorter than
+        num_alternatives if no further schedule exists within the time limits.
+    """
+    backend = backend or solver_backends.DEFAULT_BACKEND
+    options = options or solver_backends.SolverOptions()
+    deadline = time.time() + options.time_limit
+
+    def share(fraction):
+        """Options with the fraction of the time left."""
+        phase_options = copy.copy(options)
+        phase_options.time_limit = max(0.0, deadline - time.time()) * fraction
+        return phase_options
+
+    best = _solve(model, model, backend, share(OPTIMUM_SHARE if num_alternatives > 1 else 1.0),
+                  None)
+    if best.schedule is None:
+        return []
+    accepted = [best]
+    if num_alternatives <= 1:
+        return accepted
+
+    # A hint would pull every alternative back to the same schedule.
+    options = copy.copy(options)
+    options.hint = None
+    cut_model = model_builder.append_rows(
+        model, "alternatives", [distance_row(model, best.schedule, min_distance)])
+    round_options = share(0.5)
+    tasks = [(cut_model, model, backend, round_options, seed)
+             for seed in range(1, num_alternatives)]
+    # "spawn" keeps the workers independent of the (threaded) Streamlit process.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers or len(tasks), mp_context=context) as pool:
+        candidates = [c for c in pool.map(_solve_perturbed, tasks) if c.schedule is not None]
+    for candidate in sorted(candidates, key=lambda c: c.objective):
+        if all(cell_distance(candidate.schedule, a.schedule) >= min_distance for a in accepted):
+            accepted.append(candidate)
+        if len(accepted) == num_alternatives:
+            break
+
+    # Fill up with no-good cuts against every accepted alternative, in the time left.
+    while len(accepted) < num_alternatives:
+        if time.time() >= deadline:
+            logging.info("No time left for further alternatives.")
+            break
+        cut_model = model_builder.append_rows(
+            model, "alternatives",
+            [distance_row(model, a.schedule, min_distance) for a in accepted])
+        candidate = _solve(cut_model, model, backend, share(1.0), None)
+        if candidate.schedule is None:
+            logging.info(f"No further alternative found ({candidate.status}).")
+            break
+        accepted.append(candidate)
+    return sorted(accepted, key=lambda a: a.objective)
@@ -0,0 +1,104 @@
+# anytime.py
+"""
+Anytime solving in a background thread.
+
+The solve runs in a worker thread so that the Streamlit script is not blocked. Every improving
+solution the backend reports (see solver_backends.SolverOptions.on_solution) is published as
+an Incumbent, so the UI can show the best schedule so far while the solver keeps improving it,
+and the planner can stop the solve and take the current best at any time.
+
+A thread rather than a process is used because the incumbents are shared with the UI: the
+solvers release the GIL while they search, and the callbacks only copy the solution vector.
+"""
+import threading
+import time
+
+import model_builder
+import solver_backends
+
+
+class Incumbent:
+    """A solution found during the solve: schedule, objective, bound and elapsed seconds."""
+
+    def __init__(self, schedule, objective, bound, elapsed):
+        self.schedule = schedule
+        self.objective = objective
+        self.bound = bound
+        self.elapsed = elapsed
+
+    @property
+    def gap(self):
+        """Relative gap between objective and bound (None if the bound is unknown)."""
+        return solver_backends.SolverResult(solver_backends.FEASIBLE, objective=self.objective,
+                                            bound=self.bound).gap
+
+
+class AnytimeSolve:
+    """
+    Solves a MatrixModel in a background thread and publishes its incumbents.
+
+    Args:
+        model: The MatrixModel.
+        backend: Name of the solver backend. Backends outside
+            solver_backends.STREAMING_BACKENDS only publish their final solution.
+        options: SolverOptions; on_solution and stop are set by this class.
+    """
+
+    def __init__(self, model, backend=None, options=None):
+        self.model = model
+        self.backend = backend or solver_backends.DEFAULT_BACKEND
+        self.options = options or solver_backends.SolverOptions()
+        self.options.on_solution = self._publish
+        self.options.stop = threading.Event()
+        self.incumbents = []
+        self.result = None
+        self.error = None
+        self.start_time = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.start_time = time.time()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            result = solver_backends.BACKENDS[self.backend](self.model, self.options)
+            if result.has_solution:
+                self._publish(result)
+            self.result = result
+        except Exception as e:  # Reported to the UI through self.error.
+            self.error = e
+
+    def _publish(self, result):
+        incumbent = Incumbent(model_builder.extract_schedule(self.model, result.col_value),
+                              result.objective, result.bound, time.time() - self.start_time)
+        with self._lock:
+            best = self.incumbents[-1] if self.incumbents else None
+            if best is None or incumbent.objective < best.objective or (
+                    incumbent.objective == best.objective and incumbent.bound != best.bound):
+                self.incumbents.append(incumbent)
+
+    @property
+    def best(self):
+        """The best incumbent so far, or None."""
+        with self._lock:
+            return self.incumbents[-1] if self.incumbents else None
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def elapsed(self):
+        return time.time() - self.start_time if self.start_time else 0.0
+
+    def stop(self):
+        """Asks the solver to stop; the best solution found so far is kept."""
+        self.options.stop.set()
+
+    def wait(self, timeout=None):
+        """Waits for the solve to end. Returns True if it has ended."""
+        self._thread.join(timeout)
+        return not self.running
@@ -4,10 +4,22 @@ import database
 import utils
 import calendar
 import scheduler
+import solver_backends
+import warm_start
+import repair
+import rules
+import solve_cache
+import validator
+import heuristic
+import batch
+import capacity
+import tuning
 import holidays
 from datetime import date
 import io
 import logging
+import os
+import time
 
 def solution_to_dataframe(solution, employees, year, month):
     """Converts a solution dictionary to a Pandas DataFrame."""
@@ -27,6 +39,219 @@ def solution_to_dataframe(solution, employees, year, month):
         })
     return pd.DataFrame(data)
 
+def solution_label(number):
+    """Label of a solution in the selector, with its objective value if known."""
+    objectives = st.session_state.get("solution_objectives") or []
+    if number <= len(objectives) and objectives[number - 1] is not None:
+        return f"Solution {number} (objective {objectives[number - 1]:.0f})"
+    return f"Solution {number}"
+
+def show_rule_check(schedule, employees, absences, year, month, ch_holidays):
+    """Checks a schedule against all rules (validator.py) and shows the violations."""
+    evaluation = validator.ScheduleValidator(
+        employees, absences, database.get_employee_qualifications(),
+        database.get_employee_workload(), year, month, ch_holidays).evaluate(schedule)
+    hard = evaluation.hard_violations
+    summary = (f"Rule check: {len(hard)} hard violations, "
+               f"{len(evaluation.violations) - len(hard)} soft, objective {evaluation.objective:.0f}.")
+    if hard:
+        st.warning(summary)
+    else:
+        st.info(summary)
+    if evaluation.violations:
+        with st.expander("Rule violations"):
+            names = {emp["id"]: emp["name"] for emp in employees}
+            st.dataframe(pd.DataFrame([{
+                "kind": v.kind,
+                "rule": v.rule,
+                "employee": names.get(v.employee_id, v.employee_id),
+                "day": v.day,
+                "detail": v.detail,
+            } for v in evaluation.violations]))
+
+@st.cache_resource
+def get_solve_cache():
+    """One solve cache per server process, so its hit/miss counters survive reruns."""
+    return solve_cache.SolveCache()
+
+def show_capacity_report(report):
+    """Shows the days the staff cannot cover (capacity.py) before anything is solved."""
+    lines = report.messages()
+    if not lines:
+        return
+    if report.feasible:
+        st.warning(f"Some requirements cannot be met by the available staff "
+                   f"(penalty of at least {report.min_penalty:.0f}).")
+    with st.expander("Staffing shortfalls"):
+        st.text("\n".join(lines))
+
+@st.fragment(run_every=1.0)
+def show_anytime_solve(employees, num_days):
+    """Progress of the background solve: the best schedule so far and a stop button."""
+    job = st.session_state.get("anytime")
+    if job is None:
+        return
+    if job.running and job.backend not in solver_backends.STREAMING_BACKENDS:
+        # Such a backend reports nothing before it ends, so there is nothing to show or stop at.
+        st.metric("Elapsed", f"{job.elapsed:.0f} s")
+        st.info(f"{job.backend} shows no intermediate schedules; the schedule appears when the "
+                f"solve ends. Choose HiGHS or CP-SAT for a live view with a stop button.")
+        return
+    if job.running:
+        best = job.best
+        objective, bound, gap, elapsed = st.columns(4)
+        objective.metric("Objective", f"{best.objective:.0f}" if best else "-")
+        bound.metric("Bound", f"{best.bound:.0f}" if best and best.gap is not None else "-")
+        gap.metric("Gap", f"{best.gap:.1%}" if best and best.gap is not None else "-")
+        elapsed.metric("Elapsed", f"{job.elapsed:.0f} s")
+        if best:
+            names = {emp["id"]: emp["name"] for emp in employees}
+            preview = pd.Series(best.schedule).unstack().reindex(columns=range(1, num_days + 1))
+            st.dataframe(preview.rename(index=names).fillna("x"))
+        else:
+            st.info(f"Searching for a first schedule ({job.backend})...")
+        if not st.button("Stop and use current best", disabled=best is None):
+            return
+        job.stop()
+        job.wait()
+
+    del st.session_state["anytime"]
+    best = job.best
+    if job.error is not None:
+        st.error(f"Error generating schedule: {job.error}")
+    elif best is None:
+        st.error("No feasible solution found. Check staffing levels and constraints.")
+    else:
+        # A solve stopped by hand is not what a rerun would return, so it is not cached.
+        if job.result is not None and not job.options.stop.is_set():
+            get_solve_cache().put(st.session_state.anytime_key, [best.schedule], [best.objective],
+                                  job.result.status, job.backend, job.result.wall_time)
+        st.session_state.solutions = [best.schedule]
+        st.session_state.solution_objectives = [best.objective]
+        if job.result is not None and job.result.has_solution:
+            solution = scheduler.ScheduleSolution.from_result(job.model, job.result)
+            st.session_state.solution_breakdown = solution.objective_breakdown
+        st.session_state.selected_solution_index = 0
+        st.session_state.solution_month = st.session_state.anytime_month
+        st.session_state.pop("repair_month", None)
+        st.session_state.solve_message = (
+            f"Solution found in {best.elapsed:.1f} s"
+            + (f" (gap {best.gap:.1%})." if best.gap else "."))
+        st.rerun(scope="app")
+
+def show_batch_mode(year, month, ch_holidays, backend, solver_settings=None):
+    """Solves the schedules of several wards (one employee sheet each) in parallel."""
+    with st.expander("Batch: several wards"):
+        uploaded_wards = st.file_uploader("Employee sheets, one per ward", type="xlsx",
+                                          accept_multiple_files=True, key="batch_files")
+        time_limit = st.number_input("Time limit per ward (s)", min_value=5, max_value=3600,
+                                     value=int(batch.TIME_LIMIT), key="batch_time_limit")
+        if st.button("Solve all wards", disabled=not uploaded_wards):
+            try:
+                wards = [batch.Ward.from_excel(uploaded) for uploaded in uploaded_wards]
+                with st.spinner(f"Solving {len(wards)} wards..."):
+                    results = batch.solve_wards(wards, year, month, sorted(ch_holidays),
+                                                backend=backend, time_limit=float(time_limit),
+                                                solver_settings=solver_settings)
+                output = io.BytesIO()
+                batch.write_workbooks(results, year, month, output, combined=True)
+                st.session_state.batch_results = (year, month, batch.summary_table(results),
+                                                  output.getvalue())
+            except Exception as e:
+                st.error(f"Error in batch scheduling: {e}")
+                logging.exception("Error in batch scheduling")
+        if "batch_results" in st.session_state:
+            batch_year, batch_month, summary, workbook = st.session_state.batch_results
+            st.dataframe(summary)
+            st.download_button(
+                label="Export all wards to Excel",
+                data=workbook,
+                file_name=f"schedules_{batch_year}-{batch_month:02d}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+
+def show_solver_settings():
+    """Sidebar controls for the solver settings; returns them as {setting: value}."""
+    with st.sidebar.expander("Solver settings"):
+        threads = st.number_input("Threads", min_value=0, max_value=os.cpu_count() or 1,
+                                  value=0,
+                                  help="Threads per solve. 0: the solver's default. CBC always "
+                                       "uses one thread; choose HiGHS or CP-SAT to use more.")
+        rel_gap = st.number_input("Relative gap (%)", min_value=0.0, max_value=100.0, value=0.0,
+                                  help="Stop once the solution is within this gap of the bound. "
+                                       "0: the solver's default.")
+        abs_gap = st.number_input("Absolute gap", min_value=0.0, value=0.0,
+                                  help="Stop once objective - bound is below this value. "
+                                       "0: the solver's default. CBC ignores it.")
+        node_limit = st.number_input("Node limit", min_value=0, value=0,
+                                     help="Maximum branch-and-bound nodes. 0: no limit. CBC and "
+                                          "CP-SAT ignore it.")
+        seed = st.number_input("Random seed", min_value=-1, value=-1,
+                               help="-1: the solver's default.")
+        presolve = st.selectbox("Presolve", ["default", "on", "off"])
+    settings = {}
+    if threads:
+        settings["threads"] = int(threads)
+    if rel_gap:
+        settings["rel_gap"] = rel_gap / 100
+    if abs_gap:
+        settings["abs_gap"] = abs_gap
+    if node_limit:
+        settings["node_limit"] = int(node_limit)
+    if seed >= 0:
+        settings["seed"] = int(seed)
+    if presolve != "default":
+        settings["presolve"] = presolve == "on"
+    return settings
+
+def show_penalty_tuning(employees, year, month, ch_holidays, backend, solver_settings=None):
+    """Re-solves the month with changed penalty weights; the model stays built (tuning.py)."""
+    with st.expander("Penalty tuning"):
+        weights = {}
+        columns = st.columns(3)
+        for i, name in enumerate(rules.PENALTY_NAMES):
+            weights[name] = columns[i % 3].number_input(
+                name, min_value=0, value=int(rules.PENALTIES[name]), key=f"weight_{name}")
+        changed = {name: weight for name, weight in weights.items()
+                   if weight != rules.PENALTIES[name]}
+        time_limit = st.number_input("Time limit (s)", min_value=5, max_value=3600,
+                                     value=tuning.TIME_LIMIT, key="tuning_time_limit")
+        if not st.button("Solve with these weights"):
+            return
+        try:
+            absences = database.get_employee_absences()
+            employee_qualifications = database.get_employee_qualifications()
+            employee_workload = database.get_employee_workload()
+            key = solve_cache.cache_key(employees, absences, employee_qualifications,
+                                        employee_workload, year, month, ch_holidays,
+                                        backend=backend, solver_settings=solver_settings)
+            # The session keeps the model of the month; it is rebuilt when the data changes.
+            if st.session_state.get("tuning_key") != key:
+                if "tuning" in st.session_state:
+                    st.session_state.tuning.close()
+                st.session_state.tuning = tuning.TuningSession(
+                    employees, absences, employee_qualifications, employee_workload, year,
+                    month, sorted(ch_holidays), backend=backend, solver_settings=solver_settings)
+                st.session_state.tuning_key = key
+            with st.spinner("Solving with the changed weights..."):
+                result = st.session_state.tuning.solve(changed, time_limit=float(time_limit))
+        except Exception as e:
+            st.error(f"Error in penalty tuning: {e}")
+            logging.exception("Error in penalty tuning")
+            return
+        if not result.has_solution:
+            st.error("No feasible solution found. Check staffing levels and constraints.")
+            return
+        st.session_state.solutions = [result.schedule]
+        st.session_state.solution_objectives = [result.objective]
+        st.session_state.solution_breakdown = result.breakdown
+        st.session_state.selected_solution_index = 0
+        st.session_state.solution_month = (year, month)
+        st.session_state.pop("repair_month", None)
+        st.session_state.solve_message = (
+            f"Solution with {len(changed)} changed weight(s) found in {result.wall_time:.1f} s.")
+        st.rerun()
+
 def main():
     st.title("Automated Shift Scheduler")
     database.create_tables()
@@ -56,6 +281,38 @@ def main():
         except Exception as e:
             st.error(f"Error retrieving employee data: {e}")
 
+    # --- Sidebar: Solver Selection ---
+    st.sidebar.header("Solver")
+    backend = st.sidebar.selectbox(
+        "Solver backend",
+        list(solver_backends.BACKENDS),
+        index=list(solver_backends.BACKENDS).index(solver_backends.DEFAULT_BACKEND),
+    )
+    num_alternatives = st.sidebar.number_input(
+        "Alternative schedules", min_value=1, max_value=8, value=1,
+        help="Number of diverse schedules to choose from. One schedule is solved in the "
+             "background and shows the best schedule found so far; several are computed in "
+             "parallel and shown once all are solved.",
+    )
+    use_heuristic = st.sidebar.checkbox(
+        "Quick heuristic schedule", value=False,
+        help="Build one schedule in about a second with greedy construction and local search "
+             "instead of solving the model. Good for previews; it may miss the optimum.",
+    )
+    use_cache = st.sidebar.checkbox(
+        "Reuse cached schedules", value=True,
+        help="Return the stored schedules if the month was already solved with the same data.",
+    )
+    cache = get_solve_cache()
+    st.sidebar.caption(f"Solve cache: {cache.hits} hits, {cache.misses} misses, {len(cache)} entries")
+    use_warm_start = st.sidebar.checkbox(
+        "Warm start", value=True,
+        help="Start from the last solution of this month, the saved schedule of this month, "
+             "the end of the previous month's saved schedule, or else a quick heuristic schedule. "
+             "CBC ignores starting solutions, so no warm start is prepared for it.",
+    )
+    solver_settings = show_solver_settings()
+
     # --- Main Area: Date Selection ---
     st.header("2. Select Month and Year")
     today = date.today()
@@ -89,50 +346,134 @@ def main():
             employee_qualifications = database.get_employee_qualifications()
             
             employee_workload = database.get_employee_workload()
-            
-            solution = scheduler.generate_schedule_highs(
-                employees,
-                shifts,
-                absences,
-                employee_qualifications,
-                employee_workload,
-                year,
-                month,
-                ch_holidays
-            )
-            
-            if solution:
-                # Convert HiGHS solution to schedule format
-                schedule = {}
-                col_value = solution.col_value
-                
-                for var_index, var_name in enumerate(scheduler.variable_names):
-                    if len(var_name) == 3 and col_value[var_index] > 0.9:
-                        employee_id, day, shift_code = var_name
-                        day_str = f"{year}-{month:02d}-{int(day):02d}"
-                        schedule[(employee_id, day)] = shift_code
 
-                st.session_state.solutions = [schedule]  # Store as list for compatibility
+            capacity_report = capacity.analyze_capacity(
+                employees, absences, employee_qualifications, employee_workload, year, month,
+                ch_holidays)
+            show_capacity_report(capacity_report)
+
+            cache_key = solve_cache.cache_key(
+                employees, absences, employee_qualifications, employee_workload, year, month,
+                ch_holidays, backend=backend, num_schedules=num_alternatives,
+                solver_settings=solver_settings)
+            cached = get_solve_cache().get(cache_key) if use_cache and not use_heuristic else None
+
+            hint, hint_days = None, None
+            if (use_warm_start and backend in solver_backends.HINT_BACKENDS and cached is None
+                    and not use_heuristic and capacity_report.feasible):
+                if st.session_state.get("solutions") and st.session_state.get("solution_month") == (year, month):
+                    hint = st.session_state.solutions[st.session_state.selected_solution_index]
+                else:
+                    hint = database.get_month_schedule(year, month)
+                    if not hint:
+                        previous = database.get_month_schedule(*warm_start.previous_month(year, month))
+                        hint, hint_days = warm_start.seed_from_previous_month(previous, year, month)
+                if not hint:
+                    hint = heuristic.heuristic_schedule(
+                        employees, absences, employee_qualifications, employee_workload, year,
+                        month, ch_holidays).schedule
+                    hint_days = None
+            
+            st.session_state.pop("solution_breakdown", None)
+            if use_heuristic:
+                result = heuristic.heuristic_schedule(
+                    employees, absences, employee_qualifications, employee_workload, year, month,
+                    ch_holidays)
+                st.session_state.solutions = [result.schedule]
+                st.session_state.solution_objectives = [result.objective]
+                st.session_state.selected_solution_index = 0
+                st.session_state.solution_month = (year, month)
+                st.session_state.pop("repair_month", None)
+                st.session_state.solve_message = (
+                    f"Heuristic schedule found in {result.wall_time:.1f} s "
+                    f"({len(result.hard_violations)} hard rule violations).")
+            elif not capacity_report.feasible:
+                st.error(f"Not enough staff on days {capacity_report.unmeetable_days}: no schedule "
+                         f"can meet the required shifts. Check absences and staffing levels.")
+            elif cached is not None:
+                st.session_state.solutions = cached.schedules
+                st.session_state.solution_objectives = cached.objectives
                 st.session_state.selected_solution_index = 0
-                st.success("Solution found!")
+                st.session_state.solution_month = (year, month)
+                st.session_state.pop("repair_month", None)
+                st.session_state.solve_message = (
+                    f"{len(cached.schedules)} cached solution(s) reused "
+                    f"(originally solved by {cached.backend} in {cached.wall_time:.1f} s).")
+            elif num_alternatives > 1:
+                solve_start = time.time()
+                alternatives = scheduler.generate_schedule_alternatives(
+                    employees,
+                    shifts,
+                    absences,
+                    employee_qualifications,
+                    employee_workload,
+                    year,
+                    month,
+                    ch_holidays,
+                    num_alternatives=num_alternatives,
+                    backend=backend,
+                    solver_settings=solver_settings,
+                    hint=hint,
+                    hint_days=hint_days,
+                )
+                if alternatives:
+                    get_solve_cache().put(
+                        cache_key, [alternative.schedule for alternative in alternatives],
+                        [alternative.objective for alternative in alternatives],
+                        alternatives[0].status, backend, time.time() - solve_start)
+                    st.session_state.solutions = [alternative.schedule for alternative in alternatives]
+                    st.session_state.solution_objectives = [alternative.objective for alternative in alternatives]
+                    st.session_state.selected_solution_index = 0
+                    st.session_state.solution_month = (year, month)
+                    st.session_state.pop("repair_month", None)
+                    st.success(f"{len(alternatives)} solutions found!")
+                else:
+                    st.error("No feasible solution found. Check staffing levels and constraints.")
             else:
-                st.error("No feasible solution found. Check staffing levels and constraints.")
+                # The solve runs in the background; show_anytime_solve shows its progress.
+                previous_solve = st.session_state.get("anytime")
+                if previous_solve is not None:
+                    previous_solve.stop()
+                st.session_state.anytime = scheduler.start_anytime_schedule(
+                    employees,
+                    shifts,
+                    absences,
+                    employee_qualifications,
+                    employee_workload,
+                    year,
+                    month,
+                    ch_holidays,
+                    backend=backend,
+                    solver_settings=solver_settings,
+                    hint=hint,
+                    hint_days=hint_days,
+                )
+                st.session_state.anytime_month = (year, month)
+                st.session_state.anytime_key = cache_key
         except Exception as e:
             st.error(f"Error generating schedule: {str(e)}")
             logging.exception("Detailed error in schedule generation:")
 
+    show_anytime_solve(employees, num_days)
+    show_batch_mode(year, month, ch_holidays, backend, solver_settings)
+    show_penalty_tuning(employees, year, month, ch_holidays, backend, solver_settings)
+
     # --- Solution Selection (Dropdown) ---
     if "solutions" in st.session_state and st.session_state.solutions:
         selected_index = st.selectbox(
             "Select Solution",
             options=range(1, len(st.session_state.solutions) + 1),
             index=st.session_state.selected_solution_index,  # Use stored index
-            format_func=lambda x: f"Solution {x}",  # Display "Solution 1", "Solution 2", etc.
+            format_func=solution_label,  # Display "Solution 1 (objective 1234)", etc.
         )
         # Update the selected index in session state
         st.session_state.selected_solution_index = selected_index -1
 
         # --- Display Selected Solution ---
+        if "repair_message" in st.session_state:
+            st.success(st.session_state.pop("repair_message"))
+        if "solve_message" in st.session_state:
+            st.success(st.session_state.pop("solve_message"))
         selected_solution = st.session_state.solutions[st.session_state.selected_solution_index]
         solution_df = solution_to_dataframe(selected_solution, employees, year, month)
 
@@ -240,6 +581,15 @@ def main():
         # Display the schedule with totals
         st.dataframe(pivot_schedule)
         st.dataframe(daily_totals)
+        checked_absences = absences
+        if st.session_state.get("repair_month") == (year, month):
+            checked_absences = repair.merge_absences(absences, st.session_state.repair_absences)
+        show_rule_check(selected_solution, employees, checked_absences, year, month, ch_holidays)
+        breakdown = st.session_state.get("solution_breakdown")
+        if breakdown and len(st.session_state.solutions) == 1:
+            with st.expander("Objective breakdown"):
+                st.dataframe(pd.Series({name: value for name, value in breakdown.items()
+                                        if abs(value) > 1e-6}, name="objective"))
         
         # Export to Excel with formatting
         output = io.BytesIO()
@@ -277,6 +627,70 @@ def main():
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
 
+        # --- Repair after sickness or manual edits: re-plan only the affected days ---
+        with st.form(key="repair_form"):
+            st.subheader("Repair Schedule")
+            repair_employee = st.selectbox(
+                "Employee", [f"{emp['id']} - {emp['name']}" for emp in employees], key="repair_employee"
+            )
+            first_day, last_day = st.select_slider(
+                "Days", options=list(range(1, num_days + 1)), value=(1, 1), key="repair_days"
+            )
+            repair_code = st.selectbox(
+                "New entry", ["Kr", "x"] + list(rules.SHIFT_CODES) + [rules.BUERO_SHIFT], key="repair_code",
+                help="Kr: sick (the employee is removed from these days), x: day off, "
+                     "or a shift that is fixed for these days.",
+            )
+            if st.form_submit_button("Repair"):
+                employee_id = int(repair_employee.split(" - ")[0])
+                repair_days = range(first_day, last_day + 1)
+                if st.session_state.get("repair_month") != (year, month):
+                    st.session_state.repair_month = (year, month)
+                    st.session_state.repair_absences = {}
+                    st.session_state.repair_locked = {}
+                if repair_code == "Kr":
+                    st.session_state.repair_absences.setdefault(employee_id, []).extend(
+                        (f"{day:02d}.{month:02d}.", "Kr") for day in repair_days)
+                else:
+                    for day in repair_days:
+                        st.session_state.repair_locked[(employee_id, day)] = None if repair_code == "x" else repair_code
+                try:
+                    result = repair.repair_schedule(
+                        employees,
+                        database.get_employee_absences(),
+                        database.get_employee_qualifications(),
+                        database.get_employee_workload(),
+                        year,
+                        month,
+                        ch_holidays,
+                        selected_solution,
+                        new_absences=st.session_state.repair_absences,
+                        locked=st.session_state.repair_locked,
+                    )
+                    if result.has_solution:
+                        st.session_state.solutions[st.session_state.selected_solution_index] = result.schedule
+                        st.session_state.pop("solution_breakdown", None)
+                        if st.session_state.get("solution_objectives"):
+                            st.session_state.solution_objectives[st.session_state.selected_solution_index] = None
+                        st.session_state.repair_message = (
+                            f"Schedule repaired in {result.wall_time:.1f} s: "
+                            f"{len(result.changed_cells)} cells changed ({result.scope}).")
+                        st.rerun()
+                    else:
+                        st.error("No feasible repair found.")
+                except Exception as e:
+                    st.error(f"Error repairing schedule: {e}")
+                    logging.exception("Error repairing schedule")
+
+        # Saved schedules are used to warm-start the next solve of this month and the next month.
+        if st.button("Save Selected Solution as Schedule"):
+            try:
+                database.store_month_schedule(selected_solution, year, month)
+                st.success(f"Schedule for {calendar.month_name[month]} {year} saved.")
+            except Exception as e:
+                st.error(f"Error saving schedule: {e}")
+                logging.exception("Error saving schedule")
+
     # --- Manual Schedule Creation (Keep this, but it should be used *after* automatic generation)---
     with st.form(key="schedule_form"):
         selected_date = st.selectbox("Select Date", dates)
@@ -296,6 +710,9 @@ def main():
                 st.success(
                     f"Shift assigned: {selected_employee_id} on {selected_date} for {selected_shift_id}"
                 )
+                # Re-check the saved schedule of the month with the new assignment.
+                show_rule_check(database.get_month_schedule(year, month), employees,
+                                database.get_employee_absences(), year, month, ch_holidays)
                 #  After a manual add, clear the solutions to avoid confusion
                 if "solutions" in st.session_state:
                     del st.session_state["solutions"]
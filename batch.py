@@ -0,0 +1,407 @@
+# batch.py
+"""
+Batch scheduling of several wards.
+
+Every ward has its own employee sheet (the format utils.read_employee_data reads). The wards
+are independent models, so they are solved concurrently in a process pool, each with its own
+time limit; the solver threads of the machine are shared evenly between the workers. The
+results carry the solver status and the build/solve times per ward and are written to one
+workbook per ward or one combined workbook with a summary sheet.
+
+Usage:
+    python batch.py ward_a.xlsx ward_b.xlsx --month 2025-03 --out schedules
+    python batch.py wards/*.xlsx --month 2025-03 --combined --out schedules.xlsx
+"""
+import argparse
+import calendar
+import logging
+import math
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import holidays
+import pandas as pd
+
+import capacity
+import database
+import heuristic
+import model_builder
+import solver_backends
+import utils
+import warm_start
+from rules import EARLY_SHIFTS, PURE_LATE_SHIFTS, SPLIT_SHIFTS
+
+TIME_LIMIT = 60.0
+# Workbook cell values that are not worked days (see the "Ist" column).
+NOT_WORKED = ("x", "w", "uw")
+QUAL_ORDER = {"Leitung": 0, "HF": 1, "PH": 2, "Ausbildung": 3}
+
+
+class Ward:
+    """
+    Employee data of one ward, in the format scheduler.generate_schedule_highs consumes.
+
+    Args:
+        name: Name of the ward (used for file and sheet names).
+        employees: List of employee dictionaries (id, name, pensum, qualifikation, ...).
+        absences: Dictionary of employee absences (employee_id: [(date_str, type)]).
+        employee_qualifications: Dictionary (employee_id: qualifikation).
+        employee_workload: Dictionary of target workloads (employee_id: target_days).
+    """
+
+    def __init__(self, name, employees, absences, employee_qualifications, employee_workload):
+        self.name = name
+        self.employees = employees
+        self.absences = absences
+        self.employee_qualifications = employee_qualifications
+        self.employee_workload = employee_workload
+
+    @classmethod
+    def from_dataframe(cls, name, df):
+        """
+        Reads a ward from an employee sheet as returned by utils.read_employee_data. Employees
+        are numbered in sheet order unless the sheet has an id column.
+        """
+        df = df.astype(object).where(df.notna(), None)
+        employees = []
+        for number, row in enumerate(df.to_dict("records"), start=1):
+            employee = {col: row.get(col) for col in ("name", "pensum", "diensttage",
+                                                      "qualifikation", "SL", "Fe", "UW", "w")}
+            employee["id"] = int(row["id"]) if row.get("id") is not None else number
+            employees.append(employee)
+        return cls(name, employees, database.parse_absences(employees),
+                   {emp["id"]: emp["qualifikation"] for emp in employees},
+                   {emp["id"]: int(emp["diensttage"] or 0) for emp in employees})
+
+    @classmethod
+    def from_excel(cls, path, name=None):
+        """Reads a ward from an Excel file; the name defaults to the file name."""
+        name = name or os.path.splitext(os.path.basename(str(getattr(path, "name", path))))[0]
+        return cls.from_dataframe(name, utils.read_employee_data(path))
+
+    @property
+    def data(self):
+        """(employees, absences, employee_qualifications, employee_workload)."""
+        return self.employees, self.absences, self.employee_qualifications, self.employee_workload
+
+
+class WardResult:
+    """Outcome of the solve of one ward."""
+
+    def __init__(self, ward, status, schedule=None, objective=None, backend=None, build_time=0.0,
+                 solve_time=0.0, wall_time=0.0, error=None):
+        self.ward = ward
+        self.status = status
+        # {(employee_id, day): shift_code}, or None if no schedule was found.
+        self.schedule = schedule
+        self.objective = objective
+        self.backend = backend
+        # Model build and warm start.
+        self.build_time = build_time
+        self.solve_time = solve_time
+        self.wall_time = wall_time
+        # Message of the exception that ended the solve, if any.
+        self.error = error
+
+    @property
+    def has_solution(self):
+        return self.schedule is not None
+
+
+# ------------------------------------------
+# Solving
+# ------------------------------------------
+def solve_ward(ward, year, month, ch_holidays, backend=None, time_limit=TIME_LIMIT, threads=None,
+               use_warm_start=True, solver_settings=None):
+    """
+    Builds and solves the model of one ward. Errors are reported in the result, so one broken
+    sheet does not stop the batch. A ward that capacity.analyze_capacity proves infeasible is
+    reported as INFEASIBLE without a solve.
+
+    Args:
+        ward: The Ward.
+        year: Year for the schedule.
+        month: Month for the schedule.
+        ch_holidays: List of holidays (as datetime.date objects).
+        backend: Name of the solver backend (default: solver_backends.DEFAULT_BACKEND).
+        time_limit: Time limit of the solve in seconds.
+        threads: Solver threads (None: the threads of solver_settings).
+        use_warm_start: Start the solver from a heuristic schedule (see heuristic.py), if the
+            backend uses hints (solver_backends.HINT_BACKENDS).
+        solver_settings: Solver settings {setting: value} (see solver_backends.solver_options).
+
+    Returns:
+        A WardResult.
+    """
+    backend = backend or solver_backends.DEFAULT_BACKEND
+    start = time.time()
+    try:
+        report = capacity.analyze_capacity(*ward.data, year, month, ch_holidays)
+        if not report.feasible:
+            return WardResult(ward, solver_backends.INFEASIBLE, backend=backend,
+                              wall_time=time.time() - start, error="; ".join(report.messages()))
+        model = model_builder.build_model(*ward.data, year, month, ch_holidays)
+        settings = dict(solver_settings or {})
+        if threads:
+            settings["threads"] = threads
+        options = solver_backends.solver_options(settings, time_limit=time_limit)
+        # The heuristic is only run for backends that use the hint.
+        if use_warm_start and backend in solver_backends.HINT_BACKENDS:
+            options.hint = warm_start.hint_from_schedule(
+                model, heuristic.heuristic_schedule(*ward.data, year, month, ch_holidays).schedule)
+        build_time = time.time() - start
+        result = solver_backends.BACKENDS[backend](model, options)
+    except Exception as e:
+        logging.exception(f"Ward {ward.name}: solve failed")
+        return WardResult(ward, solver_backends.NOT_SOLVED, backend=backend,
+                          wall_time=time.time() - start, error=str(e))
+    schedule = None
+    if result.has_solution:
+        schedule = model_builder.extract_schedule(model, result.col_value)
+    return WardResult(ward, result.status, schedule, result.objective, backend, build_time,
+                      time.time() - start - build_time, time.time() - start)
+
+
+def _solve_ward_task(args):
+    return solve_ward(*args[0], **args[1])
+
+
+def solve_wards(wards, year, month, ch_holidays, backend=None, time_limit=TIME_LIMIT,
+                workers=None, use_warm_start=True, solver_settings=None):
+    """
+    Solves several wards concurrently.
+
+    Args:
+        wards: List of Ward.
+        year, month, ch_holidays, backend, use_warm_start, solver_settings: As for solve_ward.
+            Without threads in solver_settings the cores are shared evenly by the workers.
+        time_limit: Time limit per ward in seconds, or a dictionary {ward name: seconds}
+            (wards without an entry get TIME_LIMIT).
+        workers: Wards solved in parallel (default: one per core, at most one per ward). With
+            one worker the wards are solved one after the other in this process.
+
+    Returns:
+        List of WardResult in the order of wards.
+    """
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, len(wards)))
+    threads = (solver_settings or {}).get("threads") or max(1, cores // workers)
+    tasks = []
+    for ward in wards:
+        limit = time_limit.get(ward.name, TIME_LIMIT) if isinstance(time_limit, dict) else time_limit
+        tasks.append(((ward, year, month, ch_holidays),
+                      {"backend": backend, "time_limit": limit, "threads": threads,
+                       "use_warm_start": use_warm_start, "solver_settings": solver_settings}))
+
+    start = time.time()
+    results = [None] * len(wards)
+    if workers == 1:
+        for i, task in enumerate(tasks):
+            results[i] = _solve_ward_task(task)
+            _log_result(results[i], start)
+        return results
+    # "spawn" keeps the workers independent of the (threaded) Streamlit process.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(_solve_ward_task, task): i for i, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                # The worker process died (e.g. out of memory).
+                logging.exception(f"Ward {wards[i].name}: worker failed")
+                results[i] = WardResult(wards[i], solver_backends.NOT_SOLVED, error=str(e),
+                                        wall_time=time.time() - start)
+            _log_result(results[i], start)
+    return results
+
+
+def _log_result(result, start):
+    objective = f"{result.objective:.0f}" if result.objective is not None else "-"
+    logging.info(f"Ward {result.ward.name}: {result.status}, objective {objective}, "
+                 f"{result.wall_time:.1f} s (batch {time.time() - start:.1f} s)")
+
+
+# ------------------------------------------
+# Reports and workbooks
+# ------------------------------------------
+def summary_table(results):
+    """Status and timing of every ward as a DataFrame."""
+    return pd.DataFrame([{
+        "ward": result.ward.name,
+        "employees": len(result.ward.employees),
+        "status": result.status,
+        "objective": result.objective,
+        "backend": result.backend,
+        "build_time": round(result.build_time, 2),
+        "solve_time": round(result.solve_time, 2),
+        "wall_time": round(result.wall_time, 2),
+        "error": result.error,
+    } for result in results])
+
+
+def schedule_table(ward, schedule, year, month):
+    """
+    The schedule of a ward in the layout of the app's export: one row per employee with its
+    target (Soll) and actual (Ist) workdays, one column per day, absences included.
+
+    Returns:
+        (table, daily_totals) DataFrames; daily_totals holds early/late/split counts per day.
+    """
+    num_days = calendar.monthrange(year, month)[1]
+    dates = [f"{year}-{month:02d}-{day:02d}" for day in range(1, num_days + 1)]
+    cells = {(e_id, day): shift_code for (e_id, day), shift_code in schedule.items()}
+    for e_id, records in ward.absences.items():
+        for day_month, absence_type in records:
+            day, absence_month = int(day_month.split(".")[0]), int(day_month.split(".")[1])
+            if absence_month == month and day <= num_days:
+                cells[(e_id, day)] = absence_type
+
+    rows = []
+    for emp in ward.employees:
+        row = {
+            "qualification": emp.get("qualifikation"),
+            "employee_name": emp.get("name"),
+            "pensum": f"{emp['pensum']}%" if emp.get("pensum") is not None else "100%",
+            "Soll": ward.employee_workload[emp["id"]],
+        }
+        row.update({date: cells.get((emp["id"], day), "x")
+                    for day, date in enumerate(dates, start=1)})
+        row["Ist"] = sum(row[date] not in NOT_WORKED for date in dates)
+        rows.append(row)
+    table = pd.DataFrame(rows, columns=["qualification", "employee_name", "pensum", "Soll", "Ist"]
+                         + dates)
+    table = table.sort_values("qualification", key=lambda quals: quals.map(QUAL_ORDER),
+                              kind="stable")
+    table = table.set_index(["qualification", "employee_name", "pensum"])
+
+    daily_totals = pd.DataFrame(index=pd.Index(["Soll/Ist"], name="Totals"))
+    daily_totals["Soll"] = f"{table['Soll'].sum()}"
+    daily_totals["Ist"] = f"{table['Ist'].sum()}"
+    for date in dates:
+        codes = table[date]
+        daily_totals[date] = (f"{codes.isin(EARLY_SHIFTS - SPLIT_SHIFTS).sum()}/"
+                              f"{codes.isin(PURE_LATE_SHIFTS).sum()}/{codes.isin(SPLIT_SHIFTS).sum()}")
+    return table, daily_totals
+
+
+def _sheet_name(name, used):
+    """A valid, unique Excel sheet name (at most 31 characters, no []:*?/\\)."""
+    base = re.sub(r"[\[\]:*?/\\]", "_", str(name))[:31] or "Ward"
+    sheet, number = base, 1
+    while sheet.lower() in used:
+        number += 1
+        sheet = f"{base[:31 - len(str(number)) - 1]}_{number}"
+    used.add(sheet.lower())
+    return sheet
+
+
+def _write_schedule_sheet(writer, sheet, result, year, month):
+    if not result.has_solution:
+        pd.DataFrame({"status": [result.status], "error": [result.error]}).to_excel(
+            writer, sheet_name=sheet, index=False)
+        return
+    table, daily_totals = schedule_table(result.ward, result.schedule, year, month)
+    table.to_excel(writer, sheet_name=sheet)
+    daily_totals.to_excel(writer, sheet_name=sheet, startrow=len(table) + 2)
+    worksheet = writer.sheets[sheet]
+    worksheet.set_column("A:A", 12)  # Qualification
+    worksheet.set_column("B:B", 20)  # Name
+    worksheet.set_column("C:C", 8)   # Pensum
+    worksheet.set_column(3, 4 + len(table.columns), 6)  # Soll, Ist, dates
+
+
+def write_workbooks(results, year, month, out, combined=False):
+    """
+    Writes the schedules of a batch as Excel workbooks.
+
+    Args:
+        results: List of WardResult.
+        year: Year of the schedules.
+        month: Month of the schedules.
+        out: Output directory, or with combined the workbook path or a file-like object.
+        combined: One workbook with a Summary sheet and one sheet per ward instead of one
+            workbook per ward.
+
+    Returns:
+        List of the written paths (or [out] for a file-like object).
+    """
+    if combined:
+        used = {"summary"}
+        with pd.ExcelWriter(out, engine="xlsxwriter") as writer:
+            summary_table(results).to_excel(writer, sheet_name="Summary", index=False)
+            for result in results:
+                _write_schedule_sheet(writer, _sheet_name(result.ward.name, used), result, year,
+                                      month)
+        return [out]
+    os.makedirs(out, exist_ok=True)
+    paths, used = [], set()
+    for result in results:
+        name = _sheet_name(result.ward.name, used)
+        path = os.path.join(out, f"schedule_{year}-{month:02d}_{name}.xlsx")
+        with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+            _write_schedule_sheet(writer, "Schedule", result, year, month)
+        paths.append(path)
+    return paths
+
+
+def add_solver_arguments(parser):
+    """Adds command line options for the solver settings (see solver_settings_from_args)."""
+    parser.add_argument("--threads", type=int,
+                        help="Solver threads per ward (default: cores shared by the workers)")
+    parser.add_argument("--rel-gap", type=float, help="Relative MIP gap to stop at")
+    parser.add_argument("--abs-gap", type=float, help="Absolute MIP gap to stop at")
+    parser.add_argument("--node-limit", type=int, help="Maximum branch-and-bound nodes")
+    parser.add_argument("--seed", type=int, help="Random seed of the solver")
+    parser.add_argument("--presolve", choices=("on", "off"), help="Switch presolve on or off")
+
+
+def solver_settings_from_args(args):
+    """Solver settings {setting: value} from the options of add_solver_arguments."""
+    settings = {name: getattr(args, name) for name in solver_backends.SOLVER_SETTINGS
+                if name != "presolve" and getattr(args, name) is not None}
+    if args.presolve is not None:
+        settings["presolve"] = args.presolve == "on"
+    return settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve the schedules of several wards")
+    parser.add_argument("wards", nargs="+", help="Employee sheets (.xlsx), one per ward")
+    parser.add_argument("--month", required=True, help="Month to plan, YYYY-MM")
+    parser.add_argument("--backend", default=solver_backends.DEFAULT_BACKEND,
+                        choices=list(solver_backends.BACKENDS))
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT,
+                        help="Time limit per ward in seconds")
+    parser.add_argument("--workers", type=int, help="Wards solved in parallel (default: cores)")
+    parser.add_argument("--out", default="schedules",
+                        help="Output directory, or the workbook path with --combined")
+    parser.add_argument("--combined", action="store_true",
+                        help="Write one workbook with one sheet per ward")
+    parser.add_argument("--no-warm-start", action="store_true",
+                        help="Do not start the solver from a heuristic schedule")
+    add_solver_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    year, month = (int(part) for part in args.month.split("-"))
+    ch_holidays = sorted(holidays.Switzerland(years=year, prov="BS"))
+    wards = [Ward.from_excel(path) for path in args.wards]
+    start = time.time()
+    results = solve_wards(wards, year, month, ch_holidays, backend=args.backend,
+                          time_limit=args.time_limit, workers=args.workers,
+                          use_warm_start=not args.no_warm_start,
+                          solver_settings=solver_settings_from_args(args))
+    print(summary_table(results).to_string(index=False))
+    print(f"{len(wards)} wards in {time.time() - start:.1f} s "
+          f"(sum of ward times {math.fsum(r.wall_time for r in results):.1f} s)")
+    for path in write_workbooks(results, year, month, args.out, combined=args.combined):
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,602 @@
+# benchmark.py
+"""
+Performance benchmarks for the scheduler.
+
+Usage:
+    python benchmark.py build [--sizes 20 100 500] [--repeat 3]
+    python benchmark.py horizon [--employees 30] [--months 12] [--workers 1 4]
+    python benchmark.py symmetry [--sizes 60 150 300] [--backend cbc] [--seeds 1 2 3]
+                                 [--absence-rate R]
+    python benchmark.py formulation [--sizes 20 40 60] [--seed N]
+    python benchmark.py lns [--sizes 100 300 500] [--backend cbc] [--time-limit 60] [--workers N]
+    python benchmark.py lexicographic [--sizes 60 150 300] [--backend highs] [--time-limit 60]
+    python benchmark.py lazy [--sizes 60 150 300] [--backend highs] [--time-limit 120]
+    python benchmark.py threads [--sizes 60 150] [--backends cbc highs cp-sat]
+                                [--threads 1 2 4 8 16] [--time-limit 120]
+    python benchmark.py scaling [--sizes 20 50 100 200 500] [--backends highs cbc]
+                                [--scenarios base few-fach absences holidays] [--time-limit 60]
+                                [--seed 0] [--out results.json]
+    python benchmark.py compare old.json new.json
+"""
+import argparse
+import calendar
+import csv
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.linear_solver import linear_solver_pb2, pywraplp
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import holidays
+
+import heuristic
+import lazy_constraints
+import lexicographic
+import lns
+import model_builder
+import rolling
+import scheduler
+import solver_backends
+import warm_start
+
+
+QUAL_WEIGHTS = {"HF": 3, "PH": 6, "Ausbildung 1": 1, "Ausbildung 2": 1}
+ABSENCE_TYPES = ["w", "Fe", "SL", "uw"]
+
+
+def make_synthetic_ward(num_employees, year=2025, month=2, seed=0, qual_weights=None,
+                        absence_rate=None, ch_holidays=None):
+    """
+    Creates a random ward in the format generate_schedule_highs consumes.
+
+    Args:
+        num_employees: Number of employees; employee 1 is the Leitung.
+        year: Year of the month.
+        month: Month to plan; its length is the month length of the instance.
+        seed: Random seed; the same arguments always give the same ward.
+        qual_weights: Relative frequency of the qualifications of the other employees
+            (default: QUAL_WEIGHTS).
+        absence_rate: Probability that an employee is absent on a day (default: up to five
+            random absence days per employee).
+        ch_holidays: Holidays of the month (default: the 1st of the month).
+
+    Returns:
+        Tuple (employees, absences, employee_qualifications, employee_workload, year, month,
+        ch_holidays).
+    """
+    rnd = random.Random(seed)
+    qual_weights = qual_weights or QUAL_WEIGHTS
+    num_days = calendar.monthrange(year, month)[1]
+    employees, absences, qualifications, workload = [], {}, {}, {}
+    for e_id in range(1, num_employees + 1):
+        if e_id == 1:
+            qual = "Leitung"
+        else:
+            qual = rnd.choices(list(qual_weights), list(qual_weights.values()))[0]
+        employees.append({"id": e_id, "name": f"MA{e_id}", "qualifikation": qual})
+        qualifications[e_id] = qual
+        workload[e_id] = rnd.choice([10, 14, 16, 18, 20])
+        records = []
+        if absence_rate is None:
+            for _ in range(rnd.randint(0, 5)):
+                day = rnd.randint(1, num_days)
+                records.append((f"{day:02d}.{month:02d}.", rnd.choice(ABSENCE_TYPES)))
+        else:
+            for day in range(1, num_days + 1):
+                if rnd.random() < absence_rate:
+                    records.append((f"{day:02d}.{month:02d}.", rnd.choice(ABSENCE_TYPES)))
+        if records:
+            absences[e_id] = records
+    if ch_holidays is None:
+        ch_holidays = [datetime.date(year, month, 1)]
+    return employees, absences, qualifications, workload, year, month, list(ch_holidays)
+
+
+def _best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_build(sizes, repeat):
+    """Compares the expression builder with the bulk matrix builder."""
+    results = []
+    for size in sizes:
+        ward = make_synthetic_ward(size, seed=size)
+
+        def reference():
+            solver = pywraplp.Solver.CreateSolver('CBC_MIXED_INTEGER_PROGRAMMING')
+            scheduler.build_reference_model(solver, *ward)
+
+        def matrix():
+            model_builder.build_model(*ward)
+
+        def matrix_into_cbc():
+            model = model_builder.build_model(*ward)
+            solver = pywraplp.Solver.CreateSolver('CBC_MIXED_INTEGER_PROGRAMMING')
+            solver.LoadModelFromProto(solver_backends.to_mp_model_proto(model))
+
+        model = model_builder.build_model(*ward)
+        row = {
+            "employees": size,
+            "variables": model.num_cols,
+            "constraints": model.num_rows,
+            "nonzeros": model.num_nonzeros,
+            "reference_build_s": round(_best_of(repeat, reference), 4),
+            "matrix_build_s": round(_best_of(repeat, matrix), 4),
+            "matrix_build_and_load_cbc_s": round(_best_of(repeat, matrix_into_cbc), 4),
+        }
+        row["speedup"] = round(row["reference_build_s"] / row["matrix_build_s"], 1)
+        print(json.dumps(row))
+        results.append(row)
+    return results
+
+
+def benchmark_horizon(num_employees, num_months, workers_list, backend, year=2025):
+    """Plans a rolling horizon sequentially and with parallel months; counts boundary conflicts."""
+    employees, absences, qualifications, workload, *_ = make_synthetic_ward(num_employees, seed=1)
+    ch_holidays = holidays.Switzerland(years=[year, year + 1], prov="BS")
+    results = []
+    for workers in workers_list:
+        start = time.perf_counter()
+        plans = rolling.plan_horizon(employees, absences, qualifications, workload, year, 1,
+                                     num_months, ch_holidays, backend=backend, workers=workers)
+        conflicts = sum(
+            len(rolling.boundary_conflicts(
+                rolling.BoundaryState.from_schedule(a.schedule, a.year, a.month), b.schedule,
+                qualifications))
+            for a, b in zip(plans, plans[1:]))
+        row = {
+            "employees": num_employees,
+            "months": len(plans),
+            "workers": workers,
+            "solved": sum(plan.schedule is not None for plan in plans),
+            "stitched": sum(plan.resolved for plan in plans),
+            "boundary_conflicts": conflicts,
+            "total_s": round(time.perf_counter() - start, 1),
+        }
+        print(json.dumps(row))
+        results.append(row)
+    return results
+
+
+def solve_proto(proto, solver_id, relax, time_limit):
+    """Solves an MPModelProto (as an LP if relax) and returns (objective, seconds)."""
+    if relax:
+        for variable in proto.variable:
+            variable.is_integer = False
+    solver = pywraplp.Solver.CreateSolver(solver_id)
+    solver.LoadModelFromProto(proto)
+    solver.SetTimeLimit(int(time_limit * 1000))
+    start = time.perf_counter()
+    status = solver.Solve()
+    seconds = time.perf_counter() - start
+    objective = solver.Objective().Value() if status in (pywraplp.Solver.OPTIMAL,
+                                                         pywraplp.Solver.FEASIBLE) else None
+    return objective, seconds
+
+
+def benchmark_formulation(sizes, seed=None, time_limit=300):
+    """
+    Compares the consecutive-day and weekend rows of the matrix model with the original rows
+    of the expression model: model size, LP bound and CBC solve time.
+    """
+    results = []
+    for size in sizes:
+        ward = make_synthetic_ward(size, seed=size if seed is None else seed)
+        model = model_builder.build_model(*ward)
+        reference = pywraplp.Solver.CreateSolver('CBC_MIXED_INTEGER_PROGRAMMING')
+        scheduler.build_reference_model(reference, *ward)
+        row = {"employees": size}
+        for key, make_proto in (
+                ("reference", lambda: exported_proto(reference)),
+                ("matrix", lambda: solver_backends.to_mp_model_proto(model))):
+            proto = make_proto()
+            row[f"{key}_variables"] = len(proto.variable)
+            row[f"{key}_constraints"] = len(proto.constraint)
+            row[f"{key}_nonzeros"] = sum(len(c.var_index) for c in proto.constraint)
+            lp_bound, lp_seconds = solve_proto(make_proto(), "CLP", True, time_limit)
+            objective, seconds = solve_proto(proto, "CBC", False, time_limit)
+            row[f"{key}_lp_bound"] = round(lp_bound, 2)
+            row[f"{key}_lp_s"] = round(lp_seconds, 2)
+            row[f"{key}_objective"] = objective
+            row[f"{key}_s"] = round(seconds, 2)
+        print(json.dumps(row))
+        results.append(row)
+    return results
+
+
+def exported_proto(solver):
+    proto = linear_solver_pb2.MPModelProto()
+    solver.ExportModelToProto(proto)
+    return proto
+
+
+def benchmark_symmetry(sizes, backend, seeds=(1, 2, 3), absence_rate=None):
+    """
+    Solve time and branch-and-bound nodes with and without symmetry-breaking rows
+    (build_model(symmetry_breaking=True)), with the total times over all wards at the end.
+    Wards without absences (absence_rate 0) have the largest classes of interchangeable
+    employees.
+    """
+    solve = solver_backends.BACKENDS[backend]
+    results = []
+    for num_employees in sizes:
+        for seed in seeds:
+            ward = make_synthetic_ward(num_employees, seed=seed, absence_rate=absence_rate)
+            row = {"employees": num_employees, "seed": seed, "backend": backend}
+            for key, symmetry_breaking in (("plain", False), ("symmetry", True)):
+                model = model_builder.build_model(*ward, symmetry_breaking=symmetry_breaking)
+                result = solve(model, solver_backends.SolverOptions(time_limit=300))
+                if symmetry_breaking:
+                    row["symmetry_rows"] = model.num_rows - row["plain_rows"]
+                else:
+                    row["plain_rows"] = model.num_rows
+                row[f"{key}_objective"] = result.objective
+                row[f"{key}_nodes"] = result.stats.get("nodes")
+                row[f"{key}_s"] = round(result.wall_time, 2)
+            print(json.dumps(row))
+            results.append(row)
+    print(json.dumps({key: round(sum(row[key] for row in results), 1)
+                      for key in ("plain_s", "symmetry_s")}))
+    return results
+
+
+def benchmark_lns(sizes, backend, time_limit=60, workers=None, seed=1):
+    """
+    Objective within the same time limit: the full model with the backend vs. LNS (lns.py),
+    both started from a heuristic schedule.
+    """
+    results = []
+    for num_employees in sizes:
+        ward = make_synthetic_ward(num_employees, seed=seed)
+        model = model_builder.build_model(*ward)
+        start = heuristic.heuristic_schedule(*ward)
+        row = {"employees": num_employees, "variables": model.num_cols,
+               "heuristic_objective": start.objective}
+        for key, solve in ((backend, solver_backends.BACKENDS[backend]),
+                           ("lns", lambda m, o: lns.solve_lns(m, o, workers=workers))):
+            options = solver_backends.SolverOptions(
+                time_limit=time_limit, hint=warm_start.hint_from_schedule(model, start.schedule))
+            result = solve(model, options)
+            row[f"{key}_objective"] = result.objective
+            row[f"{key}_gap"] = result.gap
+            row[f"{key}_s"] = round(result.wall_time, 2)
+        print(json.dumps(row))
+        results.append(row)
+    return results
+
+
+def benchmark_lexicographic(sizes, backend, time_limit=60, seed=1):
+    """
+    Weighted objective with the backend vs. staged solving by priority tier (lexicographic.py):
+    time, objective and the weighted penalty of each tier.
+    """
+    results = []
+    for num_employees in sizes:
+        ward = make_synthetic_ward(num_employees, seed=seed)
+        model = model_builder.build_model(*ward)
+        row = {"employees": num_employees, "variables": model.num_cols}
+        for key in (backend, "lexicographic"):
+            result = solver_backends.BACKENDS[key](
+                model, solver_backends.SolverOptions(time_limit=time_limit))
+            row[f"{key}_status"] = result.status
+            row[f"{key}_objective"] = result.objective
+            row[f"{key}_s"] = round(result.wall_time, 2)
+            if result.has_solution:
+                row[f"{key}_tiers"] = {tier: round(value) for tier, value in
+                                       lexicographic.tier_values(model, result.col_value).items()}
+        print(json.dumps(row))
+        results.append(row)
+    return results
+
+
+def benchmark_lazy(sizes, backend, time_limit=120, seed=1):
+    """
+    The full model vs. the cut loop over the transition rows (lazy_constraints.py): rows, time
+    and objective, and how many of the lazy rows the cut loop had to add.
+    """
+    results = []
+    for num_employees in sizes:
+        model = model_builder.build_model(*make_synthetic_ward(num_employees, seed=seed))
+        options = solver_backends.SolverOptions(time_limit=time_limit)
+        full = solver_backends.BACKENDS[backend](model, options)
+        lazy = lazy_constraints.solve_lazy(model, options, stage_backend=backend)
+        row = {"employees": num_employees, "rows": model.num_rows,
+               "pool_rows": lazy.stats["pool_rows"], "rows_added": lazy.stats["rows_added"],
+               "rounds": len(lazy.stats["rounds"])}
+        for key, result in ((backend, full), ("lazy", lazy)):
+            row[f"{key}_status"] = result.status
+            row[f"{key}_objective"] = result.objective
+            row[f"{key}_s"] = round(result.wall_time, 2)
+        print(json.dumps(row))
+        results.append(row)
+    return results
+
+
+def benchmark_threads(sizes, backends, threads_list, time_limit=120, seed=0):
+    """
+    Solve time against the thread count per backend (solver_backends.SolverOptions.threads);
+    speedup is relative to the first thread count of threads_list.
+    """
+    results = []
+    for num_employees in sizes:
+        model = model_builder.build_model(*make_synthetic_ward(num_employees, seed=seed))
+        for backend in backends:
+            baseline = None
+            for threads in threads_list:
+                result = solver_backends.BACKENDS[backend](model, solver_backends.SolverOptions(
+                    time_limit=time_limit, threads=threads, seed=seed))
+                baseline = baseline or result.wall_time
+                row = {"employees": num_employees, "backend": backend, "threads": threads,
+                       "status": result.status, "objective": result.objective,
+                       "gap": result.gap, "solve_s": round(result.wall_time, 2),
+                       "speedup": round(baseline / result.wall_time, 2)}
+                print(json.dumps(row))
+                results.append(row)
+    return results
+
+
+# Instance families of the scaling benchmark: keyword arguments of make_synthetic_ward.
+SCALING_SCENARIOS = {
+    "base": {},
+    "few-fach": {"qual_weights": {"HF": 1, "PH": 8, "Ausbildung 1": 1, "Ausbildung 2": 1}},
+    "absences": {"absence_rate": 0.15},
+    "holidays": {"month": 12,
+                 "ch_holidays": sorted(holidays.Switzerland(years=2025, prov="BS"))},
+}
+RESULT_KEY = ("scenario", "employees", "seed", "backend")
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def scaling_case(scenario, num_employees, backend, time_limit=60, seed=0):
+    """
+    Builds and solves one instance; run it in a fresh process so peak_rss_mb is its own.
+
+    Returns:
+        Dictionary with the instance, the model size, build time, time to the first feasible
+        solution (streaming backends only), time to optimality, gap, objective and peak RSS.
+    """
+    ward = make_synthetic_ward(num_employees, seed=seed, **SCALING_SCENARIOS[scenario])
+    employees, absences, *_, year, month, ch_holidays = ward
+    start = time.perf_counter()
+    model = model_builder.build_model(*ward)
+    build_s = time.perf_counter() - start
+
+    first = []
+    options = solver_backends.SolverOptions(
+        time_limit=time_limit, on_solution=lambda result: first.append(result.wall_time))
+    result = solver_backends.BACKENDS[backend](model, options)
+    return {
+        "scenario": scenario,
+        "employees": num_employees,
+        "seed": seed,
+        "days": calendar.monthrange(year, month)[1],
+        "holidays": sum(day.year == year and day.month == month for day in ch_holidays),
+        "absence_days": sum(len(records) for records in absences.values()),
+        "backend": backend,
+        "variables": model.num_cols,
+        "constraints": model.num_rows,
+        "nonzeros": model.num_nonzeros,
+        "build_s": round(build_s, 4),
+        "status": result.status,
+        "objective": result.objective,
+        "bound": result.bound,
+        "gap": result.gap,
+        "first_feasible_s": round(first[0], 2) if first else None,
+        "optimal_s": round(result.wall_time, 2) if result.status == solver_backends.OPTIMAL else None,
+        "solve_s": round(result.wall_time, 2),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _scaling_case_task(args):
+    return scaling_case(*args)
+
+
+def benchmark_scaling(sizes, backends, scenarios=tuple(SCALING_SCENARIOS), time_limit=60, seed=0,
+                      out=None):
+    """
+    Scaling benchmark: every scenario and size with every backend. Each case runs in its own
+    process, one at a time, so timings do not compete and the peak RSS is per case.
+
+    Args:
+        sizes: Employee counts.
+        backends: Names of the solver backends.
+        scenarios: Names of SCALING_SCENARIOS.
+        time_limit: Time limit per solve in seconds.
+        seed: Seed of the instances.
+        out: Optional .json or .csv file for the results (see write_results).
+
+    Returns:
+        List of result rows (see scaling_case).
+    """
+    cases = [(scenario, size, backend, time_limit, seed)
+             for scenario in scenarios for size in sizes for backend in backends]
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as pool:
+        for row in pool.map(_scaling_case_task, cases):
+            print(json.dumps(row))
+            results.append(row)
+    if out:
+        write_results(results, out, time_limit=time_limit)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(rows, path, **settings):
+    """
+    Writes benchmark rows to a .csv file (one line per row) or a .json file (the rows plus the
+    commit, date, platform and settings, to compare runs across commits).
+    """
+    if path.endswith(".csv"):
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+        return
+    with open(path, "w") as f:
+        json.dump({
+            "commit": _git_commit(),
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "settings": settings,
+            "results": rows,
+        }, f, indent=1)
+
+
+def read_results(path):
+    """Reads the rows written by write_results; CSV values are converted to numbers."""
+    if not path.endswith(".csv"):
+        with open(path) as f:
+            return json.load(f)["results"]
+
+    def convert(value):
+        if value == "":
+            return None
+        try:
+            return float(value) if any(c in value for c in ".en") else int(value)
+        except ValueError:
+            return value
+
+    with open(path, newline="") as f:
+        return [{key: convert(value) for key, value in row.items()} for row in csv.DictReader(f)]
+
+
+def compare_results(old_rows, new_rows, columns=("build_s", "solve_s", "objective", "peak_rss_mb")):
+    """
+    Pairs the rows of two runs by RESULT_KEY.
+
+    Returns:
+        List of dictionaries with the key, the old and new value of every column and their
+        ratio (new / old).
+    """
+    old = {tuple(row.get(key) for key in RESULT_KEY): row for row in old_rows}
+    comparison = []
+    for row in new_rows:
+        key = tuple(row.get(k) for k in RESULT_KEY)
+        if key not in old:
+            continue
+        entry = dict(zip(RESULT_KEY, key))
+        for column in columns:
+            before, after = old[key].get(column), row.get(column)
+            entry[f"{column}_old"], entry[f"{column}_new"] = before, after
+            entry[f"{column}_ratio"] = (round(after / before, 3)
+                                        if before and after is not None else None)
+        comparison.append(entry)
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduler benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Model build time: expression vs. matrix builder")
+    build.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 500])
+    build.add_argument("--repeat", type=int, default=3)
+    horizon = subparsers.add_parser("horizon", help="Rolling-horizon planning of several months")
+    horizon.add_argument("--employees", type=int, default=30)
+    horizon.add_argument("--months", type=int, default=12)
+    horizon.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    horizon.add_argument("--backend", default="highs")
+    symmetry = subparsers.add_parser("symmetry", help="Solve time with symmetry-breaking rows")
+    symmetry.add_argument("--sizes", type=int, nargs="+", default=[60, 150, 300])
+    symmetry.add_argument("--backend", default="cbc")
+    symmetry.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3])
+    symmetry.add_argument("--absence-rate", type=float)
+    formulation = subparsers.add_parser(
+        "formulation", help="Matrix model vs. original consecutive/weekend rows")
+    formulation.add_argument("--sizes", type=int, nargs="+", default=[20, 40, 60])
+    formulation.add_argument("--seed", type=int, help="Ward seed (default: the size)")
+    lns_parser = subparsers.add_parser("lns", help="Full model vs. large neighborhood search")
+    lns_parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 500])
+    lns_parser.add_argument("--backend", default="cbc")
+    lns_parser.add_argument("--time-limit", type=float, default=60)
+    lns_parser.add_argument("--workers", type=int)
+    lex_parser = subparsers.add_parser(
+        "lexicographic", help="Weighted objective vs. staged solving by priority tier")
+    lex_parser.add_argument("--sizes", type=int, nargs="+", default=[60, 150, 300])
+    lex_parser.add_argument("--backend", default="highs")
+    lex_parser.add_argument("--time-limit", type=float, default=60)
+    lazy_parser = subparsers.add_parser(
+        "lazy", help="Full model vs. lazily added transition rows")
+    lazy_parser.add_argument("--sizes", type=int, nargs="+", default=[60, 150, 300])
+    lazy_parser.add_argument("--backend", default="highs")
+    lazy_parser.add_argument("--time-limit", type=float, default=120)
+    threads_parser = subparsers.add_parser("threads", help="Solve time against thread count")
+    threads_parser.add_argument("--sizes", type=int, nargs="+", default=[60, 150])
+    threads_parser.add_argument("--backends", nargs="+", default=["cbc", "highs", "cp-sat"])
+    threads_parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    threads_parser.add_argument("--time-limit", type=float, default=120)
+    scaling = subparsers.add_parser("scaling", help="Build and solve scaling per backend")
+    scaling.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 100, 200, 500])
+    scaling.add_argument("--backends", nargs="+", default=["highs", "cbc"])
+    scaling.add_argument("--scenarios", nargs="+", default=list(SCALING_SCENARIOS),
+                         choices=list(SCALING_SCENARIOS))
+    scaling.add_argument("--time-limit", type=float, default=60)
+    scaling.add_argument("--seed", type=int, default=0)
+    scaling.add_argument("--out", help="Result file (.json or .csv)")
+    compare = subparsers.add_parser("compare", help="Compare two scaling result files")
+    compare.add_argument("old")
+    compare.add_argument("new")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        benchmark_build(args.sizes, args.repeat)
+    elif args.command == "horizon":
+        benchmark_horizon(args.employees, args.months, args.workers, args.backend)
+    elif args.command == "formulation":
+        benchmark_formulation(args.sizes, args.seed)
+    elif args.command == "symmetry":
+        benchmark_symmetry(args.sizes, args.backend, args.seeds, args.absence_rate)
+    elif args.command == "lns":
+        benchmark_lns(args.sizes, args.backend, args.time_limit, args.workers)
+    elif args.command == "lexicographic":
+        benchmark_lexicographic(args.sizes, args.backend, args.time_limit)
+    elif args.command == "lazy":
+        benchmark_lazy(args.sizes, args.backend, args.time_limit)
+    elif args.command == "threads":
+        benchmark_threads(args.sizes, args.backends, args.threads, args.time_limit)
+    elif args.command == "scaling":
+        benchmark_scaling(args.sizes, args.backends, args.scenarios, args.time_limit, args.seed,
+                          args.out)
+    elif args.command == "compare":
+        for row in compare_results(read_results(args.old), read_results(args.new)):
+            print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
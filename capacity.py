@@ -0,0 +1,166 @@
+# capacity.py
+"""
+Pre-solve feasibility and capacity analysis of a month.
+
+Counts per day how many employees may work each shift (absences, qualifications and the
+weekday-only rules, as in model_builder.shift_domain_mask) and compares them with the coverage
+requirements of rules.py. This takes milliseconds and finds the days whose requirements cannot
+be met by any schedule before a solver spends its whole time limit on them:
+
+  - Hard shortfalls make the model infeasible: a required shift total (REQUIRED_SHIFTS) with
+    too few employees who may work it, required shifts that together need more employees than
+    are available for them (each employee works at most one shift a day), or a Leitung
+    without BURO_DAYS_PER_MONTH possible Büro days.
+  - Soft shortfalls are paid with slack in every schedule. build_model uses the same counts as
+    lower bounds of its slack columns; their penalties add up to a lower bound of the objective.
+
+The total contract days (diensttage less credited absences) are compared with the total demand
+of the required shifts and Büro days as well.
+"""
+import calendar
+import datetime
+import itertools
+import numpy as np
+
+from absence_index import AbsenceIndex, absence_mask, WORKDAY_CREDIT_TYPES
+from model_builder import available_per_day, group_requirements, shift_domain_mask
+from rules import (
+    PENALTIES, REQUIRED_SHIFTS, FACH_QUALIFICATIONS, MIN_EARLY_TOTAL_WEEKDAY,
+    MIN_EARLY_TOTAL_WEEKEND, BURO_DAYS_PER_MONTH,
+)
+
+
+class CapacityReport:
+    """
+    Result of analyze_capacity.
+
+    Attributes:
+        dates: Dates of the month.
+        available: Dictionary {class: array of available employees per day} for the classes
+            "all", "fach", "nonfach" and "hf".
+        shortfalls: List of dictionaries (day, rule, required, available, hard, penalty); day
+            is None for shortfalls of the whole month, penalty is the least penalty the
+            shortfall costs (0 for hard shortfalls).
+        contract_days: Total target workdays less credited absences.
+        demand: Total required shift assignments and Büro days of the month.
+    """
+
+    def __init__(self, dates, available, shortfalls, contract_days, demand):
+        self.dates = dates
+        self.available = available
+        self.shortfalls = shortfalls
+        self.contract_days = contract_days
+        self.demand = demand
+
+    @property
+    def feasible(self):
+        """False if the analysis proves that no schedule meets the hard rules."""
+        return not any(shortfall["hard"] for shortfall in self.shortfalls)
+
+    @property
+    def unmeetable_days(self):
+        """Sorted days of the month with a requirement that cannot be met."""
+        return sorted({s["day"] for s in self.shortfalls if s["day"] is not None})
+
+    @property
+    def min_penalty(self):
+        """Lower bound of the penalties of any schedule."""
+        return sum(shortfall["penalty"] for shortfall in self.shortfalls)
+
+    def messages(self):
+        """Human-readable lines, hard shortfalls first."""
+        lines = []
+        for shortfall in sorted(self.shortfalls, key=lambda s: not s["hard"]):
+            where = f"Day {shortfall['day']}" if shortfall["day"] is not None else "Month"
+            kind = "infeasible" if shortfall["hard"] else f"penalty >= {shortfall['penalty']:.0f}"
+            lines.append(f"{where}: {shortfall['rule']} needs {shortfall['required']}, "
+                         f"only {shortfall['available']} available ({kind})")
+        return lines
+
+
+def analyze_capacity(employees, absences, employee_qualifications, employee_workload, year,
+                     month, ch_holidays):
+    """
+    Compares the available employees of every day with the coverage requirements.
+
+    Args:
+        employees: List of employee dictionaries (id).
+        absences: Dictionary of employee absences (employee_id: [(date_str, type)]).
+        employee_qualifications: Dictionary of employee qualifications (employee_id: qualifikation).
+        employee_workload: Dictionary of employee target workloads (employee_id: target_days).
+        year: Year for the schedule.
+        month: Month for the schedule.
+        ch_holidays: List of holidays (as datetime.date objects).
+
+    Returns:
+        A CapacityReport.
+    """
+    num_days = calendar.monthrange(year, month)[1]
+    dates = [datetime.date(year, month, d) for d in range(1, num_days + 1)]
+    employee_ids = [emp["id"] for emp in employees]
+    quals = [employee_qualifications.get(e_id) for e_id in employee_ids]
+    absence_masks = AbsenceIndex(absences, dates).matrix(employee_ids)
+    allowed, buero_allowed = shift_domain_mask(quals, dates, absence_masks)
+
+    quals_arr = np.array(quals, dtype=object)
+    is_fach = np.isin(quals_arr, list(FACH_QUALIFICATIONS))
+    is_hf = quals_arr == "HF"
+    everyone = np.ones(len(employee_ids), dtype=bool)
+    all_shifts = list(REQUIRED_SHIFTS)
+    available = {name: available_per_day(allowed, all_shifts, mask) for name, mask in
+                 (("all", everyone), ("fach", is_fach), ("nonfach", ~is_fach), ("hf", is_hf))}
+
+    shortfalls = []
+
+    def add_shortfalls(rule, required, count, hard, penalty=0):
+        required = np.broadcast_to(required, count.shape)
+        for d in np.flatnonzero(count < required):
+            missing = required[d] - count[d]
+            shortfalls.append({"day": int(d) + 1, "rule": rule, "required": int(required[d]),
+                               "available": int(count[d]), "hard": hard,
+                               "penalty": 0 if hard else float(missing * penalty)})
+
+    # Hard: every subset of the required shifts needs as many employees who may work one of
+    # them as its totals add up to (Hall's condition for assigning one shift per employee).
+    required = [code for code, req in REQUIRED_SHIFTS.items() if not req.get("optional", False)]
+    for size in range(1, len(required) + 1):
+        for subset in itertools.combinations(required, size):
+            total = sum(REQUIRED_SHIFTS[code]["total"] for code in subset)
+            add_shortfalls(" + ".join(subset), total,
+                           available_per_day(allowed, subset, everyone), hard=True)
+
+    # Soft: the qualification minimums of each shift and the group requirements.
+    for code in required:
+        for key, mask, penalty in (("fach", is_fach, "FACH_PENALTY"),
+                                   ("nonfach", ~is_fach, "NONFACH_PENALTY")):
+            if key in REQUIRED_SHIFTS[code]:
+                add_shortfalls(f"{code} ({key})", REQUIRED_SHIFTS[code][key],
+                               available_per_day(allowed, {code}, mask), False,
+                               PENALTIES[penalty])
+    is_weekend = np.array([day.weekday() >= 5 for day in dates], dtype=bool)
+    min_early = np.where(is_weekend, MIN_EARLY_TOTAL_WEEKEND, MIN_EARLY_TOTAL_WEEKDAY)
+    for shift_set, mask, group_required, sense, penalty in group_requirements(is_fach, is_hf,
+                                                                              min_early):
+        if sense > 0:
+            rule = penalty[:-len("_PENALTY")].lower().replace("_", " ")
+            add_shortfalls(rule, group_required, available_per_day(allowed, shift_set, mask),
+                           False, PENALTIES[penalty])
+
+    # Hard: Leitung works exactly BURO_DAYS_PER_MONTH Büro days.
+    buero_days = buero_allowed.sum(axis=1)
+    for e in np.flatnonzero((quals_arr == "Leitung") & (buero_days < BURO_DAYS_PER_MONTH)):
+        shortfalls.append({"day": None, "rule": f"Büro days of employee {employee_ids[e]}",
+                           "required": BURO_DAYS_PER_MONTH, "available": int(buero_days[e]),
+                           "hard": True, "penalty": 0})
+
+    credited = ((absence_masks & absence_mask(*WORKDAY_CREDIT_TYPES)) != 0).sum(axis=1)
+    target = np.array([employee_workload.get(e_id) or 0 for e_id in employee_ids], dtype=np.float64)
+    contract_days = float(np.maximum(target - credited, 0).sum())
+    demand = float(num_days * sum(REQUIRED_SHIFTS[code]["total"] for code in required)
+                   + BURO_DAYS_PER_MONTH * np.count_nonzero(quals_arr == "Leitung"))
+    if contract_days < demand:
+        # Every assignment beyond the contract days is paid as a day over target.
+        shortfalls.append({"day": None, "rule": "Contract days", "required": int(demand),
+                           "available": int(contract_days), "hard": False,
+                           "penalty": (demand - contract_days) * PENALTIES["EXCESSIVE_WORKDAY_PENALTY"]})
+    return CapacityReport(dates, available, shortfalls, contract_days, demand)
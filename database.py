@@ -118,6 +118,29 @@ def get_schedule():
     conn.close()
     return schedule_df
 
+def store_month_schedule(schedule, year, month):
+    """Replaces the stored schedule of a month with a schedule {(employee_id, day): shift_code}."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM schedule WHERE date LIKE ?", (f"{year}-{month:02d}-%",))
+    cursor.executemany(
+        "INSERT INTO schedule (date, employee_id, shift_id) VALUES (?, ?, ?)",
+        [(f"{year}-{month:02d}-{int(day):02d}", employee_id, shift_code)
+         for (employee_id, day), shift_code in schedule.items()],
+    )
+    conn.commit()
+    conn.close()
+
+def get_month_schedule(year, month):
+    """Returns the stored schedule of a month as {(employee_id, day): shift_code}."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT date, employee_id, shift_id FROM schedule WHERE date LIKE ?",
+                   (f"{year}-{month:02d}-%",))
+    schedule = {(row['employee_id'], int(row['date'][8:10])): row['shift_id'] for row in cursor.fetchall()}
+    conn.close()
+    return schedule
+
 def get_employee_name(employee_id):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -142,13 +165,19 @@ def get_employee_workload():
     conn.close()
     return workloads
     
-def get_employee_absences():
-    """Returns a dictionary mapping employee IDs to a list of their absences."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, SL, Fe, UW, w FROM employees")
+def parse_absences(rows):
+    """
+    Parses the absence columns (SL, Fe, UW, w) of employee rows.
+
+    Args:
+        rows: Iterable of mappings with the keys id, SL, Fe, UW and w; the date entries are
+            comma-separated days ("03.02.") or ranges ("03.02.-07.02.").
+
+    Returns:
+        Dictionary mapping employee IDs to a list of their absences [("DD.MM.", type)].
+    """
     absences = {}
-    
+
     def process_date_entries(date_string, absence_type):
         if not date_string:
             return []
@@ -185,7 +214,7 @@ def get_employee_absences():
         
         return result
 
-    for row in cursor.fetchall():
+    for row in rows:
         employee_id = row['id']  # Keep as integer
         absence_list = []
         
@@ -202,6 +231,14 @@ def get_employee_absences():
         if absence_list:  # Only add if there are absences
             absences[employee_id] = absence_list
 
+    return absences
+
+def get_employee_absences():
+    """Returns a dictionary mapping employee IDs to a list of their absences."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, SL, Fe, UW, w FROM employees")
+    absences = parse_absences(cursor.fetchall())
     conn.close()
     return absences
 
@@ -0,0 +1,592 @@
+# heuristic.py
+"""
+Greedy construction plus local search: a fast, non-MIP scheduling engine.
+
+The roster is an employee × day matrix of codes (SHIFT_CODES, the Bü Dienst, or off). Its cost
+is the penalty-weighted objective of the MIP plus HARD_PENALTY per unit of violation of a hard
+rule, split into
+  - day terms, which only depend on how many employees of each class (non-fach, fach, HF) work
+    each code on a day: coverage, qualification minimums, split-shift cap;
+  - employee terms, which only depend on the employee's row: Büro days, transitions, weekends,
+    Sundays, consecutive days, workload and shift costs.
+Changing one cell therefore changes one day term and one employee term. The search keeps the
+cost change of every possible single-cell change in a table and only refreshes the day and the
+employee that were touched, so whole neighborhoods are evaluated with a few array operations.
+
+1. Construction: first assign the cells that improve coverage (the qualification penalties are
+   the largest, so Fachpersonen are placed first), then fill every employee up to the target
+   workload wherever it is cheapest.
+   Starting a new weekend costs a little extra, so that weekends are worked whole. The
+   construction stops after CONSTRUCTION_SHARE of the budget, so that the search always gets
+   the rest. It sets the best cell of many employees per step, and several cells on the same
+   day as long as they do not interact, so it takes a few dozen steps at any ward size.
+2. Local search with the moves: change the code of a cell; swap the codes of two employees on
+   a day or over a whole weekend; move a worked day (with any code) or a block of worked days
+   of an employee to free days. When no move improves, a few days or employees are cleared and
+   rebuilt greedily (ruin and recreate), and the search goes on from the better of the two
+   rosters until the wall-clock budget is used up.
+
+Independent restarts with different seeds run in parallel processes. The result can be shown
+as a quick preview or passed to the exact solvers as a warm start (warm_start.py).
+"""
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import validator
+from rules import (
+    PENALTIES, REQUIRED_SHIFTS, SHIFT_CODES, SHIFT_COST_NAMES, EARLY_SHIFTS, LATE_SHIFTS,
+    PURE_LATE_SHIFTS, SPLIT_SHIFTS, NO_EARLY_AFTER, ONLY_C_AFTER, MIN_EARLY_FACH, MIN_LATE_TOTAL,
+    MIN_LATE_HF, MIN_B_DIENST, MAX_SPLIT_SHIFTS, MAX_CONSECUTIVE_DAYS, MIN_REST_AFTER_MAX,
+    BURO_DAYS_PER_MONTH,
+)
+
+# Cost of one unit of violation of a hard rule during the search.
+HARD_PENALTY = 100000
+# Default budget per run in seconds, construction included.
+TIME_LIMIT = 0.5
+# Share of the budget the construction may use; the local search gets the rest.
+CONSTRUCTION_SHARE = 0.75
+# Days or employees cleared at most when the search is stuck in a local optimum.
+RUIN_DAYS = 3
+RUIN_EMPLOYEES = 3
+# Random tie-breaking noise added to move costs; below the smallest cost difference (2).
+NOISE = 0.5
+# Extra cost of starting a new weekend during construction.
+WEEKEND_GUIDE = 50
+# Longest block of worked days moved at once.
+MAX_BLOCK = 3
+# Construction sets up to one cell per this many employees per step.
+BATCH_EMPLOYEES = 2
+
+BUERO = validator.BUERO
+OFF = len(validator.CODES)
+NUM_CODES = OFF + 1
+NONFACH, FACH, HF = 0, 1, 2
+
+
+def _codes(*code_sets):
+    """Boolean mask over the internal codes (shifts, Bü, off)."""
+    names = set().union(*code_sets)
+    return np.array([code in names for code in validator.CODES] + [False])
+
+
+def _required(key):
+    """Per-code daily minimum of the REQUIRED_SHIFTS entry key (0 for optional shifts)."""
+    return np.array([0 if req.get("optional", False) else req.get(key, 0)
+                     for req in REQUIRED_SHIFTS.values()] + [0, 0])
+
+
+# Code groups as columns, so that group counts are a matrix product of the code counts.
+_GROUPS = np.stack([_codes(EARLY_SHIFTS), _codes(LATE_SHIFTS), _codes(PURE_LATE_SHIFTS),
+                    _codes(SPLIT_SHIFTS), _codes({"B Dienst"})], axis=1).astype(np.int64)
+_EARLY, _LATE, _PURE_LATE, _SPLIT, _B = range(_GROUPS.shape[1])
+_TOTAL, _FACH, _NONFACH = _required("total"), _required("fach"), _required("nonfach")
+
+_FORBIDDEN = np.zeros((NUM_CODES, NUM_CODES), dtype=bool)
+_FORBIDDEN[_codes(NO_EARLY_AFTER)] |= _codes(EARLY_SHIFTS)
+_FORBIDDEN[_codes(ONLY_C_AFTER)] |= _codes(EARLY_SHIFTS - {"C Dienst"})
+_CODE_COST = np.array([PENALTIES[SHIFT_COST_NAMES[code]] for code in SHIFT_CODES] + [0.0, 0.0])
+# Category of each code for the employee terms (worked, Bü, off) and what each category is.
+_CATEGORY = np.array([0] * BUERO + [1, 2])
+_NEW_WORKED = np.array([True, False, False])
+_NEW_BUERO = np.array([False, True, False])
+_NEW_NONOFF = np.array([True, True, False])
+
+
+class HeuristicResult:
+    """Best roster found by the heuristic, scored by the validator."""
+
+    def __init__(self, schedule, objective, hard_violations, iterations, perturbations,
+                 wall_time, seed=None):
+        self.schedule = schedule
+        self.objective = objective
+        self.hard_violations = hard_violations
+        self.iterations = iterations
+        self.perturbations = perturbations
+        self.wall_time = wall_time
+        self.seed = seed
+
+    @property
+    def feasible(self):
+        return not self.hard_violations
+
+
+class _Search:
+    """State of one construction and local search run."""
+
+    def __init__(self, checker, seed):
+        self.checker = checker
+        self.rng = np.random.default_rng(seed)
+        num_emp, num_days = checker.allowed.shape[:2]
+        self.num_emp, self.num_days = num_emp, num_days
+        self.days = np.arange(num_days)
+        self.allowed = np.concatenate([checker.allowed, np.ones((num_emp, num_days, 1), bool)],
+                                      axis=2)
+        self.cls = np.where(checker.is_hf, HF, np.where(checker.is_fach, FACH, NONFACH))
+        self.groups = np.zeros((len(checker.weekend_groups), num_days), dtype=bool)
+        # Weekend of each day, -1 on weekdays.
+        self.day_group = np.full(num_days, -1)
+        for g, days in enumerate(checker.weekend_groups):
+            self.groups[g, days] = True
+            self.day_group[days] = g
+        self.min_early = checker.group_rules[0][2]
+        self.set_codes(np.full((num_emp, num_days), OFF, dtype=np.int64))
+
+    def set_codes(self, codes):
+        """Replaces the roster and rebuilds all counts, costs and delta tables."""
+        self.codes = codes.copy()
+        # Employees per day, class and code.
+        self.counts = np.zeros((self.num_days, 3, NUM_CODES), dtype=np.int64)
+        np.add.at(self.counts, (self.days[None, :], self.cls[:, None], self.codes), 1)
+        self.row_cost = self._row_costs(self.codes, np.arange(self.num_emp))
+        self.day_cost = self._day_costs(self.counts, self.days)
+        # day_delta[d, k, a, b]: change of the day term if an employee of class k changes from
+        # code a to b on day d. row_delta[e, d, c]: change of the employee term if cell (e, d)
+        # becomes c.
+        self.day_delta = np.zeros((self.num_days, 3, NUM_CODES, NUM_CODES))
+        self._refresh_days(self.days)
+        self.row_delta = np.zeros((self.num_emp, self.num_days, NUM_CODES))
+        self._refresh_employees(np.arange(self.num_emp))
+
+    # ------------------------------------------
+    # Cost terms
+    # ------------------------------------------
+    def _day_costs(self, counts, days):
+        """Day terms for counts of shape (..., 3, NUM_CODES) on the given days."""
+        everyone = counts.sum(axis=-2)
+        fach = counts[..., FACH, :] + counts[..., HF, :]
+        cost = HARD_PENALTY * np.maximum(_TOTAL - everyone, 0).sum(axis=-1)
+        cost += PENALTIES["FACH_PENALTY"] * np.maximum(_FACH - fach, 0).sum(axis=-1)
+        cost += PENALTIES["NONFACH_PENALTY"] * np.maximum(
+            _NONFACH - (everyone - fach), 0).sum(axis=-1)
+        groups = everyone @ _GROUPS
+        fach_groups = fach @ _GROUPS
+        hf_late = counts[..., HF, :] @ _GROUPS[:, _LATE]
+        cost += PENALTIES["EARLY_COVERAGE_PENALTY"] * np.maximum(
+            self.min_early[days] - groups[..., _EARLY], 0)
+        cost += PENALTIES["EARLY_FACH_PENALTY"] * np.maximum(
+            MIN_EARLY_FACH - fach_groups[..., _EARLY], 0)
+        cost += PENALTIES["LATE_COVERAGE_PENALTY"] * np.maximum(
+            MIN_LATE_TOTAL - groups[..., _LATE], 0)
+        cost += PENALTIES["LATE_HF_PENALTY"] * np.maximum(MIN_LATE_HF - hf_late, 0)
+        cost += PENALTIES["EXTRA_FACH_LATE_PENALTY"] * np.maximum(
+            fach_groups[..., _PURE_LATE] - 1, 0)
+        cost += PENALTIES["B_DIENST_PENALTY"] * np.maximum(MIN_B_DIENST - groups[..., _B], 0)
+        cost += HARD_PENALTY * np.maximum(groups[..., _SPLIT] - MAX_SPLIT_SHIFTS, 0)
+        return cost
+
+    def _consecutive(self, worked):
+        """
+        Windows of MAX_CONSECUTIVE_DAYS worked days followed by a worked day within the rest
+        period, per row of worked of shape (..., days); charged once per window like in the
+        model and the validator.
+        """
+        block = MAX_CONSECUTIVE_DAYS
+        if self.num_days <= block:
+            return np.zeros(worked.shape[:-1], dtype=np.int64)
+        run = worked[..., :self.num_days - block].copy()
+        for offset in range(1, block):
+            run &= worked[..., offset:self.num_days - block + offset]
+        rest_worked = np.zeros_like(run)
+        for rest in range(block, block + MIN_REST_AFTER_MAX):
+            rest_worked[..., :self.num_days - rest] |= worked[..., rest:]
+        return (run & rest_worked).sum(axis=-1)
+
+    def _row_costs(self, rows, employees):
+        """Employee terms for code rows of shape (N, days) of the given employees (N,)."""
+        checker = self.checker
+        worked = rows < BUERO
+        cost = HARD_PENALTY * checker.is_leitung[employees] * np.abs(
+            (rows == BUERO).sum(axis=1) - BURO_DAYS_PER_MONTH).astype(float)
+        cost += HARD_PENALTY * _FORBIDDEN[rows[:, :-1], rows[:, 1:]].sum(axis=1)
+        if len(self.groups):
+            weekends = (worked[:, None, :] & self.groups[None]).any(axis=2).sum(axis=1)
+            cost += HARD_PENALTY * np.maximum(weekends - checker.weekend_limit[employees], 0)
+        sundays = (worked & checker.sunday_or_holiday).sum(axis=1)
+        cost += HARD_PENALTY * checker.is_ausb2[employees] * np.maximum(sundays - 1, 0)
+        cost += PENALTIES["CONSECUTIVE_SHIFT_PENALTY"] * self._consecutive(worked)
+        deviation = (rows != OFF).sum(axis=1) - checker.remaining[employees]
+        cost += PENALTIES["WORKDAY_DEVIATION_PENALTY"] * np.maximum(-deviation, 0)
+        cost += PENALTIES["EXCESSIVE_WORKDAY_PENALTY"] * np.maximum(deviation, 0)
+        return cost + _CODE_COST[rows].sum(axis=1)
+
+    @property
+    def cost(self):
+        return float(self.day_cost.sum() + self.row_cost.sum())
+
+    # ------------------------------------------
+    # Delta tables
+    # ------------------------------------------
+    def _refresh_days(self, days):
+        shape = (len(days), 3, NUM_CODES, NUM_CODES)
+        moved = np.broadcast_to(self.counts[days][:, None, None, None], shape + (3, NUM_CODES)).copy()
+        i, k, a, b = np.meshgrid(np.arange(len(days)), np.arange(3), np.arange(NUM_CODES),
+                                 np.arange(NUM_CODES), indexing="ij")
+        moved[i, k, a, b, k, a] -= 1
+        moved[i, k, a, b, k, b] += 1
+        self.day_delta[days] = (self._day_costs(moved, days[:, None, None, None])
+                                - self.day_cost[days][:, None, None, None])
+
+    def _refresh_employees(self, employees):
+        # Apart from the shift costs and the forbidden transitions, which are local, the
+        # employee terms only depend on whether each day is worked, Bü or off. So the row of
+        # each cell is evaluated for these three categories only, from counts of the row.
+        checker = self.checker
+        rows = self.codes[employees]
+        worked, buero, nonoff = rows < BUERO, rows == BUERO, rows != OFF
+
+        def changed(count, old, new):
+            """count (N,) with the cell (N, days) replaced by each category (3,)."""
+            return count[:, None, None] - old[:, :, None] + new
+
+        cost = HARD_PENALTY * checker.is_leitung[employees, None, None] * np.abs(
+            changed(buero.sum(axis=1), buero, _NEW_BUERO) - BURO_DAYS_PER_MONTH).astype(float)
+        if len(self.groups):
+            # Worked days per weekend, and the same without the cell's own day.
+            group_worked = worked.astype(np.int64) @ self.groups.T.astype(np.int64)
+            in_group = self.day_group >= 0
+            own = group_worked[:, np.maximum(self.day_group, 0)]
+            others = (own - worked > 0) & in_group
+            weekends = ((group_worked > 0).sum(axis=1)[:, None, None]
+                        - ((own > 0) & in_group)[:, :, None]
+                        + (others[:, :, None] | (in_group[:, None] & _NEW_WORKED)))
+            cost += HARD_PENALTY * np.maximum(
+                weekends - checker.weekend_limit[employees, None, None], 0)
+        sunday = worked & checker.sunday_or_holiday
+        sundays = changed(sunday.sum(axis=1), sunday,
+                          checker.sunday_or_holiday[:, None] & _NEW_WORKED)
+        cost += HARD_PENALTY * checker.is_ausb2[employees, None, None] * np.maximum(
+            sundays - 1, 0)
+        flipped = np.broadcast_to(worked[:, None, None, :],
+                                  worked.shape + (2, self.num_days)).copy()
+        flipped[:, self.days, :, self.days] = [False, True]
+        cost += PENALTIES["CONSECUTIVE_SHIFT_PENALTY"] * self._consecutive(
+            flipped)[:, :, _NEW_WORKED.astype(int)]
+        deviation = changed(nonoff.sum(axis=1), nonoff, _NEW_NONOFF) - checker.remaining[
+            employees, None, None]
+        cost += PENALTIES["WORKDAY_DEVIATION_PENALTY"] * np.maximum(-deviation, 0)
+        cost += PENALTIES["EXCESSIVE_WORKDAY_PENALTY"] * np.maximum(deviation, 0)
+        costs = cost[:, :, _CATEGORY]
+        # Shift costs and the transitions from the day before and to the day after.
+        code_cost = _CODE_COST[rows]
+        costs += (code_cost.sum(axis=1)[:, None] - code_cost)[:, :, None] + _CODE_COST
+        forbidden = _FORBIDDEN[rows[:, :-1], rows[:, 1:]]
+        old = np.zeros(rows.shape)
+        old[:, 1:] += forbidden
+        old[:, :-1] += forbidden
+        new = np.zeros(costs.shape)
+        new[:, 1:] += _FORBIDDEN[rows[:, :-1]]
+        new[:, :-1] += _FORBIDDEN[:, rows[:, 1:]].transpose(1, 2, 0)
+        costs += HARD_PENALTY * (forbidden.sum(axis=1)[:, None, None] - old[:, :, None] + new)
+        self.row_delta[employees] = costs - self.row_cost[employees][:, None, None]
+
+    def change_deltas(self):
+        """Cost change of every single-cell change, shape (employees, days, codes)."""
+        day_part = self.day_delta[self.days[None, :], self.cls[:, None], self.codes]
+        return np.where(self.allowed, day_part + self.row_delta, np.inf)
+
+    # ------------------------------------------
+    # Moves
+    # ------------------------------------------
+    def apply(self, cells):
+        """Sets the cells [(e, d, code)] and refreshes the touched days and employees once."""
+        days, employees = set(), set()
+        for e, d, code in cells:
+            old = self.codes[e, d]
+            if old == code:
+                continue
+            self.codes[e, d] = code
+            self.counts[d, self.cls[e], old] -= 1
+            self.counts[d, self.cls[e], code] += 1
+            days.add(d)
+            employees.add(e)
+        if days:
+            days = np.fromiter(days, int)
+            self.day_cost[days] = self._day_costs(self.counts[days], days)
+            self._refresh_days(days)
+        if employees:
+            employees = np.fromiter(employees, int)
+            self.row_cost[employees] = self._row_costs(self.codes[employees], employees)
+            self._refresh_employees(employees)
+
+    def _swap_day_delta(self, d):
+        """Change of the day term of day d if employees e1 and e2 swap codes, shape (E, E)."""
+        e1, e2 = np.meshgrid(np.arange(self.num_emp), np.arange(self.num_emp), indexing="ij")
+        c1, c2 = self.codes[e1, d], self.codes[e2, d]
+        counts = np.broadcast_to(self.counts[d], e1.shape + (3, NUM_CODES)).copy()
+        for k, a, b in ((self.cls[e1], c1, c2), (self.cls[e2], c2, c1)):
+            np.subtract.at(counts, (e1, e2, k, a), 1)
+            np.add.at(counts, (e1, e2, k, b), 1)
+        return self._day_costs(counts, d) - self.day_cost[d]
+
+    def best_swap(self, deadline=np.inf):
+        """
+        Best swap of two employees' codes on one day: (delta, days, e1, e2). Days left when
+        the deadline passes are not searched.
+        """
+        best = (-1e-6, None, None, None)
+        for d in range(self.num_days):
+            if time.time() >= deadline:
+                break
+            codes = self.codes[:, d]
+            # The employee terms are independent: e1 takes the code of e2 and vice versa.
+            part = self.row_delta[:, d, :][:, codes]
+            ok = self.allowed[:, d, :][:, codes]
+            delta = part + part.T + self._swap_day_delta(d)
+            delta = np.where(ok & ok.T & (codes[:, None] != codes[None, :]), delta, np.inf)
+            i, j = np.unravel_index(np.argmin(delta), delta.shape)
+            if delta[i, j] < best[0]:
+                best = (float(delta[i, j]), [d], int(i), int(j))
+        return best
+
+    def best_weekend_swap(self, deadline=np.inf):
+        """
+        Best swap of two employees' whole weekends: (delta, days, e1, e2). Weekends left when
+        the deadline passes are not searched.
+        """
+        best = (-1e-6, None, None, None)
+        e1, e2 = np.meshgrid(np.arange(self.num_emp), np.arange(self.num_emp), indexing="ij")
+        for group in self.groups:
+            days = np.flatnonzero(group)
+            if len(days) < 2 or time.time() >= deadline:
+                continue
+            # rows[e1, e2]: row of e1 with the weekend of e2.
+            rows = np.broadcast_to(self.codes[:, None, :], e1.shape + (self.num_days,)).copy()
+            rows[:, :, days] = self.codes[e2][:, :, days]
+            part = (self._row_costs(rows.reshape(-1, self.num_days), e1.ravel())
+                    .reshape(e1.shape) - self.row_cost[:, None])
+            ok = self.allowed[e1[..., None], days, rows[:, :, days]].all(axis=2)
+            delta = part + part.T + sum(self._swap_day_delta(d) for d in days)
+            same = (self.codes[:, days][:, None, :] == self.codes[:, days][None, :, :]).all(axis=2)
+            delta = np.where(ok & ok.T & ~same, delta, np.inf)
+            i, j = np.unravel_index(np.argmin(delta), delta.shape)
+            if delta[i, j] < best[0]:
+                best = (float(delta[i, j]), list(days), int(i), int(j))
+        return best
+
+    def _row_moves(self, e):
+        """
+        Candidate rows of employee e: every block of up to MAX_BLOCK worked days moved to free
+        days, and every worked day moved to a free day with any code.
+        """
+        row = self.codes[e]
+        worked = np.flatnonzero(row != OFF)
+        free = np.flatnonzero(row == OFF)
+        candidates = []
+        if len(worked) and len(free):
+            moved = np.broadcast_to(row, (len(worked), len(free), NUM_CODES, self.num_days)).copy()
+            i, j = np.meshgrid(np.arange(len(worked)), np.arange(len(free)), indexing="ij")
+            moved[i, j, :, worked[i]] = OFF
+            moved[i, j, :, free[j]] = np.arange(NUM_CODES)
+            candidates.append(moved.reshape(-1, self.num_days))
+        for length in range(2, MAX_BLOCK + 1):
+            windows = np.lib.stride_tricks.sliding_window_view(row, length)
+            starts = np.flatnonzero((windows != OFF).all(axis=1))
+            targets = np.arange(self.num_days - length + 1)
+            if not len(starts):
+                continue
+            i, j = np.meshgrid(np.arange(len(starts)), targets, indexing="ij")
+            moved = np.broadcast_to(row, i.shape + (self.num_days,)).copy()
+            for offset in range(length):
+                moved[i, j, starts[i] + offset] = OFF
+            clash = np.zeros(i.shape, dtype=bool)
+            for offset in range(length):
+                clash |= moved[i, j, targets[j] + offset] != OFF
+                moved[i, j, targets[j] + offset] = row[starts[i] + offset]
+            candidates.append(moved[~clash & (starts[i] != targets[j])])
+        return np.concatenate(candidates) if candidates else np.empty((0, self.num_days), int)
+
+    def try_row_move(self, e):
+        """Applies the best row move of employee e if it lowers the cost."""
+        rows = self._row_moves(e)
+        if not len(rows):
+            return False
+        ok = self.allowed[e, self.days, rows].all(axis=1)
+        delta = (self._row_costs(rows, np.full(len(rows), e)) - self.row_cost[e]
+                 + self.day_delta[self.days, self.cls[e], self.codes[e], rows].sum(axis=1))
+        delta = np.where(ok, delta, np.inf)
+        best = int(np.argmin(delta))
+        if delta[best] >= -1e-6:
+            return False
+        self.apply([(e, d, rows[best, d]) for d in range(self.num_days)])
+        return True
+
+    def perturb(self, deadline):
+        """
+        Ruin and recreate: clears a few random consecutive days or a few random employees and
+        fills them again with the greedy construction (until the deadline).
+        """
+        codes = self.codes.copy()
+        if self.rng.random() < 0.5:
+            # Days around a day with a coverage shortfall, if there is one.
+            short = np.flatnonzero(self.day_cost > 0)
+            day = self.rng.choice(short) if len(short) else self.rng.integers(self.num_days)
+            length = int(self.rng.integers(1, RUIN_DAYS + 1))
+            start = max(0, day - int(self.rng.integers(length)))
+            codes[:, start:start + length] = OFF
+        else:
+            size = min(self.num_emp, int(self.rng.integers(1, RUIN_EMPLOYEES + 1)))
+            codes[self.rng.choice(self.num_emp, size, replace=False)] = OFF
+        self.set_codes(codes)
+        self.construct(deadline)
+
+    # ------------------------------------------
+    # Construction and search
+    # ------------------------------------------
+    def _independent(self, employees, days, codes):
+        """
+        The cells (employees, days, codes), best first, up to the first one per day whose day
+        term changes differently with the earlier cells of that day set as well.
+
+        Returns:
+            [(e, d, code)], whose total cost change is the sum of their single-cell deltas.
+        """
+        by_day = np.lexsort((np.arange(len(days)), days))
+        employees, days, codes = employees[by_day], days[by_day], codes[by_day]
+        cls, old = self.cls[employees], self.codes[employees, days]
+        change = np.zeros((len(days), 3, NUM_CODES), dtype=np.int64)
+        change[np.arange(len(days)), cls, old] -= 1
+        change[np.arange(len(days)), cls, codes] += 1
+        # Index of the first cell of each cell's day, and sums over the day's cells so far.
+        first = np.r_[True, days[1:] != days[:-1]]
+        start = np.maximum.accumulate(np.where(first, np.arange(len(days)), 0))
+
+        def so_far(values):
+            total = np.cumsum(values, axis=0)
+            return total - total[start] + values[start]
+
+        cost = self._day_costs(self.counts[days] + so_far(change), days)
+        joint = cost - np.where(first, self.day_cost[days], np.r_[0.0, cost[:-1]])
+        interacts = np.abs(joint - self.day_delta[days, cls, old, codes]) > 1e-6
+        keep = so_far(interacts) == 0
+        return list(zip(employees[keep].tolist(), days[keep].tolist(), codes[keep].tolist()))
+
+    def construct(self, deadline=np.inf):
+        """
+        Coverage first, then fill up to the target workload, always the cheapest free cell
+        (starting a new weekend costs WEEKEND_GUIDE extra), until no cell improves or the
+        deadline passes. Up to one cell per BATCH_EMPLOYEES employees is set per step.
+        """
+        weekend_day = self.groups.any(axis=0)
+        batch = max(1, self.num_emp // BATCH_EMPLOYEES)
+        for coverage_only in (True, False):
+            while time.time() < deadline:
+                deltas = self.change_deltas()
+                deltas[self.codes != OFF] = np.inf
+                if coverage_only:
+                    day_part = self.day_delta[self.days[None, :, None], self.cls[:, None, None],
+                                              OFF, np.arange(NUM_CODES)]
+                    deltas[day_part >= 0] = np.inf
+                if len(self.groups):
+                    worked = self.codes < BUERO
+                    started = (worked[:, None, :] & self.groups[None]).any(axis=2) @ self.groups
+                    deltas[:, :, :BUERO] += (WEEKEND_GUIDE * (weekend_day & ~started))[:, :, None]
+                deltas += self.rng.uniform(0, NOISE, deltas.shape)
+                # Best cell per employee; cells of different employees only interact through
+                # the day term, so up to batch of them are set at once.
+                flat = deltas.reshape(self.num_emp, -1)
+                best = np.argmin(flat, axis=1)
+                best_delta = flat[np.arange(self.num_emp), best]
+                order = np.argsort(best_delta, kind="stable")
+                order = order[best_delta[order] < 0][:batch]
+                if not len(order):
+                    break
+                cells = self._independent(order, *np.divmod(best[order], NUM_CODES))
+                self.apply(cells)
+
+    def descend(self, deadline):
+        """Applies improving moves until none is left or the deadline passes."""
+        iterations = 0
+        while time.time() < deadline:
+            iterations += 1
+            deltas = self.change_deltas() + self.rng.uniform(0, NOISE, (1, 1, NUM_CODES))
+            e, d, c = np.unravel_index(np.argmin(deltas), deltas.shape)
+            if deltas[e, d, c] < -NOISE:
+                self.apply([(e, d, c)])
+                continue
+            _, days, e1, e2 = min(self.best_swap(deadline), self.best_weekend_swap(deadline),
+                                  key=lambda move: move[0])
+            if days is not None:
+                self.apply([(e, d, code) for d in days
+                            for e, code in ((e1, self.codes[e2, d]), (e2, self.codes[e1, d]))])
+                continue
+            if not any(self.try_row_move(e) for e in self.rng.permutation(self.num_emp)
+                       if time.time() < deadline):
+                break
+        return iterations
+
+    def improve(self, deadline):
+        """
+        Iterated local search until the deadline: descend to a local optimum, go back to the
+        best roster if the new one is worse, perturb.
+
+        Returns:
+            (best codes, best cost, iterations, perturbations)
+        """
+        iterations = self.descend(deadline)
+        best_codes, best_cost = self.codes.copy(), self.cost
+        perturbations = 0
+        while time.time() < deadline:
+            perturbations += 1
+            self.perturb(deadline)
+            iterations += self.descend(deadline)
+            if self.cost < best_cost - 1e-6:
+                best_codes, best_cost = self.codes.copy(), self.cost
+            elif self.cost > best_cost + 1e-6:
+                self.set_codes(best_codes)
+        return best_codes, best_cost, iterations, perturbations
+
+
+def _run(args):
+    ward, seed, time_limit = args
+    start = time.time()
+    checker = validator.ScheduleValidator(*ward)
+    search = _Search(checker, seed)
+    search.construct(start + CONSTRUCTION_SHARE * time_limit)
+    codes, _, iterations, perturbations = search.improve(start + time_limit)
+    codes = np.where(codes == OFF, validator.OFF, codes)
+    evaluation = checker.evaluate(codes)
+    schedule = {(checker.employee_ids[e], d + 1): validator.CODES[c]
+                for e, d in zip(*np.nonzero(codes != validator.OFF)) for c in [codes[e, d]]}
+    return HeuristicResult(schedule, evaluation.objective, evaluation.hard_violations,
+                           iterations, perturbations, time.time() - start, seed)
+
+
+def heuristic_schedule(employees, absences, employee_qualifications, employee_workload, year,
+                       month, ch_holidays, time_limit=TIME_LIMIT, restarts=1, workers=None,
+                       seed=0):
+    """
+    Builds a roster with greedy construction and local search.
+
+    Args:
+        employees, absences, employee_qualifications, employee_workload, year, month,
+        ch_holidays: As for scheduler.generate_schedule_highs.
+        time_limit: Wall-clock budget per run in seconds, construction included.
+        restarts: Number of independent runs (seeds seed, seed + 1, ...).
+        workers: Processes for the runs (default: one per run). With a single run it is
+            solved in this process; starting worker processes takes about a second, so
+            parallel restarts pay off for budgets of several seconds.
+        seed: Seed of the first run.
+
+    Returns:
+        The HeuristicResult with the lowest objective among those with the fewest hard
+        violations.
+    """
+    ward = (employees, absences, employee_qualifications, employee_workload, year, month,
+            ch_holidays)
+    tasks = [(ward, seed + i, time_limit) for i in range(restarts)]
+    if restarts == 1:
+        results = [_run(tasks[0])]
+    else:
+        # "spawn" keeps the workers independent of the (threaded) Streamlit process.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers or restarts, mp_context=context) as pool:
+            results = list(pool.map(_run, tasks))
+    best = min(results, key=lambda r: (len(r.hard_violations), r.objective))
+    logging.info(f"Heuristic: objective {best.objective:.0f}, {len(best.hard_violations)} hard "
+                 f"violations, {best.iterations} iterations, {best.wall_time:.2f} s")
+    return best
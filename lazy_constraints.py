@@ -0,0 +1,146 @@
+# lazy_constraints.py
+"""
+Lazy constraint generation for the late-to-early transition rows.
+
+Instead of passing all rows of the transitions family to the solver, a cut loop:
+
+  - leaves the rows of the LAZY_FAMILIES out of the model and keeps them in a pool;
+  - solves the smaller model and checks the solution against the pool with one sparse
+    product (see violated_rows);
+  - adds the pool rows of every employee with a violated row and solves again. Adding only the
+    violated rows makes the solver move the violation to the next day of the same employee,
+    round after round;
+  - stops when the solution violates no pool row. It then satisfies the whole model, and it is
+    optimal for the whole model if the last round was solved to optimality, since every round
+    solves a relaxation of it.
+
+Each round starts from the solution of the round before, with the cells of the violated rows
+left open (HiGHS completes a partial hint itself). After MAX_ROUNDS rounds the rest of the
+pool is added, so the loop always ends. Registered as the "lazy" backend; compare with the
+full model with `python benchmark.py lazy`. On the synthetic wards the late-to-early rules
+bind for most employees, so most of the pool ends up in the model and the rounds cost more
+than they save.
+"""
+import copy
+import logging
+import time
+
+import numpy as np
+
+import lns
+import model_builder
+import solver_backends
+from solver_backends import SolverOptions, SolverResult, NOT_SOLVED
+
+LAZY_FAMILIES = ("transitions",)
+STAGE_BACKEND = "highs"
+MAX_ROUNDS = 20
+# Absolute tolerance of the row activity before a pool row counts as violated.
+VIOLATION_TOLERANCE = 1e-6
+
+
+def violated_rows(model, col_value, tolerance=VIOLATION_TOLERANCE):
+    """Indices of the rows of the model that a solution violates."""
+    activity = model_builder.row_activity(model, col_value)
+    return np.flatnonzero((activity < model.row_lower - tolerance)
+                          | (activity > model.row_upper + tolerance))
+
+
+def row_employees(model, rows_model):
+    """Employee index of each row of rows_model: the employee of its first column, or -1."""
+    cells = lns.cell_columns(model)
+    employee_of_col = np.full(model.num_cols, -1, dtype=np.int64)
+    employee_of_col[cells[cells >= 0]] = np.nonzero(cells >= 0)[0]
+    first = rows_model.a_index[np.minimum(rows_model.a_start[:-1], rows_model.num_nonzeros - 1)]
+    return np.where(np.diff(rows_model.a_start) > 0, employee_of_col[first], -1)
+
+
+def _row_columns(model, rows):
+    """Columns of the nonzeros of some rows."""
+    row_of_nonzero = np.repeat(np.arange(model.num_rows), np.diff(model.a_start))
+    return model.a_index[np.isin(row_of_nonzero, rows)]
+
+
+def _partial_hint(model, col_value, open_cols):
+    """The assignment columns of a solution, with the cells of open_cols left open."""
+    cells = lns.cell_columns(model)
+    hint = np.full(model.num_cols, np.nan)
+    assigned = cells[cells >= 0]
+    hint[assigned] = col_value[assigned]
+    open_cells = cells[np.isin(cells, open_cols).any(axis=2)]
+    hint[open_cells[open_cells >= 0]] = np.nan
+    return hint
+
+
+@solver_backends.register_backend("lazy")
+def solve_lazy(model, options=None, families=LAZY_FAMILIES, stage_backend=STAGE_BACKEND,
+               max_rounds=MAX_ROUNDS):
+    """
+    Solves the model with the rows of some constraint families added when they are violated.
+
+    Args:
+        model: The MatrixModel.
+        options: SolverOptions. time_limit bounds all rounds together; hint starts the first
+            round; the other settings apply to every round.
+        families: Names of the constraint families whose rows are added lazily.
+        stage_backend: Name of the backend that solves the rounds.
+        max_rounds: Rounds after which the rest of the pool is added.
+
+    Returns:
+        SolverResult with a solution of the whole model, or without a solution (NOT_SOLVED) if
+        the time ran out before a round found one that violates no pool row. stats["rounds"]
+        lists rows, status, violated pool rows and wall time of each round; stats["pool_rows"]
+        is the number of lazy rows and stats["rows_added"] the number of them added.
+    """
+    options = options or SolverOptions()
+    start = time.time()
+    deadline = start + options.time_limit
+    lazy = np.isin(model.row_family, [model.families.index(family)
+                                      for family in families if family in model.families])
+    pool_rows = np.flatnonzero(lazy)
+    pool = model_builder.select_rows(model, pool_rows)
+    pool_employees = row_employees(model, pool)
+    added = np.zeros(pool.num_rows, dtype=bool)
+    hint = options.hint
+    rounds = []
+    result = SolverResult(NOT_SOLVED, backend=stage_backend)
+    while time.time() < deadline and not (options.stop and options.stop.is_set()):
+        kept = ~lazy
+        kept[pool_rows[added]] = True
+        current = model_builder.select_rows(model, np.flatnonzero(kept))
+        round_options = copy.copy(options)
+        round_options.time_limit, round_options.hint = deadline - time.time(), hint
+        round_options.on_solution = None
+        result = solver_backends.BACKENDS[stage_backend](current, round_options)
+        rounds.append({"rows": current.num_rows, "status": result.status,
+                       "wall_time": round(result.wall_time, 3)})
+        if not result.has_solution:
+            break
+        violated = violated_rows(pool, result.col_value)
+        rounds[-1]["violated"] = len(violated)
+        logging.info(f"Lazy round {len(rounds)}: {result.status}, objective "
+                     f"{result.objective:.0f}, {len(violated)} violated rows "
+                     f"after {time.time() - start:.1f} s")
+        if not len(violated):
+            break
+        if len(rounds) < max_rounds:
+            added |= np.isin(pool_employees, pool_employees[violated])
+            added[violated] = True
+        else:
+            added[:] = True
+        hint = _partial_hint(model, result.col_value, _row_columns(pool, violated))
+        result = SolverResult(NOT_SOLVED, backend=stage_backend)
+
+    stats = {"rounds": rounds, "pool_rows": pool.num_rows, "rows_added": int(added.sum())}
+    if not result.has_solution:
+        return SolverResult(result.status, wall_time=time.time() - start, backend="lazy",
+                            stats=stats)
+    return SolverResult(
+        result.status,
+        col_value=result.col_value,
+        objective=result.objective,
+        bound=result.bound,
+        wall_time=time.time() - start,
+        backend="lazy",
+        stats=stats,
+    )
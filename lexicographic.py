@@ -0,0 +1,165 @@
+# lexicographic.py
+"""
+Lexicographic (staged) solving by priority tier.
+
+The weighted objective mixes penalties from 5000 down to 1 in one MIP, so the solver works on
+badly scaled coefficients and spends its time proving the optimality of shift preferences.
+Instead the tiers of rules.PRIORITY_TIERS are solved one after the other, highest first:
+
+  - stage k minimizes only the penalties of tier k, with the costs of the tier divided by
+    their greatest common divisor (the qualification tier counts missing Fachkräfte);
+  - a row keeps tier k at the value found for it in all later stages. A tier at its least
+    possible value has its penalty columns fixed to their lower bounds instead, which presolve
+    removes;
+  - each stage starts from the solution of the stage before, which satisfies all of its rows,
+    so every stage has an incumbent from the start. A stage whose tier is already at its least
+    possible value in that solution is not solved at all;
+  - each stage gets its own time limit (stage_time_limits) or an equal share of the time that
+    is left, so time a stage does not use goes to the later ones.
+
+The result is optimal for the lexicographic order of the tiers, which need not be the optimum
+of the weighted objective (many violations of a lower tier can cost more than one of a higher
+tier). Its objective is reported with the weighted costs. Registered as the "lexicographic"
+backend: it reports the solution of every stage through SolverOptions.on_solution.
+"""
+import copy
+import logging
+import math
+import time
+
+import numpy as np
+
+import model_builder
+import solver_backends
+from rules import PENALTY_NAMES, PRIORITY_TIERS
+from solver_backends import SolverOptions, SolverResult, OPTIMAL, FEASIBLE, INFEASIBLE, NOT_SOLVED
+
+STAGE_BACKEND = "highs"
+# Relative slack of the rows that keep a tier at the value of its stage.
+TIER_TOLERANCE = 1e-6
+
+
+def tier_columns(model, tiers=PRIORITY_TIERS):
+    """
+    Boolean column mask per tier: the columns penalized by one of its names. Columns with
+    costs of their own (e.g. the change penalty of repair.py on Bü columns) go to the last tier.
+    """
+    masks = [np.isin(model.col_penalty, [PENALTY_NAMES.index(name) for name in names])
+             for _, names in tiers]
+    masks[-1] = masks[-1] | ~np.any(masks, axis=0)
+    return masks
+
+
+def tier_costs(model, columns):
+    """Objective coefficients of the columns of a tier, divided by their gcd if integral."""
+    costs = np.where(columns, model.col_cost, 0.0)
+    weights = np.abs(costs[costs != 0])
+    if len(weights) and np.all(weights == np.round(weights)):
+        costs = costs / np.gcd.reduce(weights.astype(np.int64))
+    return costs
+
+
+def tier_values(model, col_value, tiers=PRIORITY_TIERS):
+    """Objective of each tier for a solution, with the weighted costs, as {tier: value}."""
+    paid = model.col_cost * col_value
+    return {tier: float(paid[columns].sum())
+            for (tier, _), columns in zip(tiers, tier_columns(model, tiers))}
+
+
+@solver_backends.register_backend("lexicographic")
+def solve_lexicographic(model, options=None, tiers=PRIORITY_TIERS, stage_time_limits=None,
+                        stage_backend=STAGE_BACKEND):
+    """
+    Solves the model tier by tier.
+
+    Args:
+        model: The MatrixModel.
+        options: SolverOptions. time_limit bounds all stages together; hint starts the first
+            stage; the other settings apply to every stage.
+        tiers: Tuple of (tier, penalty names), highest priority first.
+        stage_time_limits: Optional dictionary {tier: seconds}; tiers without an entry get an
+            equal share of the time left.
+        stage_backend: Name of the backend that solves the stages.
+
+    Returns:
+        SolverResult with the solution of the last stage solved; the bound is unknown. The
+        status is OPTIMAL if every stage was solved to optimality. stats["stages"] lists tier,
+        status, tier objective and wall time of each stage.
+    """
+    options = options or SolverOptions()
+    start = time.time()
+    deadline = start + options.time_limit
+    stage_costs = [(tier, tier_costs(model, columns))
+                   for (tier, _), columns in zip(tiers, tier_columns(model, tiers))]
+    stage_costs = [(tier, costs) for tier, costs in stage_costs if costs.any()]
+
+    stage_model = copy.copy(model)
+    stage_model.offset = 0.0
+    best, hint = None, options.hint
+    all_optimal = True
+    stages = []
+    for k, (tier, costs) in enumerate(stage_costs):
+        remaining = deadline - time.time()
+        if remaining <= 0 or (options.stop and options.stop.is_set()):
+            all_optimal = False
+            break
+        time_limit = remaining / (len(stage_costs) - k)
+        if stage_time_limits and tier in stage_time_limits:
+            time_limit = min(stage_time_limits[tier], remaining)
+        stage_model.col_cost = costs
+        floor = np.dot(costs, stage_model.col_lower) if (costs >= 0).all() else -np.inf
+        if best is not None and np.dot(costs, best.col_value) <= floor + TIER_TOLERANCE:
+            # The solution of the stage before already has the least value of this tier.
+            result = SolverResult(OPTIMAL, best.col_value, float(np.dot(costs, best.col_value)),
+                                  backend=stage_backend)
+        else:
+            stage_options = copy.copy(options)
+            stage_options.time_limit, stage_options.hint = time_limit, hint
+            stage_options.on_solution = None
+            result = solver_backends.BACKENDS[stage_backend](stage_model, stage_options)
+        stages.append({"tier": tier, "status": result.status, "objective": result.objective,
+                       "wall_time": round(result.wall_time, 3)})
+        if result.status == INFEASIBLE:
+            return SolverResult(INFEASIBLE, wall_time=time.time() - start,
+                                backend="lexicographic", stats={"stages": stages})
+        if not result.has_solution:
+            # No solution within the stage's time: the tier stays unbounded.
+            all_optimal = False
+            continue
+        all_optimal &= result.status == OPTIMAL
+        best, hint = result, result.col_value
+        objective = float(np.dot(model.col_cost, best.col_value)) + model.offset
+        logging.info(f"Lexicographic stage {tier}: {result.status}, tier objective "
+                     f"{result.objective:.0f}, objective {objective:.0f} "
+                     f"after {time.time() - start:.1f} s")
+        if options.on_solution:
+            options.on_solution(SolverResult(FEASIBLE, best.col_value, objective,
+                                             wall_time=time.time() - start,
+                                             backend="lexicographic"))
+
+        # Keep the tier at its value in the later stages.
+        value = float(np.dot(costs, best.col_value))
+        tolerance = TIER_TOLERANCE * max(1.0, abs(value))
+        if value <= floor + tolerance:
+            stage_model.col_upper = np.where(costs > 0, stage_model.col_lower,
+                                             stage_model.col_upper)
+        else:
+            # With integral costs the tier value is integral up to the solver's tolerances.
+            limit = value + tolerance
+            if np.all(costs == np.round(costs)):
+                limit = math.ceil(value - tolerance)
+            cols = np.flatnonzero(costs)
+            stage_model = model_builder.append_rows(stage_model, "lexicographic",
+                                                    [(cols, costs[cols], -np.inf, limit)])
+
+    if best is None:
+        return SolverResult(NOT_SOLVED, wall_time=time.time() - start, backend="lexicographic",
+                            stats={"stages": stages})
+    return SolverResult(
+        OPTIMAL if all_optimal else FEASIBLE,
+        col_value=best.col_value,
+        objective=float(np.dot(model.col_cost, best.col_value)) + model.offset,
+        wall_time=time.time() - start,
+        backend="lexicographic",
+        stats={"stages": stages},
+    )
@@ -0,0 +1,263 @@
+# lns.py
+"""
+Large neighborhood search (LNS) around the exact model.
+
+On big wards the full MIP does not close its gap within the time limit. LNS keeps an incumbent
+and improves one part of it at a time: a neighborhood of cells is freed, all other assignment
+columns are fixed to the incumbent, and the small sub-MIP is solved with a short time limit and
+the incumbent as hint, so it can only get better. The fixed columns are removed by presolve,
+so the size of a sub-MIP depends on the neighborhood, not on the ward.
+
+Neighborhoods (see NEIGHBORHOODS):
+  - "week": a random week for a random subset of the employees;
+  - "qualification": the employees of one qualification over the whole month;
+  - "violations": the employees and days (plus VIOLATION_WINDOW days on either side) of the
+    rows of the most expensive penalty columns of the incumbent.
+At most `size` employees are freed; the size grows while the sub-MIPs are solved to optimality
+and shrinks when they hit the time limit.
+
+Each round solves one neighborhood per worker process in parallel and keeps the best
+improvement. Registered as the "lns" backend: it reports every improvement through
+SolverOptions.on_solution and checks SolverOptions.stop between rounds.
+"""
+import copy
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import solver_backends
+from solver_backends import SolverOptions, SolverResult, OPTIMAL, FEASIBLE
+
+NEIGHBORHOODS = ("week", "qualification", "violations")
+SUB_BACKEND = "highs"
+SUB_TIME_LIMIT = 5.0
+# Time limit for the first solution of the full model when there is no usable hint.
+INITIAL_TIME_LIMIT = 30.0
+# Employees freed per neighborhood: initial value and bounds of the adaptive size.
+FREE_EMPLOYEES = 30
+MIN_FREE_EMPLOYEES = 5
+WEEK_DAYS = 7
+VIOLATION_WINDOW = 2
+# Penalty columns whose rows make up a "violations" neighborhood.
+MAX_VIOLATIONS = 3
+
+# Model of the worker processes, sent once when the pool starts (see _init_worker).
+_worker_model = None
+
+
+def cell_columns(model):
+    """Assignment columns per cell, shape (employees, dates, shifts + 1); -1 for none."""
+    return np.concatenate([model.x_index, model.y_index[:, :, None]], axis=2)
+
+
+def fix_outside(model, col_value, free):
+    """
+    Bounds that fix the assignment columns of all cells outside free to the solution.
+
+    Args:
+        model: The MatrixModel.
+        col_value: Solution vector of the model.
+        free: Boolean mask (employees × dates) of the cells left free.
+
+    Returns:
+        (col_lower, col_upper) arrays.
+    """
+    col_lower, col_upper = model.col_lower.copy(), model.col_upper.copy()
+    fixed = cell_columns(model)[~free]
+    fixed = fixed[fixed >= 0]
+    col_lower[fixed] = col_upper[fixed] = np.round(col_value[fixed])
+    return col_lower, col_upper
+
+
+# ------------------------------------------
+# Neighborhoods
+# ------------------------------------------
+def _planned_days(model):
+    """Indices of the dates that are not fixed history."""
+    return np.arange(model.day_offset, len(model.dates))
+
+
+def _limit(employees, size, rng):
+    """At most size of the employees, chosen at random."""
+    employees = np.asarray(employees)
+    if len(employees) > size:
+        employees = rng.choice(employees, size, replace=False)
+    return employees
+
+
+def week_neighborhood(model, col_value, size, rng):
+    """A random week of a random subset of the employees."""
+    days = _planned_days(model)
+    start = rng.integers(max(1, len(days) - WEEK_DAYS + 1))
+    free = np.zeros((len(model.employee_ids), len(model.dates)), dtype=bool)
+    employees = _limit(np.arange(len(model.employee_ids)), size, rng)
+    free[np.ix_(employees, days[start:start + WEEK_DAYS])] = True
+    return free
+
+
+def qualification_neighborhood(model, col_value, size, rng):
+    """The employees of a random qualification over the whole planning period."""
+    quals = np.array(model.qualifications, dtype=object)
+    qual = rng.choice(np.unique(quals.astype(str)))
+    free = np.zeros((len(model.employee_ids), len(model.dates)), dtype=bool)
+    employees = _limit(np.flatnonzero(quals.astype(str) == qual), size, rng)
+    free[np.ix_(employees, _planned_days(model))] = True
+    return free
+
+
+def violations_neighborhood(model, col_value, size, rng):
+    """
+    The cells in the rows of up to MAX_VIOLATIONS penalty columns of the incumbent, chosen with
+    probability proportional to their cost, widened by VIOLATION_WINDOW days.
+    """
+    cost = np.where(model.col_penalty >= 0, model.col_cost * col_value, 0.0)
+    violated = np.flatnonzero(cost > 1e-6)
+    if not len(violated):
+        return week_neighborhood(model, col_value, size, rng)
+    chosen = rng.choice(violated, min(MAX_VIOLATIONS, len(violated)), replace=False,
+                        p=cost[violated] / cost[violated].sum())
+    nz_row = np.repeat(np.arange(model.num_rows), np.diff(model.a_start))
+    rows = np.unique(nz_row[np.isin(model.a_index, chosen)])
+    cols = model.a_index[np.isin(nz_row, rows)]
+
+    cells = cell_columns(model)
+    e, d, _ = np.nonzero(np.isin(cells, cols) & (cells >= 0))
+    free = np.zeros((len(model.employee_ids), len(model.dates)), dtype=bool)
+    if not len(e):
+        return week_neighborhood(model, col_value, size, rng)
+    days = np.unique(d)
+    days = np.unique(np.clip((days[:, None] + np.arange(-VIOLATION_WINDOW, VIOLATION_WINDOW + 1))
+                             .ravel(), model.day_offset, len(model.dates) - 1))
+    free[np.ix_(_limit(np.unique(e), size, rng), days)] = True
+    return free
+
+
+NEIGHBORHOOD_FUNCTIONS = {
+    "week": week_neighborhood,
+    "qualification": qualification_neighborhood,
+    "violations": violations_neighborhood,
+}
+
+
+# ------------------------------------------
+# Sub-MIPs
+# ------------------------------------------
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _solve_sub_mip(args):
+    """Solves the model with new column bounds (in a worker, the model is _worker_model)."""
+    model, col_lower, col_upper, options = args
+    restricted = copy.copy(model if model is not None else _worker_model)
+    restricted.col_lower, restricted.col_upper = col_lower, col_upper
+    return solver_backends.BACKENDS[SUB_BACKEND](restricted, options)
+
+
+def initial_solution(model, options, deadline):
+    """
+    First incumbent: the hint completed by a sub-MIP with all hinted cells fixed, or else the
+    first solution of the full model within INITIAL_TIME_LIMIT.
+    """
+    if options.hint is not None:
+        hinted = cell_columns(model)
+        free = ~((hinted >= 0) & ~np.isnan(options.hint[np.maximum(hinted, 0)])).any(axis=2)
+        col_lower, col_upper = fix_outside(model, np.nan_to_num(options.hint), free)
+        result = _solve_sub_mip((model, col_lower, col_upper, SolverOptions(
+            time_limit=min(SUB_TIME_LIMIT, max(deadline - time.time(), 0.1)),
+            hint=options.hint)))
+        if result.has_solution:
+            return result
+        logging.info("LNS: hint is infeasible, solving the full model for a first solution")
+    # Stop at the first solution (or when the caller stops).
+    first = threading.Event()
+    sub_options = copy.copy(options)
+    sub_options.on_solution = lambda result: first.set()
+    sub_options.stop = first
+    sub_options.time_limit = min(INITIAL_TIME_LIMIT, max(deadline - time.time(), 0.1))
+    done = solver_backends._watch_stop(options.stop, first.set)
+    result = solver_backends.BACKENDS[SUB_BACKEND](model, sub_options)
+    done.set()
+    return result
+
+
+@solver_backends.register_backend("lns")
+def solve_lns(model, options=None, workers=None, neighborhoods=NEIGHBORHOODS,
+              sub_time_limit=SUB_TIME_LIMIT, seed=None):
+    """
+    Solves the model by large neighborhood search.
+
+    Args:
+        model: The MatrixModel.
+        options: SolverOptions. time_limit bounds the whole search, hint (e.g. a heuristic
+            schedule, see heuristic.py) gives the first incumbent.
+        workers: Neighborhoods solved in parallel per round (default: options.threads, or all
+            cores). With one worker the sub-MIPs are solved in this process.
+        neighborhoods: Names of the neighborhoods to use (see NEIGHBORHOOD_FUNCTIONS).
+        sub_time_limit: Time limit per sub-MIP in seconds.
+        seed: Random seed (default: options.seed).
+
+    Returns:
+        SolverResult with the best solution found; the bound is unknown.
+    """
+    options = options or SolverOptions()
+    start = time.time()
+    deadline = start + options.time_limit
+    rng = np.random.default_rng(options.seed if seed is None else seed)
+    workers = workers or options.threads or os.cpu_count() or 1
+
+    best = initial_solution(model, options, deadline)
+    if not best.has_solution:
+        return SolverResult(best.status, wall_time=time.time() - start, backend="lns")
+    if options.on_solution:
+        options.on_solution(SolverResult(FEASIBLE, best.col_value, best.objective,
+                                         wall_time=time.time() - start, backend="lns"))
+    size = min(FREE_EMPLOYEES, len(model.employee_ids))
+    rounds = 0
+    pool = None
+    if workers > 1:
+        # "spawn" keeps the workers independent of the (threaded) Streamlit process.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(model,))
+    try:
+        while time.time() < deadline - 0.1 and not (options.stop and options.stop.is_set()):
+            rounds += 1
+            sub_options = SolverOptions(
+                time_limit=min(sub_time_limit, max(deadline - time.time(), 0.1)),
+                threads=1 if pool else options.threads, hint=best.col_value)
+            kinds = [neighborhoods[(rounds * workers + i) % len(neighborhoods)]
+                     for i in range(workers)]
+            tasks = [(None if pool else model,
+                      *fix_outside(model, best.col_value,
+                                   NEIGHBORHOOD_FUNCTIONS[kind](model, best.col_value, size, rng)),
+                      sub_options)
+                     for kind in kinds]
+            results = list(pool.map(_solve_sub_mip, tasks)) if pool else [_solve_sub_mip(tasks[0])]
+
+            solved = [r for r in results if r.has_solution]
+            optimal = sum(r.status == OPTIMAL for r in solved)
+            if optimal == len(results):
+                size = min(len(model.employee_ids), int(size * 1.2) + 1)
+            elif not optimal:
+                size = max(MIN_FREE_EMPLOYEES, int(size * 0.8))
+            improved = min(solved, key=lambda r: r.objective, default=None)
+            if improved is not None and improved.objective < best.objective - 1e-6:
+                best = improved
+                logging.info(f"LNS round {rounds} ({', '.join(kinds)}): objective "
+                             f"{best.objective:.0f} after {time.time() - start:.1f} s")
+                if options.on_solution:
+                    options.on_solution(SolverResult(FEASIBLE, best.col_value, best.objective,
+                                                     wall_time=time.time() - start,
+                                                     backend="lns"))
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    logging.info(f"LNS: {rounds} rounds, objective {best.objective:.0f}")
+    return SolverResult(FEASIBLE, best.col_value, best.objective, wall_time=time.time() - start,
+                        backend="lns", stats={"rounds": rounds})
@@ -0,0 +1,752 @@
+# model_builder.py
+"""
+Bulk assembly of the scheduling MIP as sparse NumPy arrays.
+
+Instead of building one pywraplp expression per constraint, every constraint family is emitted
+as vectorized (row, column, coefficient) triplets over an integer variable index of
+employee × day × shift. The triplets are converted once into a row-wise (CSR) matrix that can
+be handed to a solver in bulk (see solver_backends.py).
+
+The model has the same feasible schedules and objective as the expression model in
+scheduler.build_reference_model. The consecutive-day, weekend and transition rows are
+formulated more compactly and at least as tightly (see `python benchmark.py formulation`).
+"""
+import calendar
+import copy
+import datetime
+import time
+import numpy as np
+
+from absence_index import AbsenceIndex, absence_mask, WORKDAY_CREDIT_TYPES
+from rules import (
+    PENALTIES, PENALTY_NAMES, REQUIRED_SHIFTS, SHIFT_CODES, SHIFT_COST_NAMES, BUERO_SHIFT,
+    EARLY_SHIFTS, LATE_SHIFTS, PURE_LATE_SHIFTS, SPLIT_SHIFTS, NO_EARLY_AFTER, ONLY_C_AFTER,
+    FACH_QUALIFICATIONS, LEHRLING_QUALIFICATIONS, SPLIT_SHIFT_QUALIFICATIONS,
+    MIN_EARLY_TOTAL_WEEKDAY, MIN_EARLY_TOTAL_WEEKEND, MIN_EARLY_FACH, MIN_LATE_TOTAL,
+    MIN_LATE_HF, MIN_B_DIENST, MAX_SPLIT_SHIFTS, MAX_CONSECUTIVE_DAYS, MAX_WEEKENDS,
+    MAX_WEEKENDS_AUSB2, BURO_DAYS_PER_MONTH,
+)
+
+NO_PENALTY = -1
+# Workable days whose worked/off pattern orders the employees of a class (see build_model).
+SYMMETRY_DAYS = 4
+
+
+class MatrixModel:
+    """
+    A mixed-integer model in row-wise sparse form.
+
+    Minimize col_cost · x + offset subject to row_lower <= A x <= row_upper and
+    col_lower <= x <= col_upper, where A is given by (a_start, a_index, a_value) and
+    col_integer marks the integer columns.
+
+    x_index[e, d, s] is the column of employee e working shift SHIFT_CODES[s] on dates[d],
+    or -1 if the shift is not assignable. y_index[e, d] is the column of the Bü Dienst of
+    employee e on dates[d], or -1. dates are the days of the month, preceded by day_offset
+    fixed history days and followed by any lookahead days; day n of the month is
+    dates[day_offset + n - 1]. qualifications[e] is the qualification of employee e.
+    build_profile lists the build time and the columns, rows and nonzeros added per stage of
+    build_model (see _Assembler.stage). penalties are the weights {penalty name: weight} the
+    objective of the penalized columns is computed with (see set_penalties).
+    """
+
+    def __init__(self, employee_ids, dates, x_index, y_index, col_lower, col_upper,
+                 col_penalty, col_integer, row_lower, row_upper, a_start, a_index, a_value,
+                 row_family, families, offset=0.0, penalties=None):
+        self.employee_ids = employee_ids
+        self.dates = dates
+        self.shift_codes = SHIFT_CODES
+        self.x_index = x_index
+        self.y_index = y_index
+        self.col_lower = col_lower
+        self.col_upper = col_upper
+        self.col_penalty = col_penalty
+        self.col_integer = col_integer
+        self.row_lower = row_lower
+        self.row_upper = row_upper
+        self.a_start = a_start
+        self.a_index = a_index
+        self.a_value = a_value
+        self.row_family = row_family
+        self.families = families
+        self.offset = offset
+        self.penalties = penalties or PENALTIES
+        self.col_cost = penalty_costs(col_penalty, self.penalties)
+        self.day_offset = 0
+        self.num_month_days = len(dates)
+        self.qualifications = [None] * len(employee_ids)
+        self.build_profile = []
+
+    @property
+    def num_cols(self):
+        return len(self.col_lower)
+
+    @property
+    def num_rows(self):
+        return len(self.row_lower)
+
+    @property
+    def num_nonzeros(self):
+        return len(self.a_index)
+
+    def rows_of_family(self, family):
+        """Indices of the rows that belong to a constraint family."""
+        return np.flatnonzero(self.row_family == self.families.index(family))
+
+
+def assignment_matrix(model, col_value):
+    """
+    Reads the assignments of the month days from a solution vector in bulk.
+
+    Returns:
+        Object array (employees × month days) with the shift code of every cell (including
+        BUERO_SHIFT) or None for a day off; row e is model.employee_ids[e], column d is day d + 1.
+    """
+    month_days = slice(model.day_offset, model.day_offset + model.num_month_days)
+    cell_cols = np.concatenate([model.x_index[:, month_days], model.y_index[:, month_days, None]],
+                               axis=2)
+    values = np.where(cell_cols >= 0, col_value[np.maximum(cell_cols, 0)], 0.0)
+    codes = np.array(list(model.shift_codes) + [BUERO_SHIFT] + [None], dtype=object)
+    chosen = np.where(values.max(axis=2) > 0.5, values.argmax(axis=2), len(codes) - 1)
+    return codes[chosen]
+
+
+def extract_schedule(model, col_value):
+    """
+    Reads the assignments from a solution vector.
+
+    Returns:
+        Dictionary {(employee_id, day): shift_code} with 1-based days.
+    """
+    matrix = assignment_matrix(model, col_value)
+    e, d = np.nonzero(matrix != None)  # noqa: E711 (element-wise comparison)
+    return {(model.employee_ids[e_idx], d_idx + 1): matrix[e_idx, d_idx]
+            for e_idx, d_idx in zip(e.tolist(), d.tolist())}
+
+
+def objective_breakdown(model, col_value):
+    """
+    Splits the objective value of a solution by penalty family.
+
+    Returns:
+        Dictionary {penalty name (see rules.PENALTY_NAMES): objective contribution}. Costs that
+        are not rule penalties (e.g. the change costs of a repair) are listed under "other".
+    """
+    weights = penalty_costs(model.col_penalty, model.penalties)
+    totals = np.bincount(model.col_penalty + 1, weights=weights * col_value,
+                         minlength=len(PENALTY_NAMES) + 1)
+    breakdown = {name: float(totals[i + 1]) for i, name in enumerate(PENALTY_NAMES)}
+    breakdown["other"] = float(model.col_cost @ col_value + model.offset - totals.sum())
+    return breakdown
+
+
+def set_penalties(model, penalties):
+    """
+    Returns a copy of the model with other objective weights. Only the objective coefficients
+    of the penalized columns change; costs of their own (e.g. of a repair) are kept.
+
+    Args:
+        model: The MatrixModel.
+        penalties: Dictionary {penalty name: weight} with all names (see rules.penalty_weights).
+    """
+    changed = copy.copy(model)
+    changed.penalties = penalties
+    changed.col_cost = (model.col_cost + penalty_costs(model.col_penalty, penalties)
+                        - penalty_costs(model.col_penalty, model.penalties))
+    return changed
+
+
+def append_rows(model, family, rows):
+    """
+    Returns a copy of the model with extra rows of a constraint family.
+
+    Args:
+        model: The MatrixModel.
+        family: Name of the constraint family of the new rows.
+        rows: List of (cols, vals, lower, upper) per row.
+    """
+    extended = copy.copy(model)
+    families = list(model.families)
+    if family not in families:
+        families.append(family)
+    counts = [len(cols) for cols, _, _, _ in rows]
+    extended.a_start = np.concatenate(
+        [model.a_start, model.a_start[-1] + np.cumsum(counts)]).astype(np.int32)
+    extended.a_index = np.concatenate(
+        [model.a_index] + [np.asarray(cols, dtype=np.int32) for cols, _, _, _ in rows])
+    extended.a_value = np.concatenate(
+        [model.a_value] + [np.broadcast_to(np.asarray(vals, dtype=np.float64), (count,))
+                           for (_, vals, _, _), count in zip(rows, counts)])
+    extended.row_lower = np.concatenate([model.row_lower, [lower for _, _, lower, _ in rows]])
+    extended.row_upper = np.concatenate([model.row_upper, [upper for _, _, _, upper in rows]])
+    extended.row_family = np.concatenate(
+        [model.row_family, np.full(len(rows), families.index(family), dtype=np.int16)])
+    extended.families = families
+    return extended
+
+
+def select_rows(model, rows):
+    """
+    Returns a copy of the model with only some of its rows.
+
+    Args:
+        model: The MatrixModel.
+        rows: Increasing row indices to keep.
+    """
+    counts = np.diff(model.a_start)[rows]
+    nonzeros = (np.repeat(model.a_start[rows] - np.cumsum(counts) + counts, counts)
+                + np.arange(int(counts.sum())))
+    selected = copy.copy(model)
+    selected.a_start = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+    selected.a_index = model.a_index[nonzeros]
+    selected.a_value = model.a_value[nonzeros]
+    selected.row_lower = model.row_lower[rows]
+    selected.row_upper = model.row_upper[rows]
+    selected.row_family = model.row_family[rows]
+    return selected
+
+
+def row_activity(model, col_value):
+    """Values A x of all rows for a solution vector."""
+    row_of_nonzero = np.repeat(np.arange(model.num_rows), np.diff(model.a_start))
+    return np.bincount(row_of_nonzero, weights=model.a_value * col_value[model.a_index],
+                       minlength=model.num_rows)
+
+
+def penalty_costs(col_penalty, penalties):
+    """Objective coefficients for columns tagged with an index into PENALTY_NAMES."""
+    weights = np.array([penalties[name] for name in PENALTY_NAMES] + [0.0], dtype=np.float64)
+    # NO_PENALTY (-1) picks the trailing zero weight.
+    return weights[col_penalty]
+
+
+class _Assembler:
+    """Collects columns and COO triplets per constraint family and builds the CSR matrix."""
+
+    def __init__(self):
+        self.num_cols = 0
+        self.num_rows = 0
+        self.num_nonzeros = 0
+        self.col_blocks = []   # (lower, upper, penalty, integer) arrays per block
+        self.families = []
+        self.row_blocks = []   # (family, rows, cols, vals, lower, upper) per block
+        self.profile = []
+        self._stage = None
+
+    def stage(self, name):
+        """
+        Starts a build stage and ends the previous one. Each stage records its time and the
+        columns, rows and nonzeros added during it in profile.
+        """
+        now = time.perf_counter()
+        if self._stage is not None:
+            entry = self._stage
+            entry["seconds"] = now - entry["seconds"]
+            entry["variables"] = self.num_cols - entry["variables"]
+            entry["rows"] = self.num_rows - entry["rows"]
+            entry["nonzeros"] = self.num_nonzeros - entry["nonzeros"]
+            self.profile.append(entry)
+        self._stage = None if name is None else {
+            "family": name, "seconds": now, "variables": self.num_cols,
+            "rows": self.num_rows, "nonzeros": self.num_nonzeros}
+
+    def add_cols(self, count, lower, upper, penalty=NO_PENALTY, integer=False):
+        """Adds `count` columns and returns their indices."""
+        self.col_blocks.append((
+            np.broadcast_to(np.asarray(lower, dtype=np.float64), (count,)),
+            np.broadcast_to(np.asarray(upper, dtype=np.float64), (count,)),
+            np.broadcast_to(np.asarray(penalty, dtype=np.int16), (count,)),
+            np.broadcast_to(np.asarray(integer, dtype=bool), (count,)),
+        ))
+        cols = np.arange(self.num_cols, self.num_cols + count)
+        self.num_cols += count
+        return cols
+
+    def add_rows(self, family, num_rows, rows, cols, vals, lower, upper):
+        """
+        Adds `num_rows` rows given as triplets with row numbers local to this block.
+        lower/upper are scalars or arrays of length num_rows.
+        """
+        if family not in self.families:
+            self.families.append(family)
+        self.num_rows += num_rows
+        self.num_nonzeros += len(rows)
+        self.row_blocks.append((
+            self.families.index(family),
+            num_rows,
+            np.asarray(rows, dtype=np.int64),
+            np.asarray(cols, dtype=np.int64),
+            np.broadcast_to(np.asarray(vals, dtype=np.float64), (len(rows),)),
+            np.broadcast_to(np.asarray(lower, dtype=np.float64), (num_rows,)),
+            np.broadcast_to(np.asarray(upper, dtype=np.float64), (num_rows,)),
+        ))
+
+    def finish(self, employee_ids, dates, x_index, y_index, penalties=None):
+        self.stage("matrix")
+        col_lower, col_upper, col_penalty, col_integer = (
+            np.concatenate([block[i] for block in self.col_blocks]) for i in range(4))
+
+        offset = 0
+        rows, cols, vals, row_lower, row_upper, row_family = [], [], [], [], [], []
+        for family, num_rows, r, c, v, lower, upper in self.row_blocks:
+            rows.append(r + offset)
+            cols.append(c)
+            vals.append(v)
+            row_lower.append(lower)
+            row_upper.append(upper)
+            row_family.append(np.full(num_rows, family, dtype=np.int16))
+            offset += num_rows
+        rows = np.concatenate(rows)
+        order = np.argsort(rows, kind="stable")
+        a_start = np.zeros(offset + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=offset), out=a_start[1:])
+
+        a_index = np.concatenate(cols)[order].astype(np.int32)
+        a_value = np.concatenate(vals)[order]
+
+        # The objective coefficients are computed by MatrixModel from the column penalties.
+        self.stage("objective")
+        model = MatrixModel(
+            employee_ids, dates, x_index, y_index,
+            col_lower, col_upper, col_penalty, col_integer,
+            np.concatenate(row_lower), np.concatenate(row_upper),
+            a_start, a_index, a_value, np.concatenate(row_family), list(self.families),
+            penalties=penalties)
+        self.stage(None)
+        model.build_profile = self.profile
+        return model
+
+
+def _shift_mask(codes):
+    return np.array([s in codes for s in SHIFT_CODES])
+
+
+def weekend_groups(dates):
+    """Groups consecutive weekend days (Saturday and Sunday) into 0-based day index lists."""
+    groups = []
+    d = 0
+    while d < len(dates):
+        weekday = dates[d].weekday()
+        if weekday >= 5:
+            group = [d]
+            # If day is Saturday and next day is Sunday, group them.
+            if weekday == 5 and d + 1 < len(dates) and dates[d + 1].weekday() == 6:
+                group.append(d + 1)
+            groups.append(group)
+            d = group[-1]
+        d += 1
+    return groups
+
+
+def group_requirements(is_fach, is_hf, min_early):
+    """
+    The group-level coverage requirements, each met with a penalized slack per day.
+
+    Args:
+        is_fach: Boolean array of the Fach employees.
+        is_hf: Boolean array of the HF employees.
+        min_early: Minimum early staff per planned day.
+
+    Returns:
+        Tuple of (shift codes, employee mask, requirement per day or scalar, sense, penalty
+        name). Sense 1 is a minimum, -1 a maximum.
+    """
+    everyone = np.ones(len(is_fach), dtype=bool)
+    return (
+        (EARLY_SHIFTS, everyone, min_early, 1, "EARLY_COVERAGE_PENALTY"),
+        (EARLY_SHIFTS, is_fach, MIN_EARLY_FACH, 1, "EARLY_FACH_PENALTY"),
+        (LATE_SHIFTS, everyone, MIN_LATE_TOTAL, 1, "LATE_COVERAGE_PENALTY"),
+        (LATE_SHIFTS, is_hf, MIN_LATE_HF, 1, "LATE_HF_PENALTY"),
+        # Soft constraint: prefer only one fachpersonal in pure late shifts.
+        (PURE_LATE_SHIFTS, is_fach, 1, -1, "EXTRA_FACH_LATE_PENALTY"),
+        (frozenset({"B Dienst"}), everyone, MIN_B_DIENST, 1, "B_DIENST_PENALTY"),
+    )
+
+
+def available_per_day(allowed, shift_codes, employee_mask):
+    """Number of employees of the mask that may work one of the shifts, per day of allowed."""
+    return (allowed[employee_mask][:, :, _shift_mask(shift_codes)].any(axis=2)).sum(axis=0)
+
+
+def shift_domain_mask(employee_quals, dates, absence_masks):
+    """
+    Vectorized counterpart of scheduler.build_shift_domains.
+
+    Returns:
+        Tuple (allowed, buero_allowed) of boolean arrays of shape (E, D, S) and (E, D).
+    """
+    quals = np.array(employee_quals, dtype=object)
+    is_leitung = quals == "Leitung"
+    is_lehrling = np.isin(quals, list(LEHRLING_QUALIFICATIONS))
+    may_split = np.isin(quals, list(SPLIT_SHIFT_QUALIFICATIONS))
+    weekend = np.array([day.weekday() >= 5 for day in dates], dtype=bool)
+    present = absence_masks == 0
+
+    shift_ok = np.ones((len(quals), len(SHIFT_CODES)), dtype=bool)
+    shift_ok[~may_split] &= ~_shift_mask(SPLIT_SHIFTS)
+    shift_ok[is_leitung] = _shift_mask({"B Dienst"})
+    shift_ok[is_lehrling] = _shift_mask({"B Dienst", "C Dienst"})
+
+    weekday_only = (is_leitung | is_lehrling)[:, None] & weekend[None, :]
+    day_ok = present & ~weekday_only
+    allowed = day_ok[:, :, None] & shift_ok[:, None, :]
+    buero_allowed = day_ok & is_leitung[:, None]
+    return allowed, buero_allowed
+
+
+def employee_classes(quals, target, credited, allowed, buero_allowed):
+    """
+    Groups interchangeable employees: same qualification, workload target, credited absence
+    days and assignable cells (so the same absences and history).
+
+    Returns:
+        List of arrays of employee indices, one per class with at least two members.
+    """
+    classes = {}
+    for e, qual in enumerate(quals):
+        key = (qual, target[e], credited[e], allowed[e].tobytes(), buero_allowed[e].tobytes())
+        classes.setdefault(key, []).append(e)
+    return [np.array(members) for members in classes.values() if len(members) > 1]
+
+
+def build_model(employees, absences, employee_qualifications, employee_workload, year, month,
+                ch_holidays, history=None, lookahead_days=0, symmetry_breaking=False,
+                penalties=None):
+    """
+    Assembles the scheduling MIP for one month as a MatrixModel.
+
+    With history and lookahead days the model covers more than the month (see rolling.py).
+    History days carry fixed assignments, so late-to-early transitions, consecutive-day windows
+    and weekends are checked across the month boundary. Lookahead days are planned along with
+    coverage, transitions and consecutive-day rules but without workload, Büro and monthly
+    limits, so the month does not end in a state that forces violations in the next month.
+
+    Args:
+        employees: List of employee dictionaries (id, qualifikation).
+        absences: Dictionary of employee absences (employee_id: [(date_str, type)]).
+        employee_qualifications: Dictionary of employee qualifications (employee_id: qualifikation).
+        employee_workload: Dictionary of employee target workloads (employee_id: target_days).
+        year: Year for the schedule.
+        month: Month for the schedule.
+        ch_holidays: List of holidays (as datetime.date objects).
+        history: Fixed assignments before the month {(employee_id, date): shift_code}. All days
+            from the earliest history date to the end of the previous month are added.
+        lookahead_days: Number of days of the following month planned along.
+        symmetry_breaking: Add rows ordering interchangeable employees (see employee_classes)
+            lexicographically by their first SYMMETRY_DAYS workable days. Off by default: CBC
+            closes the synthetic wards of `python benchmark.py symmetry` at the root node, so
+            the rows only add work there. Models used to repair a given schedule must not
+            have them, since a given schedule need not respect the order.
+        penalties: Objective weights {penalty name: weight} (default: rules.PENALTIES; see
+            rules.penalty_weights). They can be changed later with set_penalties.
+
+    Returns:
+        The MatrixModel.
+    """
+    num_days = calendar.monthrange(year, month)[1]
+    first = datetime.date(year, month, 1)
+    history = history or {}
+    history_days = max((first - date).days for _, date in history) if history else 0
+    dates = [first + datetime.timedelta(days=d)
+             for d in range(-history_days, num_days + lookahead_days)]
+    num_dates = len(dates)
+    employee_ids = [emp["id"] for emp in employees]
+    quals = [employee_qualifications.get(e_id) for e_id in employee_ids]
+    num_emp, num_shifts = len(employee_ids), len(SHIFT_CODES)
+
+    # Days that are planned (month and lookahead) and days of the month itself.
+    day_numbers = np.arange(num_dates)
+    planned = day_numbers >= history_days
+    in_month = planned & (day_numbers < history_days + num_days)
+    num_planned = num_dates - history_days
+
+    asm = _Assembler()
+    asm.stage("availability")
+    absence_index = AbsenceIndex(absences, dates)
+    absence_masks = absence_index.matrix(employee_ids)
+    credited = (((absence_masks & absence_mask(*WORKDAY_CREDIT_TYPES)) != 0) & in_month).sum(axis=1)
+
+    quals_arr = np.array(quals, dtype=object)
+    is_fach = np.isin(quals_arr, list(FACH_QUALIFICATIONS))
+    is_hf = quals_arr == "HF"
+    is_leitung = quals_arr == "Leitung"
+    is_ausb2 = quals_arr == "Ausbildung 2"
+    is_weekend = np.array([day.weekday() >= 5 for day in dates], dtype=bool)
+
+    # ------------------------------------------
+    # Variables: shift assignments over the pruned domain, then Bü Dienst.
+    # History days only have a column, fixed to 1, for the shift that was worked.
+    allowed, buero_allowed = shift_domain_mask(quals, dates, absence_masks)
+    allowed[:, ~planned] = False
+    buero_allowed[:, ~planned] = False
+    row_of = {e_id: e for e, e_id in enumerate(employee_ids)}
+    for (e_id, date), shift_code in history.items():
+        d = (date - first).days + history_days
+        if e_id in row_of and shift_code in SHIFT_CODES and 0 <= d < history_days:
+            allowed[row_of[e_id], d, SHIFT_CODES.index(shift_code)] = True
+    asm.stage("variables")
+    planned_cells = allowed & planned[None, :, None]
+    fixed_cells = allowed & ~planned[None, :, None]
+    x_index = np.full(allowed.shape, -1, dtype=np.int64)
+    x_penalty = np.array([PENALTY_NAMES.index(SHIFT_COST_NAMES[s]) for s in SHIFT_CODES])
+    x_penalty = np.broadcast_to(x_penalty, allowed.shape)[planned_cells]
+    x_index[planned_cells] = asm.add_cols(int(planned_cells.sum()), 0, 1, x_penalty, integer=True)
+    x_index[fixed_cells] = asm.add_cols(int(fixed_cells.sum()), 1, 1, integer=True)
+    y_index = np.full(buero_allowed.shape, -1, dtype=np.int64)
+    y_index[buero_allowed] = asm.add_cols(int(buero_allowed.sum()), 0, 1, integer=True)
+
+    worked_cells = allowed.any(axis=2)
+
+    def cells(mask):
+        """(e, d, s) indices and columns of all assignable cells selected by a boolean mask."""
+        e, d, s = np.nonzero(allowed & mask)
+        return e, d, s, x_index[e, d, s]
+
+    asm.stage("one_shift_per_day")
+    # ------------------------------------------
+    # Each employee can work at most one shift per day (Bü Dienst counts for Leitung).
+    per_cell = allowed.sum(axis=2) + buero_allowed
+    multi = per_cell > 1
+    cell_row = np.full(multi.shape, -1, dtype=np.int64)
+    cell_row[multi] = np.arange(int(multi.sum()))
+    e, d, _, cols = cells(multi[:, :, None])
+    ye, yd = np.nonzero(buero_allowed & multi)
+    asm.add_rows("one_shift_per_day", int(multi.sum()),
+                 np.concatenate([cell_row[e, d], cell_row[ye, yd]]),
+                 np.concatenate([cols, y_index[ye, yd]]), 1.0, -np.inf, 1.0)
+
+    asm.stage("leitung")
+    # ------------------------------------------
+    # Leitung: exactly BURO_DAYS_PER_MONTH Büro days per month.
+    leitung = np.flatnonzero(is_leitung)
+    leitung_row = np.full(num_emp, -1, dtype=np.int64)
+    leitung_row[leitung] = np.arange(len(leitung))
+    ye, yd = np.nonzero(buero_allowed & in_month)
+    asm.add_rows("leitung", len(leitung), leitung_row[ye], y_index[ye, yd], 1.0,
+                 BURO_DAYS_PER_MONTH, BURO_DAYS_PER_MONTH)
+
+    asm.stage("coverage")
+    # ------------------------------------------
+    # Coverage per planned day and shift: hard minimum and qualification minimums with slack.
+    # Rows of the per-day families are numbered by planned day, d - history_days.
+    # A slack is at least the shortfall of the employees who may work the shift at all
+    # (see capacity.py), which tightens the LP relaxation without changing the optimum.
+    planned_sel = planned[None, :, None]
+    for s, (shift_code, req) in enumerate(REQUIRED_SHIFTS.items()):
+        if req.get("optional", False):
+            continue
+        shift_sel = (np.arange(num_shifts) == s)[None, None, :] & planned_sel
+        e, d, _, cols = cells(shift_sel)
+        asm.add_rows("coverage", num_planned, d - history_days, cols, 1.0, req["total"], np.inf)
+        for key, emp_sel, penalty in (("fach", is_fach, "FACH_PENALTY"),
+                                      ("nonfach", ~is_fach, "NONFACH_PENALTY")):
+            if key not in req:
+                continue
+            e, d, _, cols = cells(shift_sel & emp_sel[:, None, None])
+            shortfall = np.maximum(
+                req[key] - available_per_day(allowed[:, planned], {shift_code}, emp_sel), 0)
+            slack = asm.add_cols(num_planned, shortfall, req[key], PENALTY_NAMES.index(penalty))
+            asm.add_rows("coverage", num_planned,
+                         np.concatenate([d - history_days, np.arange(num_planned)]),
+                         np.concatenate([cols, slack]), 1.0, req[key], np.inf)
+
+    asm.stage("group_coverage")
+    # ------------------------------------------
+    # Group-level early and late coverage with slack variables.
+    min_early = np.where(is_weekend[planned], MIN_EARLY_TOTAL_WEEKEND, MIN_EARLY_TOTAL_WEEKDAY)
+    for shift_set, emp_sel, required, sense, penalty in group_requirements(is_fach, is_hf,
+                                                                            min_early):
+        e, d, _, cols = cells(_shift_mask(shift_set)[None, None, :] & emp_sel[:, None, None]
+                              & planned_sel)
+        slack_upper = np.max(required) if sense > 0 else num_emp
+        slack_lower = 0
+        if sense > 0:
+            slack_lower = np.maximum(
+                required - available_per_day(allowed[:, planned], shift_set, emp_sel), 0)
+        slack = asm.add_cols(num_planned, slack_lower, slack_upper, PENALTY_NAMES.index(penalty))
+        rows = np.concatenate([d - history_days, np.arange(num_planned)])
+        cols = np.concatenate([cols, slack])
+        vals = np.concatenate([np.ones(len(d)), np.full(num_planned, float(sense))])
+        if sense > 0:
+            asm.add_rows("group_coverage", num_planned, rows, cols, vals, required, np.inf)
+        else:
+            asm.add_rows("group_coverage", num_planned, rows, cols, vals, -np.inf, required)
+
+    asm.stage("transitions")
+    # ------------------------------------------
+    # Late-to-Early Shift Transition Constraints:
+    # Only VS->C and C4->C transitions are allowed for late to early shifts. Since an employee
+    # works at most one shift per day, all forbidden pairs of one employee and day fit in two
+    # rows: sum of x[e, d, NO_EARLY_AFTER] + sum of x[e, d + 1, EARLY_SHIFTS] <= 1, and the
+    # same for ONLY_C_AFTER and the early shifts other than C Dienst. Pairs of two history days
+    # are fixed and skipped.
+    if num_dates > 1:
+        today = allowed[:, :-1, :] & (day_numbers[1:] >= history_days)[None, :, None]
+        tomorrow = allowed[:, 1:, :]
+        row_parts, col_parts, count = [], [], 0
+        for lates, earlies in ((NO_EARLY_AFTER, EARLY_SHIFTS),
+                               (ONLY_C_AFTER, EARLY_SHIFTS - {"C Dienst"})):
+            late_cells = today & _shift_mask(lates)
+            early_cells = tomorrow & _shift_mask(earlies)
+            pair = late_cells.any(axis=2) & early_cells.any(axis=2)
+            pair_row = np.full(pair.shape, -1, dtype=np.int64)
+            pair_row[pair] = np.arange(count, count + int(pair.sum()))
+            for shift_cells, days_after in ((late_cells, 0), (early_cells, 1)):
+                e, d, s = np.nonzero(shift_cells & pair[:, :, None])
+                row_parts.append(pair_row[e, d])
+                col_parts.append(x_index[e, d + days_after, s])
+            count += int(pair.sum())
+        asm.add_rows("transitions", count, np.concatenate(row_parts),
+                     np.concatenate(col_parts), 1.0, -np.inf, 1.0)
+
+    asm.stage("weekends")
+    # ------------------------------------------
+    # Weekend constraints: weekend_worked[e, w] is 1 if the employee works on any day of
+    # weekend group w. Limit worked weekends to MAX_WEEKENDS (MAX_WEEKENDS_AUSB2 for Ausbildung 2).
+    # A weekend belongs to the month of its first day: weekends starting in the lookahead are
+    # left to the next month, and a weekend that was already worked on a history day was
+    # counted in the previous month.
+    groups = [g for g in weekend_groups(dates)
+              if g[-1] >= history_days and g[0] < history_days + num_days]
+    if groups:
+        group_of_day = np.full(num_dates, -1, dtype=np.int64)
+        for w, group in enumerate(groups):
+            group_of_day[group] = w
+        can_work = np.stack([worked_cells[:, g].any(axis=1) for g in groups], axis=1)
+        carried = np.stack([worked_cells[:, [d for d in g if d < history_days]].any(axis=1)
+                            for g in groups], axis=1)
+        w_index = np.full(can_work.shape, -1, dtype=np.int64)
+        w_index[can_work] = asm.add_cols(int(can_work.sum()), 0, 1, integer=True)
+
+        # If any shift is assigned on a weekend day, then weekend_worked must be 1:
+        # sum_s x[e, d, s] <= weekend_worked[e, w], one row per employee and weekend day.
+        link = worked_cells & (group_of_day >= 0)[None, :]
+        link_row = np.full(link.shape, -1, dtype=np.int64)
+        link_row[link] = np.arange(int(link.sum()))
+        e, d, _, cols = cells(link[:, :, None])
+        le, ld = np.nonzero(link)
+        asm.add_rows("weekends", int(link.sum()),
+                     np.concatenate([link_row[e, d], link_row[le, ld]]),
+                     np.concatenate([cols, w_index[le, group_of_day[ld]]]),
+                     np.concatenate([np.ones(len(e)), -np.ones(len(le))]), -np.inf, 0.0)
+
+        limit = np.where(is_ausb2, MAX_WEEKENDS_AUSB2, MAX_WEEKENDS)
+        counted = can_work & ~carried
+        limited = counted.sum(axis=1) > limit
+        limited_row = np.full(num_emp, -1, dtype=np.int64)
+        limited_row[limited] = np.arange(int(limited.sum()))
+        e, w = np.nonzero(counted & limited[:, None])
+        asm.add_rows("weekends", int(limited.sum()), limited_row[e], w_index[e, w], 1.0,
+                     -np.inf, limit[limited])
+
+    asm.stage("lehrlinge")
+    # ------------------------------------------
+    # Lehrlinge with qualification "Ausbildung 2": at most one Sunday or Feiertag per month.
+    sunday_or_holiday = np.array([day.weekday() == 6 or day in ch_holidays for day in dates],
+                                 dtype=bool) & in_month
+    sel = allowed & is_ausb2[:, None, None] & sunday_or_holiday[None, :, None]
+    limited = sel.sum(axis=(1, 2)) > 1
+    limited_row = np.full(num_emp, -1, dtype=np.int64)
+    limited_row[limited] = np.arange(int(limited.sum()))
+    e, d, _, cols = cells(sel & limited[:, None, None])
+    asm.add_rows("lehrlinge", int(limited.sum()), limited_row[e], cols, 1.0, -np.inf, 1.0)
+
+    asm.stage("split_shifts")
+    # ------------------------------------------
+    # Split Shift Constraints: at most MAX_SPLIT_SHIFTS split shifts per day.
+    split_count = (allowed & _shift_mask(SPLIT_SHIFTS)).sum(axis=(0, 2))
+    limited = (split_count > MAX_SPLIT_SHIFTS) & planned
+    limited_row = np.full(num_dates, -1, dtype=np.int64)
+    limited_row[limited] = np.arange(int(limited.sum()))
+    e, d, _, cols = cells(_shift_mask(SPLIT_SHIFTS)[None, None, :] & limited[None, :, None])
+    asm.add_rows("split_shifts", int(limited.sum()), limited_row[d], cols, 1.0,
+                 -np.inf, MAX_SPLIT_SHIFTS)
+
+    asm.stage("consecutive")
+    # ------------------------------------------
+    # Consecutive Shift Constraints (soft): after MAX_CONSECUTIVE_DAYS worked days d..d+4, days
+    # d+5 and d+6 should be off; V[e, d] is 1 if the block is worked together with a rest day.
+    # With worked(d) = sum_s x[e, d, s], this is the AND of six worked days per rest day:
+    #   worked(d) + ... + worked(d+4) + worked(rest_day) - V <= 5.
+    # Blocks containing a day without any assignable shift can never be fully worked, blocks
+    # without an assignable rest day never pay. Blocks whose rest days are history days as well
+    # are fixed and skipped.
+    block = MAX_CONSECUTIVE_DAYS
+    if num_dates >= block:
+        windows = np.lib.stride_tricks.sliding_window_view(worked_cells, block, axis=1).all(axis=2)
+        windows[:, :max(history_days - block - 1, 0)] = False
+        we, wd = np.nonzero(windows)
+        rest_days = [wd + rest for rest in (block, block + 1)]
+        has_rest = []
+        for rest_day in rest_days:
+            ok = (rest_day < num_dates) & (rest_day >= history_days)
+            ok[ok] = worked_cells[we[ok], rest_day[ok]]
+            has_rest.append(ok)
+        keep = has_rest[0] | has_rest[1]
+        we, wd = we[keep], wd[keep]
+        v = asm.add_cols(len(we), 0, 1, PENALTY_NAMES.index("CONSECUTIVE_SHIFT_PENALTY"))
+
+        for rest_day, ok in zip(rest_days, has_rest):
+            idx = np.flatnonzero(ok[keep])
+            rows = np.arange(len(idx))
+            row_parts, col_parts = [rows], [v[idx]]
+            for day in [wd[idx] + k for k in range(block)] + [rest_day[keep][idx]]:
+                e, d, s = np.nonzero(allowed[we[idx], day][:, None, :])
+                row_parts.append(rows[e])
+                col_parts.append(x_index[we[idx][e], day[e], s])
+            row_parts, col_parts = np.concatenate(row_parts), np.concatenate(col_parts)
+            vals = np.ones(len(col_parts))
+            vals[:len(idx)] = -1.0
+            asm.add_rows("consecutive", len(idx), row_parts, col_parts, vals, -np.inf, float(block))
+
+    asm.stage("workload")
+    # ------------------------------------------
+    # Target Workday Constraints (soft): shifts + Bü + credited absences (Fe, SL)
+    # + under - over == target. Being under is penalized by WORKDAY_DEVIATION_PENALTY,
+    # any day over target by EXCESSIVE_WORKDAY_PENALTY.
+    target = np.array([employee_workload.get(e_id) or 0 for e_id in employee_ids], dtype=np.float64)
+    remaining = target - credited
+    assignable_days = ((worked_cells | buero_allowed) & in_month).sum(axis=1)
+    under = asm.add_cols(num_emp, 0, np.maximum(remaining, 0),
+                         PENALTY_NAMES.index("WORKDAY_DEVIATION_PENALTY"))
+    over = asm.add_cols(num_emp, 0, np.maximum(assignable_days - remaining, 0),
+                        PENALTY_NAMES.index("EXCESSIVE_WORKDAY_PENALTY"))
+    e, d, _, cols = cells(in_month[None, :, None])
+    ye, yd = np.nonzero(buero_allowed & in_month)
+    emp_rows = np.arange(num_emp)
+    asm.add_rows("workload", num_emp,
+                 np.concatenate([e, ye, emp_rows, emp_rows]),
+                 np.concatenate([cols, y_index[ye, yd], under, over]),
+                 np.concatenate([np.ones(len(e) + len(ye)), np.ones(num_emp), -np.ones(num_emp)]),
+                 remaining, remaining)
+
+    # ------------------------------------------
+    # Symmetry breaking: interchangeable employees are ordered lexicographically by their
+    # worked/off pattern on the first SYMMETRY_DAYS days they can work,
+    # sum_j 2^(L-1-j) worked[a, d_j] >= sum_j 2^(L-1-j) worked[b, d_j] for consecutive members
+    # a, b of a class. Any schedule can be relabeled to satisfy it, so the optimum is unchanged.
+    if symmetry_breaking:
+        asm.stage("symmetry")
+        row_parts, col_parts, val_parts = [], [], []
+        row = 0
+        for members in employee_classes(quals, target, credited, allowed, buero_allowed):
+            days = np.flatnonzero(worked_cells[members[0]] & planned)[:SYMMETRY_DAYS]
+            if not len(days):
+                continue
+            weights = 2.0 ** np.arange(len(days) - 1, -1, -1)
+            for a, b in zip(members, members[1:]):
+                for e, sign in ((a, 1.0), (b, -1.0)):
+                    d, s = np.nonzero(x_index[e, days] >= 0)
+                    row_parts.append(np.full(len(d), row))
+                    col_parts.append(x_index[e, days[d], s])
+                    val_parts.append(sign * weights[d])
+                row += 1
+        if row:
+            asm.add_rows("symmetry", row, np.concatenate(row_parts), np.concatenate(col_parts),
+                         np.concatenate(val_parts), 0.0, np.inf)
+
+    model = asm.finish(employee_ids, dates, x_index, y_index, penalties)
+    model.day_offset = history_days
+    model.num_month_days = num_days
+    model.qualifications = quals
+    return model
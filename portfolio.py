@@ -0,0 +1,116 @@
+# portfolio.py
+"""
+Portfolio solving: race several solver backends on the same model in parallel processes.
+
+Which solver wins differs from month to month, so instead of waiting for one solver to hit its
+time limit we start several and stop as soon as one of them proves optimality (or infeasibility)
+or reaches the target gap. If none does, the best incumbent found within the time limit wins.
+"""
+import copy
+import logging
+import multiprocessing
+import os
+import queue
+import time
+
+import solver_backends
+from solver_backends import SolverOptions, SolverResult, OPTIMAL, INFEASIBLE, NOT_SOLVED
+
+PORTFOLIO_BACKENDS = ("cbc", "highs", "cp-sat")
+
+# Extra time granted to the workers to report their incumbent after the time limit.
+REPORT_GRACE_SECONDS = 10.0
+
+
+def _race_worker(name, model, options, results):
+    try:
+        result = solver_backends.BACKENDS[name](model, options)
+    except Exception:
+        logging.exception(f"Backend {name} failed in portfolio")
+        result = SolverResult(NOT_SOLVED, backend=name)
+    results.put((name, result))
+
+
+def _is_conclusive(result, rel_gap):
+    """True if the result ends the race: proven optimal/infeasible or within the target gap."""
+    if result.status in (OPTIMAL, INFEASIBLE):
+        return True
+    gap = result.gap
+    return result.has_solution and rel_gap is not None and gap is not None and gap <= rel_gap
+
+
+def _better(result, best):
+    if not result.has_solution:
+        return best is None
+    return best is None or not best.has_solution or result.objective < best.objective
+
+
+def solve_portfolio(model, options=None, backends=PORTFOLIO_BACKENDS):
+    """
+    Solves the model with several backends in parallel processes and returns the first
+    conclusive result, or the best incumbent once all backends have finished.
+
+    Args:
+        model: The MatrixModel.
+        options: SolverOptions passed to every backend. options.rel_gap is the target gap;
+            options.threads (default: all cores) are shared evenly by the backends.
+            The portfolio does not report incumbents; if options.stop is set, the race ends with
+            the best result reported so far.
+        backends: Names of the backends to race.
+
+    Returns:
+        The SolverResult of the winning backend (result.backend names it).
+    """
+    options = options or SolverOptions()
+    start = time.time()
+    # "spawn" keeps the workers independent of the (threaded) Streamlit process.
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    # Callbacks and events of this process cannot be passed to the workers.
+    worker_options = copy.copy(options)
+    worker_options.on_solution = worker_options.stop = None
+    worker_options.threads = max(1, (options.threads or os.cpu_count() or 1) // len(backends))
+    processes = {
+        name: context.Process(target=_race_worker, args=(name, model, worker_options, results),
+                              daemon=True)
+        for name in backends
+    }
+    for process in processes.values():
+        process.start()
+
+    best = None
+    pending = set(processes)
+    deadline = start + options.time_limit + REPORT_GRACE_SECONDS
+    try:
+        while pending and time.time() < deadline and not (options.stop and options.stop.is_set()):
+            try:
+                name, result = results.get(timeout=0.2)
+            except queue.Empty:
+                # A worker that crashed never reports back.
+                for name in list(pending):
+                    if processes[name].exitcode not in (None, 0):
+                        logging.warning(f"Backend {name} exited with code {processes[name].exitcode}")
+                        pending.discard(name)
+                continue
+            pending.discard(name)
+            logging.info(f"Portfolio: {name} finished with {result.status} "
+                         f"(objective {result.objective}) after {time.time() - start:.1f} s")
+            if _better(result, best):
+                best = result
+            if _is_conclusive(result, options.rel_gap):
+                best = result
+                break
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in processes.values():
+            process.join(timeout=1.0)
+
+    if best is None:
+        best = SolverResult(NOT_SOLVED, backend="portfolio")
+    best.wall_time = time.time() - start
+    return best
+
+
+solver_backends.register_backend("portfolio")(solve_portfolio)
@@ -0,0 +1,207 @@
+# repair.py
+"""
+Incremental repair of a published schedule after sickness (Kr) or manual edits.
+
+Instead of re-planning the whole month, only a neighborhood of the changes is re-optimized:
+the affected days plus a few rest-window days around them, and the affected employees plus a
+limited set of candidates who can step in. All other cells are fixed to the current plan, and
+every changed cell costs REPAIR_CHANGE_PENALTY, so the repair keeps as much of the published
+schedule as possible. If the neighborhood is too small to find a feasible plan, it is widened
+to all employees and then to the whole month.
+"""
+import copy
+import logging
+import time
+
+import numpy as np
+
+import model_builder
+import solver_backends
+import warm_start
+from absence_index import AbsenceIndex
+from rules import BUERO_SHIFT, MIN_REST_AFTER_MAX, REPAIR_CHANGE_PENALTY
+
+# Days re-planned before and after each affected day.
+REPAIR_WINDOW_DAYS = MIN_REST_AFTER_MAX
+# Employees that may step in, in addition to the affected ones.
+MAX_CANDIDATES = 10
+REPAIR_BACKEND = "highs"
+# Total budget of a repair in seconds, shared by the widening attempts.
+REPAIR_TIME_LIMIT = 2.0
+
+
+class RepairResult:
+    """Outcome of a repair: the new schedule, which cells changed and how far it had to widen."""
+
+    def __init__(self, status, schedule=None, changed_cells=(), objective=None, scope=None,
+                 wall_time=0.0):
+        self.status = status
+        self.schedule = schedule
+        self.changed_cells = list(changed_cells)
+        self.objective = objective
+        self.scope = scope
+        self.wall_time = wall_time
+
+    @property
+    def has_solution(self):
+        return self.schedule is not None
+
+
+def merge_absences(absences, new_absences):
+    """Returns the absences with the new records (employee_id: [(date_str, type)]) added."""
+    merged = {e_id: list(records) for e_id, records in absences.items()}
+    for e_id, records in (new_absences or {}).items():
+        merged.setdefault(e_id, []).extend(records)
+    return merged
+
+
+def affected_cells(schedule, absence_index, locked):
+    """Cells of the schedule that conflict with an absence or differ from a locked value."""
+    cells = {(e_id, day) for (e_id, day) in schedule if absence_index.is_absent(e_id, day)}
+    cells.update(cell for cell, shift_code in locked.items() if schedule.get(cell) != shift_code)
+    return cells
+
+
+def select_candidates(model, schedule, qualifications, affected, days, max_candidates):
+    """
+    Affected employees plus up to max_candidates others who are free on most of the repair
+    days, preferring the qualifications of the affected employees.
+    """
+    affected_employees = {e_id for e_id, _ in affected}
+    affected_quals = {qualifications.get(e_id) for e_id in affected_employees}
+    ranked = []
+    for e, e_id in enumerate(model.employee_ids):
+        if e_id in affected_employees:
+            continue
+        free_days = sum(1 for day in days
+                        if (e_id, day) not in schedule
+                        and (model.x_index[e, day - 1] >= 0).any())
+        if free_days:
+            ranked.append((qualifications.get(e_id) not in affected_quals, -free_days, e_id))
+    ranked.sort()
+    return affected_employees | {e_id for _, _, e_id in ranked[:max_candidates]}
+
+
+def restrict_model(model, schedule, locked, employees, days):
+    """
+    Copies the model with all month cells outside employees × days fixed to the schedule,
+    locked cells fixed to their value, and a change penalty on the free cells. Lookahead days
+    of the model stay free.
+
+    A cell that is currently assigned costs REPAIR_CHANGE_PENALTY * (1 - x) for its current
+    shift, a cell that is currently free costs REPAIR_CHANGE_PENALTY * sum(x), which counts
+    every changed cell exactly once (at most one shift per day).
+    """
+    restricted = copy.copy(model)
+    col_lower = model.col_lower.copy()
+    col_upper = model.col_upper.copy()
+    col_cost = model.col_cost.copy()
+    offset = model.offset
+    current = warm_start.hint_from_schedule(model, schedule)
+    first = model.day_offset
+    month_days = np.zeros(len(model.dates), dtype=bool)
+    month_days[first:first + model.num_month_days] = True
+    free_days = np.zeros(len(model.dates), dtype=bool)
+    free_days[[first + day - 1 for day in days]] = True
+    free_cell = np.isin(model.employee_ids, list(employees))[:, None] & free_days[None, :]
+    fixed_cell = month_days[None, :] & ~free_cell
+
+    cell_cols = np.concatenate([model.x_index, model.y_index[:, :, None]], axis=2)
+    row_of = {e_id: e for e, e_id in enumerate(model.employee_ids)}
+    for (e_id, day), shift_code in locked.items():
+        e = row_of.get(e_id)
+        if e is None:
+            continue
+        d = first + day - 1
+        cols = cell_cols[e, d]
+        col_upper[cols[cols >= 0]] = 0.0
+        if shift_code is not None:
+            col = (model.y_index[e, d] if shift_code == BUERO_SHIFT
+                   else model.x_index[e, d, model.shift_codes.index(shift_code)])
+            if col < 0:
+                raise ValueError(f"Employee {e_id} cannot work {shift_code} on day {day}.")
+            col_lower[col] = col_upper[col] = 1.0
+        free_cell[e, d] = fixed_cell[e, d] = False
+
+    fixed = cell_cols[fixed_cell]
+    fixed = fixed[fixed >= 0]
+    col_lower[fixed] = col_upper[fixed] = current[fixed]
+
+    free = cell_cols[free_cell]
+    is_current = (free >= 0) & (current[free] == 1.0)
+    assigned = is_current.any(axis=1)
+    cols = free[is_current]
+    col_cost[cols] -= REPAIR_CHANGE_PENALTY
+    offset += REPAIR_CHANGE_PENALTY * len(cols)
+    cols = free[~assigned]
+    col_cost[cols[cols >= 0]] += REPAIR_CHANGE_PENALTY
+
+    restricted.col_lower = col_lower
+    restricted.col_upper = col_upper
+    restricted.col_cost = col_cost
+    restricted.offset = offset
+    return restricted
+
+
+def repair_schedule(employees, absences, employee_qualifications, employee_workload, year, month,
+                    ch_holidays, schedule, new_absences=None, locked=None,
+                    window=REPAIR_WINDOW_DAYS, max_candidates=MAX_CANDIDATES,
+                    backend=REPAIR_BACKEND, time_limit=REPAIR_TIME_LIMIT):
+    """
+    Repairs a schedule after new absences or manual edits.
+
+    Args:
+        employees, absences, employee_qualifications, employee_workload, year, month,
+        ch_holidays: As for scheduler.generate_schedule_highs; absences are the known absences.
+        schedule: The current schedule {(employee_id, day): shift_code}.
+        new_absences: New absences (employee_id: [(date_str, type)]), e.g. [("12.03.", "Kr")].
+        locked: Cells fixed by hand {(employee_id, day): shift_code or None for a day off}.
+        window: Days re-planned before and after each affected day.
+        max_candidates: Employees that may step in besides the affected ones.
+        backend: Name of the solver backend.
+        time_limit: Time limit of the whole repair in seconds. Each attempt gets an equal
+            share of the time left, so the time a narrow attempt does not use goes to the
+            wider ones.
+
+    Returns:
+        A RepairResult. result.scope is "neighborhood", "all employees" or "month" depending on
+        how far the re-planned area had to be widened.
+    """
+    start = time.time()
+    locked = dict(locked or {})
+    absences = merge_absences(absences, new_absences)
+    model = model_builder.build_model(employees, absences, employee_qualifications,
+                                      employee_workload, year, month, ch_holidays)
+    index = AbsenceIndex.for_month(absences, year, month)
+    affected = affected_cells(schedule, index, locked)
+    num_days = len(model.dates)
+    if not affected:
+        return RepairResult(solver_backends.OPTIMAL, dict(schedule), scope="none",
+                            wall_time=time.time() - start)
+
+    days = sorted({d for _, day in affected
+                   for d in range(max(1, day - window), min(num_days, day + window) + 1)})
+    candidates = select_candidates(model, schedule, employee_qualifications, affected, days,
+                                   max_candidates)
+    all_employees = set(model.employee_ids)
+    attempts = [("neighborhood", candidates, days),
+                ("all employees", all_employees, days),
+                ("month", all_employees, range(1, num_days + 1))]
+
+    hint = warm_start.hint_from_schedule(model, schedule)
+    deadline = start + time_limit
+    result = None
+    for attempt, (scope, scope_employees, scope_days) in enumerate(attempts):
+        restricted = restrict_model(model, schedule, locked, scope_employees, scope_days)
+        share = max(0.0, deadline - time.time()) / (len(attempts) - attempt)
+        options = solver_backends.SolverOptions(time_limit=share, hint=hint)
+        result = solver_backends.BACKENDS[backend](restricted, options)
+        logging.info(f"Repair ({scope}, {len(scope_employees)} employees, {len(scope_days)} days): "
+                     f"{result.status}, objective {result.objective}, {result.wall_time:.2f} s")
+        if result.has_solution:
+            repaired = model_builder.extract_schedule(model, result.col_value)
+            changed = sorted(cell for cell in set(schedule) | set(repaired)
+                             if schedule.get(cell) != repaired.get(cell))
+            return RepairResult(result.status, repaired, changed, result.objective, scope,
+                                time.time() - start)
+    return RepairResult(result.status, scope="month", wall_time=time.time() - start)
@@ -0,0 +1,284 @@
+# rolling.py
+"""
+Rolling-horizon planning over several months.
+
+Each month is solved with a short lookahead into the next month and the last days of the
+previous month as fixed history (model_builder.build_model(history=..., lookahead_days=...)),
+then frozen. The boundary state carried from month to month is the tail of the frozen plan:
+it determines the worked-day streak, the last shift before the 1st and whether a weekend
+spanning the boundary was already worked. It also counts the weekends of the frozen month: a
+weekend spanning the boundary belongs to the month of its first day (as in model_builder), so
+its Sunday the 1st must stay free if that month has no weekend left.
+
+Months can also be solved in parallel: all months are first solved independently (each with
+its lookahead), then stitched in order. Months without boundary conflicts are kept as they
+are. In a month whose plan conflicts with the frozen end of the previous month only the first
+STITCH_DAYS are re-planned against that history (see repair.restrict_model); the month is
+re-solved completely only if that fails.
+"""
+import datetime
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import model_builder
+import repair
+import solver_backends
+import warm_start
+from rules import (
+    SHIFT_CODES, EARLY_SHIFTS, NO_EARLY_AFTER, ONLY_C_AFTER, MAX_CONSECUTIVE_DAYS,
+    MIN_REST_AFTER_MAX, MAX_WEEKENDS, MAX_WEEKENDS_AUSB2,
+)
+
+# Days of the previous month that can still affect the rules of the next month: a block of
+# MAX_CONSECUTIVE_DAYS followed by MIN_REST_AFTER_MAX rest days, of which the last lies in the
+# new month.
+HISTORY_DAYS = MAX_CONSECUTIVE_DAYS + MIN_REST_AFTER_MAX - 1
+LOOKAHEAD_DAYS = 7
+# Days at the start of a month re-planned when stitching it to the previous month.
+STITCH_DAYS = MAX_CONSECUTIVE_DAYS + MIN_REST_AFTER_MAX
+
+
+class BoundaryState:
+    """
+    State carried across a month boundary: the assignments of the last HISTORY_DAYS days and
+    the weekends worked in the previous month.
+
+    Args:
+        tail: Dictionary {(employee_id, date): shift_code}.
+        last_date: Last day of the previous month.
+        weekends: Dictionary {employee_id: weekends worked in the previous month}.
+    """
+
+    def __init__(self, tail, last_date, weekends=None):
+        self.tail = tail
+        self.last_date = last_date
+        self.weekends = weekends or {}
+
+    @classmethod
+    def from_schedule(cls, schedule, year, month, days=HISTORY_DAYS):
+        """
+        Takes the last days and the worked weekends of a month schedule
+        {(employee_id, day): shift_code}.
+        """
+        last_date = next_month_start(year, month) - datetime.timedelta(days=1)
+        first_day = last_date.day - days + 1
+        tail = {(e_id, datetime.date(year, month, int(day))): shift_code
+                for (e_id, day), shift_code in schedule.items() if int(day) >= first_day}
+        dates = [datetime.date(year, month, day) for day in range(1, last_date.day + 1)]
+        weekends = {}
+        for group in model_builder.weekend_groups(dates):
+            for e_id in {e_id for (e_id, day), shift_code in schedule.items()
+                         if int(day) - 1 in group and shift_code in SHIFT_CODES}:
+                weekends[e_id] = weekends.get(e_id, 0) + 1
+        return cls(tail, last_date, weekends)
+
+    def worked(self, e_id, date):
+        return self.tail.get((e_id, date)) in SHIFT_CODES
+
+    def trailing_streak(self, e_id):
+        """Number of consecutive worked days up to and including the last day."""
+        streak = 0
+        while self.worked(e_id, self.last_date - datetime.timedelta(days=streak)):
+            streak += 1
+        return streak
+
+    def last_shift(self, e_id):
+        """Shift worked on the last day, or None."""
+        return self.tail.get((e_id, self.last_date))
+
+    def sunday_closed(self, e_id, qualification):
+        """
+        True if the employee must not work the 1st: it is the Sunday of a weekend that belongs
+        to the previous month, which already has the employee's limit of weekends without its
+        Saturday.
+        """
+        if self.last_date.weekday() != 5 or self.worked(e_id, self.last_date):
+            return False
+        limit = MAX_WEEKENDS_AUSB2 if qualification == "Ausbildung 2" else MAX_WEEKENDS
+        return self.weekends.get(e_id, 0) >= limit
+
+
+def next_month_start(year, month):
+    return datetime.date(year + 1, 1, 1) if month == 12 else datetime.date(year, month + 1, 1)
+
+
+def close_boundary_weekend(model, state, employee_qualifications):
+    """Fixes the 1st of the model's month off for the employees of state.sunday_closed."""
+    for e, e_id in enumerate(model.employee_ids):
+        if state.sunday_closed(e_id, employee_qualifications.get(e_id)):
+            cols = model.x_index[e, model.day_offset]
+            model.col_upper[cols[cols >= 0]] = 0.0
+
+
+def boundary_conflicts(state, schedule, employee_qualifications=None):
+    """
+    Employees whose month schedule {(employee_id, day): shift_code} breaks a rule together with
+    the boundary state: a forbidden late-to-early transition into the 1st, a block of
+    MAX_CONSECUTIVE_DAYS worked days across the boundary followed by a worked rest day, or a
+    worked Sunday the 1st that takes the previous month over its weekend limit.
+    """
+    employee_qualifications = employee_qualifications or {}
+    window = MAX_CONSECUTIVE_DAYS + MIN_REST_AFTER_MAX
+    conflicts = set()
+    for e_id in {e_id for e_id, _ in state.tail} | {e_id for e_id, _ in schedule}:
+        last = state.last_shift(e_id)
+        first = schedule.get((e_id, 1))
+        if first in EARLY_SHIFTS and (last in NO_EARLY_AFTER
+                                      or (last in ONLY_C_AFTER and first != "C Dienst")):
+            conflicts.add(e_id)
+            continue
+        if first in SHIFT_CODES and state.sunday_closed(e_id, employee_qualifications.get(e_id)):
+            conflicts.add(e_id)
+            continue
+        # Worked flags from HISTORY_DAYS before the boundary to `window` days after it.
+        worked = [state.worked(e_id, state.last_date - datetime.timedelta(days=k))
+                  for k in range(HISTORY_DAYS - 1, -1, -1)]
+        worked += [schedule.get((e_id, day)) in SHIFT_CODES for day in range(1, window + 1)]
+        for start in range(HISTORY_DAYS - MAX_CONSECUTIVE_DAYS + 1):
+            # Blocks that are entirely in the new month were checked by its own model.
+            if all(worked[start:start + MAX_CONSECUTIVE_DAYS]) and any(
+                    worked[start + MAX_CONSECUTIVE_DAYS:start + window]):
+                conflicts.add(e_id)
+                break
+    return conflicts
+
+
+class MonthPlan:
+    """Frozen plan of one month of the horizon."""
+
+    def __init__(self, year, month, status, schedule=None, objective=None, wall_time=0.0,
+                 resolved=False):
+        self.year = year
+        self.month = month
+        self.status = status
+        self.schedule = schedule
+        self.objective = objective
+        self.wall_time = wall_time
+        # True if the month had to be re-solved against the frozen previous month.
+        self.resolved = resolved
+
+
+def solve_month(employees, absences, employee_qualifications, employee_workload, year, month,
+                ch_holidays, state=None, lookahead_days=LOOKAHEAD_DAYS, backend=None,
+                time_limit=60.0, hint=None):
+    """
+    Solves one month with lookahead and the boundary state as history.
+
+    Returns:
+        A MonthPlan; its schedule covers the days of the month only.
+    """
+    start = time.time()
+    model = model_builder.build_model(employees, absences, employee_qualifications,
+                                      employee_workload, year, month, ch_holidays,
+                                      history=state.tail if state else None,
+                                      lookahead_days=lookahead_days)
+    if state:
+        close_boundary_weekend(model, state, employee_qualifications)
+    options = solver_backends.SolverOptions(time_limit=time_limit)
+    if hint:
+        options.hint = warm_start.hint_from_schedule(model, hint)
+    result = solver_backends.BACKENDS[backend or solver_backends.DEFAULT_BACKEND](model, options)
+    if not result.has_solution:
+        return MonthPlan(year, month, result.status, wall_time=time.time() - start)
+    return MonthPlan(year, month, result.status,
+                     model_builder.extract_schedule(model, result.col_value),
+                     result.objective, time.time() - start)
+
+
+def stitch_month(employees, absences, employee_qualifications, employee_workload, plan,
+                 ch_holidays, state, lookahead_days=LOOKAHEAD_DAYS, backend=None,
+                 time_limit=60.0):
+    """
+    Re-plans the first STITCH_DAYS of an independently solved month against the boundary
+    state, changing as few cells as possible. Falls back to re-solving the whole month.
+
+    Returns:
+        A MonthPlan with resolved set.
+    """
+    start = time.time()
+    year, month = plan.year, plan.month
+    model = model_builder.build_model(employees, absences, employee_qualifications,
+                                      employee_workload, year, month, ch_holidays,
+                                      history=state.tail, lookahead_days=lookahead_days)
+    close_boundary_weekend(model, state, employee_qualifications)
+    restricted = repair.restrict_model(model, plan.schedule, {}, model.employee_ids,
+                                       range(1, min(STITCH_DAYS, model.num_month_days) + 1))
+    options = solver_backends.SolverOptions(time_limit=time_limit,
+                                            hint=warm_start.hint_from_schedule(model, plan.schedule))
+    result = solver_backends.BACKENDS[backend or solver_backends.DEFAULT_BACKEND](restricted, options)
+    if result.has_solution:
+        stitched = MonthPlan(year, month, result.status,
+                             model_builder.extract_schedule(model, result.col_value),
+                             float(model.col_cost @ result.col_value + model.offset),
+                             time.time() - start, resolved=True)
+    else:
+        stitched = solve_month(employees, absences, employee_qualifications, employee_workload,
+                               year, month, ch_holidays, state=state, lookahead_days=lookahead_days,
+                               backend=backend, time_limit=time_limit, hint=plan.schedule)
+        stitched.resolved = True
+    return stitched
+
+
+def _solve_month_task(args):
+    return solve_month(*args[0], **args[1])
+
+
+def plan_horizon(employees, absences, employee_qualifications, employee_workload, year, month,
+                 num_months, ch_holidays, initial_state=None, lookahead_days=LOOKAHEAD_DAYS,
+                 backend=None, time_limit=60.0, workers=1):
+    """
+    Plans num_months consecutive months starting with year/month.
+
+    Args:
+        employees, absences, employee_qualifications, employee_workload: As for
+            scheduler.generate_schedule_highs; the workload is the target per month.
+        year: Year of the first month.
+        month: First month.
+        num_months: Number of months to plan.
+        ch_holidays: Holidays of all years of the horizon.
+        initial_state: BoundaryState of the month before the horizon (e.g. the published
+            schedule), or None.
+        lookahead_days: Days of the following month planned along with each month.
+        backend: Name of the solver backend (default: solver_backends.DEFAULT_BACKEND).
+        time_limit: Time limit per month solve in seconds.
+        workers: Number of months solved in parallel. With 1 worker the months are solved one
+            after the other, each with the frozen previous month as history.
+
+    Returns:
+        List of MonthPlan, one per month. Planning stops at the first month without solution.
+    """
+    months = []
+    y, m = year, month
+    for _ in range(num_months):
+        months.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    data = (employees, absences, employee_qualifications, employee_workload)
+    settings = {"lookahead_days": lookahead_days, "backend": backend, "time_limit": time_limit}
+
+    independent = {}
+    if workers > 1:
+        # "spawn" keeps the workers independent of the (threaded) Streamlit process.
+        context = multiprocessing.get_context("spawn")
+        tasks = [((*data, y, m, ch_holidays), dict(settings, state=initial_state if i == 0 else None))
+                 for i, (y, m) in enumerate(months)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for (y, m), plan in zip(months, pool.map(_solve_month_task, tasks)):
+                independent[(y, m)] = plan
+
+    plans = []
+    state = initial_state
+    for i, (y, m) in enumerate(months):
+        plan = independent.get((y, m))
+        if plan is None or plan.schedule is None:
+            plan = solve_month(*data, y, m, ch_holidays, state=state, **settings)
+        elif i > 0 and state and boundary_conflicts(state, plan.schedule, employee_qualifications):
+            plan = stitch_month(*data, plan, ch_holidays, state, **settings)
+        logging.info(f"Horizon {y}-{m:02d}: {plan.status}, objective {plan.objective}, "
+                     f"{plan.wall_time:.1f} s{' (stitched)' if plan.resolved else ''}")
+        plans.append(plan)
+        if plan.schedule is None:
+            break
+        state = BoundaryState.from_schedule(plan.schedule, y, m)
+    return plans
@@ -0,0 +1,164 @@
+# rules.py
+# Scheduling rules shared by the model builders, the solver backends and the app.
+
+# ------------------------------------------
+# Penalty Definitions
+# ------------------------------------------
+# Qualification Requirements (Highest Priority)
+FACH_PENALTY = 5000          # Penalty for not meeting Fachkraft (HF/Leitung) requirements
+EARLY_FACH_PENALTY = 5000    # Penalty for not having a Fachkraft in early shifts
+LATE_HF_PENALTY = 5000       # Penalty for not having an HF in late shifts
+
+# Coverage Requirements (High Priority)
+EARLY_COVERAGE_PENALTY = 4000  # Penalty for not meeting minimum early shift coverage (5 employees)
+LATE_COVERAGE_PENALTY = 4000   # Penalty for not meeting minimum late shift coverage (3 employees)
+
+# Shift Requirements (Medium-High Priority)
+NONFACH_PENALTY = 3000       # Penalty for not meeting non-Fachkraft requirements
+B_DIENST_PENALTY = 3000      # Penalty for not meeting B Dienst minimum requirements (2 employees)
+
+# Workload Violations (Medium Priority)
+EXCESSIVE_WORKDAY_PENALTY = 2000  # Penalty for working any days over target
+
+# Shift Pattern Violations (Medium-Low Priority)
+CONSECUTIVE_SHIFT_PENALTY = 1000  # Penalty for violating consecutive shift rules (5 days max)
+
+# Target Workday Deviations (Low Priority)
+WORKDAY_DEVIATION_PENALTY = 100   # Penalty for deviating from target workdays (under only)
+
+# Shift Preference Penalties (Low Priority)
+EXTRA_FACH_LATE_PENALTY = 50  # Penalty for having more than one fachpersonal in late shifts
+
+# Regular Assignment Costs (Shift Preferences)
+EARLY_SHIFT_COST = 1         # Base cost for early shifts (B Dienst, C Dienst)
+LATE_SHIFT_COST = 3          # Higher cost for late shifts (S Dienst, VS Dienst) to prefer early shifts
+SPLIT_SHIFT_COST = 5         # Highest cost for split shifts (BS Dienst, C4 Dienst)
+
+# Names of all objective weights. Model columns refer to their weight by position in this
+# tuple, so the order must not change.
+PENALTY_NAMES = (
+    "FACH_PENALTY",
+    "EARLY_FACH_PENALTY",
+    "LATE_HF_PENALTY",
+    "EARLY_COVERAGE_PENALTY",
+    "LATE_COVERAGE_PENALTY",
+    "NONFACH_PENALTY",
+    "B_DIENST_PENALTY",
+    "EXCESSIVE_WORKDAY_PENALTY",
+    "CONSECUTIVE_SHIFT_PENALTY",
+    "WORKDAY_DEVIATION_PENALTY",
+    "EXTRA_FACH_LATE_PENALTY",
+    "EARLY_SHIFT_COST",
+    "LATE_SHIFT_COST",
+    "SPLIT_SHIFT_COST",
+)
+PENALTIES = {name: globals()[name] for name in PENALTY_NAMES}
+
+
+def penalty_weights(overrides=None):
+    """
+    The objective weights with some of them changed, e.g. to try out trade-offs (tuning.py).
+
+    Args:
+        overrides: Dictionary {penalty name (see PENALTY_NAMES): weight}.
+
+    Returns:
+        Dictionary {penalty name: weight} with an entry for every name in PENALTY_NAMES.
+    """
+    weights = dict(PENALTIES)
+    for name, weight in (overrides or {}).items():
+        if name not in weights:
+            raise ValueError(f"Unknown penalty {name!r}")
+        if weight < 0:
+            raise ValueError(f"Penalty {name} must not be negative, got {weight}")
+        weights[name] = weight
+    return weights
+
+# Priority tiers of the objective, highest first, for lexicographic solving (lexicographic.py):
+# each tier is minimized with the optima of the tiers before it fixed. Every penalty name is in
+# exactly one tier.
+PRIORITY_TIERS = (
+    ("qualification", ("FACH_PENALTY", "EARLY_FACH_PENALTY", "LATE_HF_PENALTY")),
+    ("coverage", ("EARLY_COVERAGE_PENALTY", "LATE_COVERAGE_PENALTY")),
+    ("shift_minimums", ("NONFACH_PENALTY", "B_DIENST_PENALTY")),
+    ("workload", ("EXCESSIVE_WORKDAY_PENALTY", "WORKDAY_DEVIATION_PENALTY")),
+    ("patterns", ("CONSECUTIVE_SHIFT_PENALTY",)),
+    ("preferences", ("EXTRA_FACH_LATE_PENALTY", "EARLY_SHIFT_COST", "LATE_SHIFT_COST",
+                     "SPLIT_SHIFT_COST")),
+)
+
+# ------------------------------------------
+# Minimum Requirements
+# ------------------------------------------
+# Early Shift Requirements
+MIN_EARLY_TOTAL_WEEKDAY = 5    # Minimum total staff in early shifts on weekdays
+MIN_EARLY_TOTAL_WEEKEND = 5    # Minimum total staff in early shifts on weekends
+MIN_EARLY_FACH = 1           # Minimum Fachkraft required in early shifts
+
+# Late Shift Requirements
+MIN_LATE_TOTAL = 3           # Minimum total staff in late shifts
+MIN_LATE_HF = 1              # Minimum HF required in late shifts
+
+# Individual Shift Requirements
+MIN_B_DIENST = 2             # Minimum staff in B Dienst
+MAX_SPLIT_SHIFTS = 3         # Maximum split shifts per day
+
+# Workload Requirements
+MAX_CONSECUTIVE_DAYS = 5     # Maximum consecutive working days
+MIN_REST_AFTER_MAX = 2       # Minimum rest days after max consecutive days
+MAX_WEEKENDS = 2             # Maximum weekends per month per employee
+MAX_WEEKENDS_AUSB2 = 1       # Maximum weekends per month for Ausbildung 2
+
+# Büro Requirements
+BURO_DAYS_PER_MONTH = 4      # Required Büro days per month for Leitung
+
+# ------------------------------------------
+# Repair
+# ------------------------------------------
+# Penalty per changed cell of a published schedule when repairing it (see repair.py). Above the
+# workday deviation, below the rule violations: a repair changes cells rather than breaking rules.
+REPAIR_CHANGE_PENALTY = 200
+
+# ------------------------------------------
+# Shifts and Qualifications
+# ------------------------------------------
+# Define the required shifts and their counts along with qualification restrictions.
+# For each shift code, we specify:
+#   - "total": total number of assignments per day.
+#   - "fach": number of employees required with fach (qualified) for that shift.
+#   - "nonfach": number of employees required from non‑fach group.
+REQUIRED_SHIFTS = {
+    "B Dienst": {"total": 3, "fach": 1, "nonfach": 2},  # 1 fach + 2 non-fach
+    "C Dienst": {"total": 1, "fach": 0, "nonfach": 1},  # 1 non-fach
+    "S Dienst": {"total": 2, "fach": 1, "nonfach": 1},  # 1 fach + 1 non-fach
+    "VS Dienst": {"total": 1},  # No qualification restrictions
+    "BS Dienst": {"total": 0, "optional": True},  # Split shift (optional)
+    "C4 Dienst": {"total": 0, "optional": True}   # Split shift (optional)
+}
+SHIFT_CODES = tuple(REQUIRED_SHIFTS)
+BUERO_SHIFT = "Bü Dienst"        # Office shift, only for Leitung
+
+EARLY_SHIFTS = {"B Dienst", "C Dienst", "BS Dienst", "C4 Dienst"}
+LATE_SHIFTS = {"S Dienst", "VS Dienst", "BS Dienst", "C4 Dienst"}
+PURE_LATE_SHIFTS = {"S Dienst", "VS Dienst"}  # Late shifts without split shifts
+SPLIT_SHIFTS = {"BS Dienst", "C4 Dienst"}
+
+# Cost of a regular assignment by shift code.
+SHIFT_COST_NAMES = {
+    "B Dienst": "EARLY_SHIFT_COST",
+    "C Dienst": "EARLY_SHIFT_COST",
+    "S Dienst": "LATE_SHIFT_COST",
+    "VS Dienst": "LATE_SHIFT_COST",
+    "BS Dienst": "SPLIT_SHIFT_COST",
+    "C4 Dienst": "SPLIT_SHIFT_COST",
+}
+
+# Late shifts after which no early shift may follow the next day, and late shifts after which
+# only C Dienst may follow (VS->C and C4->C are the only allowed late-to-early transitions).
+NO_EARLY_AFTER = ("S Dienst", "BS Dienst")
+ONLY_C_AFTER = ("VS Dienst", "C4 Dienst")
+
+# Define which qualifications count as fach (qualified).
+FACH_QUALIFICATIONS = {"HF", "Leitung"}
+LEHRLING_QUALIFICATIONS = {"Ausbildung 1", "Ausbildung 2"}
+SPLIT_SHIFT_QUALIFICATIONS = {"PH", "HF"}
@@ -1,15 +1,186 @@
 import calendar
 from ortools.linear_solver import pywraplp
 import datetime
-
-# Global variable used by app.py to extract the solution.
-variable_names = []
+import json
+import numpy as np
+from absence_index import AbsenceIndex
+import model_builder
+import alternatives
+import anytime
+import capacity
+import solver_backends
+import warm_start
+from rules import (
+    FACH_PENALTY, EARLY_FACH_PENALTY, LATE_HF_PENALTY, EARLY_COVERAGE_PENALTY,
+    LATE_COVERAGE_PENALTY, NONFACH_PENALTY, B_DIENST_PENALTY, EXCESSIVE_WORKDAY_PENALTY,
+    CONSECUTIVE_SHIFT_PENALTY, WORKDAY_DEVIATION_PENALTY, EXTRA_FACH_LATE_PENALTY,
+    EARLY_SHIFT_COST, LATE_SHIFT_COST, SPLIT_SHIFT_COST,
+    MIN_EARLY_TOTAL_WEEKDAY, MIN_EARLY_TOTAL_WEEKEND, MIN_EARLY_FACH, MIN_LATE_TOTAL,
+    MIN_LATE_HF, MIN_B_DIENST, MAX_SPLIT_SHIFTS, MAX_WEEKENDS, MAX_WEEKENDS_AUSB2,
+    BURO_DAYS_PER_MONTH, REQUIRED_SHIFTS, EARLY_SHIFTS, LATE_SHIFTS, PURE_LATE_SHIFTS,
+    FACH_QUALIFICATIONS, penalty_weights,
+)
 
 class ScheduleSolution:
-    def __init__(self, col_value):
+    """
+    Self-contained result of one solve; it shares no state with other solves.
+
+    Attributes:
+        employee_ids: Employee ids in the row order of assignments.
+        assignments: Object array (employees × days of the month) with the shift code of every
+            cell, or None for a day off (see model_builder.assignment_matrix).
+        objective: Objective value.
+        objective_breakdown: Objective contribution per penalty family
+            (see model_builder.objective_breakdown).
+        status: solver_backends status of the solve.
+        stats: Solver and model statistics (see solve_report): backend, wall_time, bound, gap,
+            variables, constraints, nonzeros, build_time, build_profile and solver_stats.
+        col_value: The full solution vector of the model.
+    """
+
+    def __init__(self, employee_ids, assignments, objective, objective_breakdown, status, stats,
+                 col_value=None):
+        self.employee_ids = employee_ids
+        self.assignments = assignments
+        self.objective = objective
+        self.objective_breakdown = objective_breakdown
+        self.status = status
+        self.stats = stats
         self.col_value = col_value
 
-def generate_schedule_highs(employees, shifts, absences, employee_qualifications, employee_workload, year, month, ch_holidays):
+    @classmethod
+    def from_result(cls, model, result):
+        """Extracts the solution of a model from a solver_backends.SolverResult."""
+        return cls(list(model.employee_ids),
+                   model_builder.assignment_matrix(model, result.col_value), result.objective,
+                   model_builder.objective_breakdown(model, result.col_value), result.status,
+                   solve_report(model, result), result.col_value)
+
+    @property
+    def schedule(self):
+        """The assignments as a dictionary {(employee_id, day): shift_code}."""
+        e, d = np.nonzero(self.assignments != None)  # noqa: E711 (element-wise comparison)
+        return {(self.employee_ids[e_idx], d_idx + 1): self.assignments[e_idx, d_idx]
+                for e_idx, d_idx in zip(e.tolist(), d.tolist())}
+
+def solve_report(model, result):
+    """
+    Model and solver statistics of one solve.
+
+    Returns:
+        Dictionary with backend, status, objective, wall_time, bound, gap, the model size
+        (variables, constraints, nonzeros), build_time, build_profile (seconds, variables, rows
+        and nonzeros per constraint family, see MatrixModel.build_profile) and solver_stats
+        (nodes, iterations and presolve sizes, see SolverResult.stats).
+    """
+    return {
+        "backend": result.backend,
+        "status": result.status,
+        "objective": result.objective,
+        "wall_time": result.wall_time,
+        "bound": result.bound,
+        "gap": result.gap,
+        "variables": model.num_cols,
+        "constraints": model.num_rows,
+        "nonzeros": model.num_nonzeros,
+        "build_time": sum(entry["seconds"] for entry in model.build_profile),
+        "build_profile": model.build_profile,
+        "solver_stats": result.stats,
+    }
+
+def log_profile(path, report, **context):
+    """
+    Appends a solve_report to a JSON lines file: one "build" line per constraint family and
+    one "solve" line with the solver statistics. context (e.g. year and month) and a
+    timestamp are added to every line.
+    """
+    context = {"time": datetime.datetime.now().isoformat(timespec="seconds"), **context}
+    solve = {key: value for key, value in report.items() if key != "build_profile"}
+    with open(path, "a") as f:
+        for entry in report["build_profile"]:
+            f.write(json.dumps({**context, "event": "build", **entry}) + "\n")
+        f.write(json.dumps({**context, "event": "solve", **solve}) + "\n")
+
+def build_shift_domains(employees, shift_codes, employee_qualifications, year, month, is_absent):
+    """
+    Computes the assignable shifts of every employee for every day of the month.
+
+    The rules that used to be expressed as "== 0" constraints are applied here instead, so the
+    model never creates a decision variable that is forced to zero:
+      - no shift on days the employee is absent,
+      - Leitung only works on weekdays and only "B Dienst" (plus Bü Dienst),
+      - Ausbildung 1/2 only work on weekdays and only "B Dienst" or "C Dienst",
+      - only PH and HF may work split shifts ("BS Dienst", "C4 Dienst").
+
+    Args:
+        employees: List of employee dictionaries (id, qualifikation).
+        shift_codes: Iterable of the shift codes that are planned by the model.
+        employee_qualifications: Dictionary of employee qualifications (employee_id: qualifikation).
+        year: Year for the schedule.
+        month: Month for the schedule.
+        is_absent: Callable (employee_id, day) -> bool.
+
+    Returns:
+        Tuple (shift_domain, buero_domain). shift_domain maps (employee_id, day) to the list of
+        assignable shift codes (days without any assignable shift are omitted). buero_domain is
+        the set of (employee_id, day) for which a Bü Dienst may be planned.
+    """
+    num_days = calendar.monthrange(year, month)[1]
+    shift_domain = {}
+    buero_domain = set()
+    for emp in employees:
+        e_id = emp["id"]
+        qual = employee_qualifications.get(e_id)
+        for d in range(1, num_days + 1):
+            if is_absent(e_id, d):
+                continue
+            is_weekend = datetime.date(year, month, d).weekday() >= 5
+            if qual == "Leitung":
+                if is_weekend:
+                    continue
+                allowed = [s for s in shift_codes if s == "B Dienst"]
+                buero_domain.add((e_id, d))
+            elif qual in {"Ausbildung 1", "Ausbildung 2"}:
+                if is_weekend:
+                    continue
+                allowed = [s for s in shift_codes if s in {"B Dienst", "C Dienst"}]
+            elif qual in {"PH", "HF"}:
+                allowed = list(shift_codes)
+            else:
+                allowed = [s for s in shift_codes if s not in {"BS Dienst", "C4 Dienst"}]
+            if allowed:
+                shift_domain[(e_id, d)] = allowed
+    return shift_domain, buero_domain
+
+def _month_model(employees, absences, employee_qualifications, employee_workload, year, month,
+                 ch_holidays, penalties=None):
+    """
+    Checks the staffing of the month and builds its model, shared by all solve entry points.
+
+    Days that cannot be staffed are reported up front (see capacity.py); a month that is
+    provably infeasible is not handed to the solver at all.
+
+    Returns:
+        The MatrixModel with the penalty weights applied, or None if the month is infeasible.
+    """
+    report = capacity.analyze_capacity(employees, absences, employee_qualifications,
+                                       employee_workload, year, month, ch_holidays)
+    for line in report.messages():
+        print(line)
+    if not report.feasible:
+        print(f"Not enough staff on days {report.unmeetable_days}, no schedule possible.")
+        return None
+    model = model_builder.build_model(employees, absences, employee_qualifications,
+                                      employee_workload, year, month, ch_holidays,
+                                      penalties=penalty_weights(penalties))
+    print(f"Model: {model.num_cols} variables, {model.num_rows} constraints, "
+          f"{model.num_nonzeros} nonzeros")
+    return model
+
+
+def generate_schedule_highs(employees, shifts, absences, employee_qualifications, employee_workload, year, month, ch_holidays,
+                            backend=solver_backends.DEFAULT_BACKEND, hint=None, hint_days=None,
+                            profile_log=None, penalties=None, solver_settings=None):
     """
     A schedule generator using OR-Tools that enforces shift qualification constraints
     and various soft constraints with different penalties.
@@ -23,11 +194,14 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
           * "S Dienst": 2 assignments per day with exactly 1 fach and 1 non‑fach.
           * "VS Dienst": 1 assignment per day (no qualification restriction).
 
-    For simplicity, this basic model creates binary decision variables x[(e_id, d, shift_code)]
-    for every employee for every day of the month and for each of the four required shift codes.
+    The model creates binary decision variables x[(e_id, d, shift_code)] only for the shifts an
+    employee may work on a day (see build_shift_domains), so absences and qualification
+    restrictions never produce variables that are forced to zero.
     It also ensures that an employee works at most one shift per day.
-    
-    NOTE: Absences, workload, and holidays are ignored in this basic implementation.
+
+    The model is assembled in bulk as sparse arrays (model_builder.build_model) and solved
+    with the selected backend: HiGHS (default), CBC, SCIP, CP-SAT with parallel workers,
+    a portfolio racing several of them or large neighborhood search (lns.py).
 
     Args:
         employees: List of employee dictionaries (id, qualifikation).
@@ -38,195 +212,197 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
         year: Year for the schedule.
         month: Month for the schedule.
         ch_holidays: List of holidays (as datetime.date objects).
+        backend: Name of the solver backend (see solver_backends.BACKENDS).
+        hint: Optional starting schedule {(employee_id, day): shift_code}, e.g. the last
+            solution or the seeded start of the month (see warm_start.py).
+        hint_days: Days covered by the hint (None: all days of the month).
+        profile_log: Optional path of a JSON lines file the build profile and the solver
+            statistics are appended to (see log_profile).
+        penalties: Objective weights {penalty name: weight} that differ from rules.PENALTIES
+            (see rules.penalty_weights; tuning.py re-solves with other weights without a
+            rebuild).
+        solver_settings: Solver settings {setting: value}: threads, gaps, node limit, seed and
+            presolve (see solver_backends.solver_options; default: the backend's).
+
+    Returns:
+        A ScheduleSolution, or None if no feasible schedule was found. Its stats hold the
+        build profile and solver statistics (see solve_report).
     """
-    global variable_names
-    variable_names.clear()
+    model = _month_model(employees, absences, employee_qualifications, employee_workload, year,
+                         month, ch_holidays, penalties)
+    if model is None:
+        return None
+
+    # Solve with a longer time limit
+    options = solver_backends.solver_options(solver_settings, time_limit=60)  # 60 seconds
+    if hint:
+        options.hint = warm_start.hint_from_schedule(model, hint, hint_days)
+    solve = solver_backends.BACKENDS[backend]
+    result = solve(model, options)
+    print(f"Solver {backend}: {result.status}, objective {result.objective}, "
+          f"{result.wall_time:.1f} s")
+    if profile_log:
+        log_profile(profile_log, solve_report(model, result), year=year, month=month,
+                    employees=len(employees))
 
-    # Create the solver. Using CBC since it supports mixed-integer programming.
-    solver = pywraplp.Solver.CreateSolver('CBC_MIXED_INTEGER_PROGRAMMING')
-    if not solver:
-        print("Solver not created.")
+    # Check if a solution was found (accepting both optimal and feasible solutions)
+    if result.has_solution:
+        return ScheduleSolution.from_result(model, result)
+    else:
+        print("No optimal solution found.")
         return None
 
-    # ------------------------------------------
-    # Penalty Definitions
-    # ------------------------------------------
-    # Qualification Requirements (Highest Priority)
-    FACH_PENALTY = 5000          # Penalty for not meeting Fachkraft (HF/Leitung) requirements
-    EARLY_FACH_PENALTY = 5000    # Penalty for not having a Fachkraft in early shifts
-    LATE_HF_PENALTY = 5000       # Penalty for not having an HF in late shifts
-    
-    # Coverage Requirements (High Priority)
-    EARLY_COVERAGE_PENALTY = 4000  # Penalty for not meeting minimum early shift coverage (5 employees)
-    LATE_COVERAGE_PENALTY = 4000   # Penalty for not meeting minimum late shift coverage (3 employees)
-    
-    # Shift Requirements (Medium-High Priority)
-    NONFACH_PENALTY = 3000       # Penalty for not meeting non-Fachkraft requirements
-    B_DIENST_PENALTY = 3000      # Penalty for not meeting B Dienst minimum requirements (2 employees)
-    
-    # Workload Violations (Medium Priority)
-    EXCESSIVE_WORKDAY_PENALTY = 2000  # Penalty for working any days over target
-    
-    # Shift Pattern Violations (Medium-Low Priority)
-    CONSECUTIVE_SHIFT_PENALTY = 1000  # Penalty for violating consecutive shift rules (5 days max)
-    
-    # Target Workday Deviations (Low Priority)
-    WORKDAY_DEVIATION_PENALTY = 100   # Penalty for deviating from target workdays (under only)
-    
-    # Shift Preference Penalties (Low Priority)
-    EXTRA_FACH_LATE_PENALTY = 50  # Penalty for having more than one fachpersonal in late shifts
-    
-    # Regular Assignment Costs (Shift Preferences)
-    EARLY_SHIFT_COST = 1         # Base cost for early shifts (B Dienst, C Dienst)
-    LATE_SHIFT_COST = 3          # Higher cost for late shifts (S Dienst, VS Dienst) to prefer early shifts
-    SPLIT_SHIFT_COST = 5         # Highest cost for split shifts (BS Dienst, C4 Dienst)
-    
-    # ------------------------------------------
-    # Minimum Requirements
-    # ------------------------------------------
-    # Early Shift Requirements
-    MIN_EARLY_TOTAL_WEEKDAY = 5    # Minimum total staff in early shifts on weekdays
-    MIN_EARLY_TOTAL_WEEKEND = 5    # Minimum total staff in early shifts on weekends
-    MIN_EARLY_FACH = 1           # Minimum Fachkraft required in early shifts
-    
-    # Late Shift Requirements
-    MIN_LATE_TOTAL = 3           # Minimum total staff in late shifts
-    MIN_LATE_HF = 1              # Minimum HF required in late shifts
-    
-    # Individual Shift Requirements
-    MIN_B_DIENST = 2             # Minimum staff in B Dienst
-    MAX_SPLIT_SHIFTS = 3         # Maximum split shifts per day
-    
-    # Workload Requirements
-    MAX_CONSECUTIVE_DAYS = 5     # Maximum consecutive working days
-    MIN_REST_AFTER_MAX = 2       # Minimum rest days after max consecutive days
-    MAX_WEEKENDS = 2             # Maximum weekends per month per employee
-    MAX_WEEKENDS_AUSB2 = 1       # Maximum weekends per month for Ausbildung 2
-    
-    # Büro Requirements
-    BURO_DAYS_PER_MONTH = 4      # Required Büro days per month for Leitung
-    
-    # ------------------------------------------
-    # Initialize Problem Variables
-    # ------------------------------------------
+
+def generate_schedule_alternatives(employees, shifts, absences, employee_qualifications,
+                                   employee_workload, year, month, ch_holidays,
+                                   num_alternatives=alternatives.NUM_ALTERNATIVES,
+                                   backend=solver_backends.DEFAULT_BACKEND, hint=None,
+                                   hint_days=None, penalties=None, solver_settings=None):
+    """
+    Generates several diverse schedules for the same month (see alternatives.py).
+
+    Args:
+        Same as generate_schedule_highs, plus
+        num_alternatives: Number of alternative schedules.
+
+    Returns:
+        List of alternatives.Alternative (schedule {(employee_id, day): shift_code} and
+        objective), the best first. Empty if no feasible schedule was found or the month
+        cannot be staffed.
+    """
+    model = _month_model(employees, absences, employee_qualifications, employee_workload, year,
+                         month, ch_holidays, penalties)
+    if model is None:
+        return []
+    options = solver_backends.solver_options(solver_settings, time_limit=60)
+    if hint:
+        options.hint = warm_start.hint_from_schedule(model, hint, hint_days)
+    result = alternatives.generate_alternatives(model, num_alternatives, backend=backend,
+                                                options=options)
+    print(f"Alternatives ({backend}): objectives {[round(a.objective) for a in result]}")
+    return result
+
+
+def start_anytime_schedule(employees, shifts, absences, employee_qualifications,
+                           employee_workload, year, month, ch_holidays,
+                           backend=solver_backends.DEFAULT_BACKEND, hint=None, hint_days=None,
+                           time_limit=60, penalties=None, solver_settings=None):
+    """
+    Starts solving the month in a background thread (see anytime.py).
+
+    Args:
+        Same as generate_schedule_highs, plus
+        time_limit: Time limit in seconds; the solve can be stopped earlier with stop().
+
+    Returns:
+        The running anytime.AnytimeSolve; its incumbents carry the schedules found so far.
+        None if the month cannot be staffed (see capacity.py).
+    """
+    model = _month_model(employees, absences, employee_qualifications, employee_workload, year,
+                         month, ch_holidays, penalties)
+    if model is None:
+        return None
+    options = solver_backends.solver_options(solver_settings, time_limit=time_limit)
+    if hint:
+        options.hint = warm_start.hint_from_schedule(model, hint, hint_days)
+    return anytime.AnytimeSolve(model, backend, options).start()
+
+
+def build_reference_model(solver, employees, absences, employee_qualifications, employee_workload,
+                          year, month, ch_holidays):
+    """
+    Builds the scheduling model constraint by constraint as pywraplp expressions.
+
+    generate_schedule_highs uses the bulk builder in
+    model_builder.py; this version is kept as the reference for benchmarks and cross-checks of
+    the bulk builder.
+
+    Args:
+        solver: pywraplp.Solver to add the variables and constraints to.
+        employees: List of employee dictionaries (id, qualifikation).
+        absences: Dictionary of employee absences (employee_id: [(date_str, type)]).
+        employee_qualifications: Dictionary of employee qualifications (employee_id: qualifikation).
+        employee_workload: Dictionary of employee target workloads (employee_id: target_days).
+        year: Year for the schedule.
+        month: Month for the schedule.
+        ch_holidays: List of holidays (as datetime.date objects).
+
+    Returns:
+        Tuple (x, y) with the shift variables x[(e_id, d, shift_code)] and the Bü Dienst
+        variables y[(e_id, d)].
+    """
     num_days = calendar.monthrange(year, month)[1]
-    
-    # Define the required shifts and their counts along with qualification restrictions.
-    # For each shift code, we specify:
-    #   - "total": total number of assignments per day.
-    #   - "fach": number of employees required with fach (qualified) for that shift.
-    #   - "nonfach": number of employees required from non‑fach group.
-    required_shifts = {
-        "B Dienst": {"total": 3, "fach": 1, "nonfach": 2},  # 1 fach + 2 non-fach
-        "C Dienst": {"total": 1, "fach": 0, "nonfach": 1},  # 1 non-fach
-        "S Dienst": {"total": 2, "fach": 1, "nonfach": 1},  # 1 fach + 1 non-fach
-        "VS Dienst": {"total": 1},  # No qualification restrictions
-        "BS Dienst": {"total": 0, "optional": True},  # Split shift (optional)
-        "C4 Dienst": {"total": 0, "optional": True}   # Split shift (optional)
-    }
-    
-    # Define which qualifications count as fach (qualified).
-    fach_qual = {"HF", "Leitung"}
 
     # Create binary decision variables for each employee/day/shift.
     x = {}
     
-    # Helper function to check if an employee is absent on a given day
-    def employee_is_absent(e_id, d, month, absences):
-         if e_id not in absences:
-             return False
-         for record in absences[e_id]:
-             # record[0] is a date string in the format "DD.MM." (e.g. "7.2.")
-             parts = record[0].split('.')
-             if len(parts) >= 2:
-                 try:
-                     absence_day = int(parts[0])
-                     absence_month = int(parts[1])
-                     if absence_day == d and absence_month == month:
-                         return True
-                 except ValueError:
-                     continue
-         return False
+    # Absence index: every "DD.MM." absence record is parsed once per solve.
+    absence_index = AbsenceIndex.for_month(absences, year, month)
     
+    # ------------------------------------------
+    # Domain pruning: only create variables for shifts an employee may actually work.
+    # Absences, Leitung, Lehrling and split shift restrictions are applied here.
+    shift_domain, buero_domain = build_shift_domains(
+        employees, REQUIRED_SHIFTS.keys(), employee_qualifications, year, month,
+        absence_index.is_absent)
+
+    def day_vars(e_id, d):
+        """All shift variables of an employee on a day (empty if nothing is assignable)."""
+        return [x[(e_id, d, s)] for s in shift_domain.get((e_id, d), ())]
+
     # Regular shift variables
     for d in range(1, num_days + 1):
-        for shift_code in required_shifts.keys():
+        for shift_code in REQUIRED_SHIFTS.keys():
             for emp in employees:
                 e_id = emp["id"]
+                if shift_code not in shift_domain.get((e_id, d), ()):
+                    continue
                 var = solver.BoolVar(f"{e_id}_{d}_{shift_code}")
                 x[(e_id, d, shift_code)] = var
-                variable_names.append((e_id, d, shift_code))
     
-    # Bü Dienst variables for Leitung employees
+    # Bü Dienst variables, only for Leitung employees on weekdays they are present.
     y = {}
     for d in range(1, num_days + 1):
-        current_date = datetime.date(year, month, d)
         for emp in employees:
             e_id = emp["id"]
-            var_y = solver.BoolVar(f"{e_id}_{d}_Bü Dienst")
-            y[(e_id, d)] = var_y
-            # If the employee is Leitung, add to variable_names
-            if employee_qualifications.get(e_id) == "Leitung":
-                variable_names.append((e_id, d, "Bü Dienst"))
-            # If the day is weekend, the employee is not "Leitung",
-            # or the employee is absent on that day, force Bü Dienst to 0.
-            if current_date.weekday() >= 5 or employee_qualifications.get(e_id) != "Leitung" \
-               or employee_is_absent(e_id, d, month, absences):
-                solver.Add(var_y == 0)
+            if (e_id, d) in buero_domain:
+                y[(e_id, d)] = solver.BoolVar(f"{e_id}_{d}_Bü Dienst")
     
     # Constraint: Each employee can work at most one shift per day.
+    # (Bü Dienst counts as a shift for Leitung; this also forbids B Dienst and Bü on the same day.)
     for d in range(1, num_days + 1):
         for emp in employees:
             e_id = emp["id"]
-            # For Leitung employees, include Bü Dienst in the one-shift-per-day constraint
-            if employee_qualifications.get(e_id) == "Leitung":
-                solver.Add(sum(x[(e_id, d, s)] for s in required_shifts.keys()) + y[(e_id, d)] <= 1)
-            else:
-                solver.Add(sum(x[(e_id, d, s)] for s in required_shifts.keys()) <= 1)
-    
-    # ------------------------------------------
-    # Availability constraints: an employee who is absent on a day
-    # cannot be assigned any shift.
-    for d in range(1, num_days + 1):
-         for emp in employees:
-             e_id = emp["id"]
-             if employee_is_absent(e_id, d, month, absences):
-                 solver.Add(sum(x[(e_id, d, s)] for s in required_shifts.keys()) == 0)
+            assigned = day_vars(e_id, d)
+            if (e_id, d) in y:
+                assigned.append(y[(e_id, d)])
+            # A single binary is already bounded by 1.
+            if len(assigned) > 1:
+                solver.Add(sum(assigned) <= 1)
 
     # ------------------------------------------
     # Additional constraints for Leitung employees.
     # ------------------------------------------
-    # For Leitungs employees:
+    # Weekend and shift restrictions are part of the domains; the Büro days remain:
     for emp in employees:
         e_id = emp["id"]
         if employee_qualifications.get(e_id) == "Leitung":
-            # 1. Only work on weekdays
-            for d in range(1, num_days + 1):
-                current_date = datetime.date(year, month, d)
-                if current_date.weekday() >= 5:  # Weekend
-                    solver.Add(sum(x[(e_id, d, s)] for s in required_shifts.keys()) == 0)
-                else:  # Weekday
-                    # 2. Only B Dienst or Bü Dienst allowed (and not both on the same day)
-                    for shift_code in required_shifts.keys():
-                        if shift_code != "B Dienst":
-                            solver.Add(x[(e_id, d, shift_code)] == 0)
-                    solver.Add(x[(e_id, d, "B Dienst")] + y[(e_id, d)] <= 1)
-            
-            # 3. Must have exactly 4 Büro days per month
-            solver.Add(sum(y[(e_id, d)] for d in range(1, num_days + 1)
-                         if datetime.date(year, month, d).weekday() < 5) == BURO_DAYS_PER_MONTH)
+            # Must have exactly 4 Büro days per month
+            solver.Add(solver.Sum([y[(e_id, d)] for d in range(1, num_days + 1)
+                                   if (e_id, d) in y]) == BURO_DAYS_PER_MONTH)
 
     # For each day and for each non-optional shift code, set individual coverage constraints.
     # We only enforce minimum requirements, allowing more assignments if needed
     slack_variables = {}  # Dictionary to store all slack variables
     
     for d in range(1, num_days + 1):
-         for shift_code, req in required_shifts.items():
+         for shift_code, req in REQUIRED_SHIFTS.items():
               # Skip split shifts (optional) here.
               if req.get("optional", False):
                    continue
               # Only enforce minimum requirements, remove upper bounds
-              solver.Add(sum(x[(emp["id"], d, shift_code)] for emp in employees) >= req["total"])
+              solver.Add(solver.Sum([x[(emp["id"], d, shift_code)] for emp in employees
+                                     if (emp["id"], d, shift_code) in x]) >= req["total"])
               
               # Enforce qualification lower bounds (if applicable) with slack variables
               if "fach" in req:
@@ -235,7 +411,8 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
                    slack_variables[(d, shift_code, "fach")] = fach_slack
                    solver.Add(
                         sum(x[(emp["id"], d, shift_code)] for emp in employees 
-                            if employee_qualifications.get(emp["id"]) in fach_qual)
+                            if employee_qualifications.get(emp["id"]) in FACH_QUALIFICATIONS
+                            and (emp["id"], d, shift_code) in x)
                         + fach_slack >= req["fach"]
                    )
               if "nonfach" in req:
@@ -244,14 +421,15 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
                    slack_variables[(d, shift_code, "nonfach")] = nonfach_slack
                    solver.Add(
                         sum(x[(emp["id"], d, shift_code)] for emp in employees 
-                            if employee_qualifications.get(emp["id"]) not in fach_qual)
+                            if employee_qualifications.get(emp["id"]) not in FACH_QUALIFICATIONS
+                            and (emp["id"], d, shift_code) in x)
                         + nonfach_slack >= req["nonfach"]
                    )
 
     # Group-level Early and Late Shift Coverage Constraints with slack variables
-    early_shifts = {"B Dienst", "C Dienst", "BS Dienst", "C4 Dienst"}
-    late_shifts  = {"S Dienst", "VS Dienst", "BS Dienst", "C4 Dienst"}
-    pure_late_shifts = {"S Dienst", "VS Dienst"}  # Late shifts without split shifts
+    early_shifts = EARLY_SHIFTS
+    late_shifts = LATE_SHIFTS
+    pure_late_shifts = PURE_LATE_SHIFTS  # Late shifts without split shifts
     
     for d in range(1, num_days + 1):
          current_date = datetime.date(year, month, d)
@@ -262,7 +440,8 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
          slack_variables[(d, "early")] = early_slack
          # Apply different minimum requirements for weekdays and weekends
          min_early_total = MIN_EARLY_TOTAL_WEEKEND if is_weekend else MIN_EARLY_TOTAL_WEEKDAY
-         solver.Add(sum(x[(emp["id"], d, s)] for s in early_shifts for emp in employees) + early_slack >= min_early_total)
+         solver.Add(sum(x[(emp["id"], d, s)] for s in early_shifts for emp in employees
+                       if (emp["id"], d, s) in x) + early_slack >= min_early_total)
          
          # Early fach requirement slack
          early_fach_slack = solver.NumVar(0, solver.infinity(), f"early_fach_slack_{d}")
@@ -270,13 +449,15 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
          solver.Add(sum(x[(emp["id"], d, s)] 
                        for s in early_shifts 
                        for emp in employees 
-                       if employee_qualifications.get(emp["id"]) in fach_qual)
+                       if employee_qualifications.get(emp["id"]) in FACH_QUALIFICATIONS
+                       and (emp["id"], d, s) in x)
                    + early_fach_slack >= MIN_EARLY_FACH)
          
          # Late group coverage slack
          late_slack = solver.NumVar(0, solver.infinity(), f"late_slack_{d}")
          slack_variables[(d, "late")] = late_slack
-         solver.Add(sum(x[(emp["id"], d, s)] for s in late_shifts for emp in employees) + late_slack >= MIN_LATE_TOTAL)
+         solver.Add(sum(x[(emp["id"], d, s)] for s in late_shifts for emp in employees
+                       if (emp["id"], d, s) in x) + late_slack >= MIN_LATE_TOTAL)
          
          # Late HF requirement slack
          late_hf_slack = solver.NumVar(0, solver.infinity(), f"late_hf_slack_{d}")
@@ -284,7 +465,8 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
          solver.Add(sum(x[(emp["id"], d, s)] 
                        for s in late_shifts 
                        for emp in employees 
-                       if employee_qualifications.get(emp["id"]) == "HF")
+                       if employee_qualifications.get(emp["id"]) == "HF"
+                       and (emp["id"], d, s) in x)
                    + late_hf_slack >= MIN_LATE_HF)
          
          # Soft constraint: Prefer only one fachpersonal in pure late shifts
@@ -293,13 +475,15 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
          solver.Add(sum(x[(emp["id"], d, s)] 
                        for s in pure_late_shifts 
                        for emp in employees 
-                       if employee_qualifications.get(emp["id"]) in fach_qual)
+                       if employee_qualifications.get(emp["id"]) in FACH_QUALIFICATIONS
+                       and (emp["id"], d, s) in x)
                    - 1 <= late_extra_fach_slack)
 
          # Individual Minimum: At least 2 assignments for B Dienst per day with slack
          b_dienst_slack = solver.NumVar(0, solver.infinity(), f"b_dienst_slack_{d}")
          slack_variables[(d, "b_dienst")] = b_dienst_slack
-         solver.Add(sum(x[(emp["id"], d, "B Dienst")] for emp in employees) + b_dienst_slack >= MIN_B_DIENST)
+         solver.Add(sum(x[(emp["id"], d, "B Dienst")] for emp in employees
+                       if (emp["id"], d, "B Dienst") in x) + b_dienst_slack >= MIN_B_DIENST)
 
     # ------------------------------------------
     # Late-to-Early Shift Transition Constraints:
@@ -309,16 +493,19 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
               e_id = emp["id"]
               # For all late shifts except VS and C4, no early shift is allowed the next day
               for late_shift in {"S Dienst", "BS Dienst"}:
+                   if (e_id, d, late_shift) not in x:
+                        continue
                    for early_shift in early_shifts:
-                        solver.Add(x[(e_id, d, late_shift)] + x[(e_id, d+1, early_shift)] <= 1)
+                        if (e_id, d+1, early_shift) in x:
+                             solver.Add(x[(e_id, d, late_shift)] + x[(e_id, d+1, early_shift)] <= 1)
               
-              # VS can only transition to C Dienst
-              solver.Add(x[(e_id, d, "VS Dienst")] + 
-                        sum(x[(e_id, d+1, s)] for s in early_shifts if s != "C Dienst") <= 1)
-              
-              # C4 can only transition to C Dienst
-              solver.Add(x[(e_id, d, "C4 Dienst")] + 
-                        sum(x[(e_id, d+1, s)] for s in early_shifts if s != "C Dienst") <= 1)
+              # VS and C4 can only transition to C Dienst
+              next_early = [x[(e_id, d+1, s)] for s in early_shifts
+                            if s != "C Dienst" and (e_id, d+1, s) in x]
+              if next_early:
+                   for late_shift in ("VS Dienst", "C4 Dienst"):
+                        if (e_id, d, late_shift) in x:
+                             solver.Add(x[(e_id, d, late_shift)] + sum(next_early) <= 1)
 
     # ------------------------------------------
     # Weekend constraints: Limit each employee to at most 2 worked weekends per month.
@@ -337,12 +524,13 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
               weekend_groups.append(group)
 
     # Create binary variable weekend_worked[(employee_id, weekend_index)] that equals 1 if the employee
-    # works on any day in that weekend group.
+    # works on any day in that weekend group. Employees who cannot work on a weekend get no variable.
     weekend_worked = {}
     for emp in employees:
          e_id = emp["id"]
          for w_idx, group in enumerate(weekend_groups):
-              weekend_worked[(e_id, w_idx)] = solver.BoolVar(f"{e_id}_weekend_{w_idx}")
+              if any(day_vars(e_id, d) for d in group):
+                   weekend_worked[(e_id, w_idx)] = solver.BoolVar(f"{e_id}_weekend_{w_idx}")
 
     # For each employee and each weekend group, if a shift is assigned on any day of that weekend,
     # then set the weekend_worked variable to 1.
@@ -350,41 +538,30 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
          e_id = emp["id"]
          for w_idx, group in enumerate(weekend_groups):
               for d in group:
-                   for s in required_shifts.keys():
+                   for var in day_vars(e_id, d):
                         # If assigned a shift on day d, then weekend_worked must be 1.
-                        solver.Add(x[(e_id, d, s)] <= weekend_worked[(e_id, w_idx)])
+                        solver.Add(var <= weekend_worked[(e_id, w_idx)])
 
     # Now, limit the total worked weekends per employee to at most 2.
     for emp in employees:
          e_id = emp["id"]
-         solver.Add(sum(weekend_worked[(e_id, w_idx)] for w_idx in range(len(weekend_groups))) <= MAX_WEEKENDS)
+         worked = [weekend_worked[(e_id, w_idx)] for w_idx in range(len(weekend_groups))
+                   if (e_id, w_idx) in weekend_worked]
+         if len(worked) > MAX_WEEKENDS:
+              solver.Add(sum(worked) <= MAX_WEEKENDS)
 
     # ------------------------------------------
     # Lehrling Constraints:
-    # For Lehrlinge with qualification "Ausbildung 1":
-    #   - They are allowed to work only on weekdays.
-    #   - They can only be assigned to "B Dienst" or "C Dienst".
-    for d in range(1, num_days + 1):
-         current_date = datetime.date(year, month, d)
-         for emp in employees:
-              e_id = emp["id"]
-              if employee_qualifications.get(e_id) in {"Ausbildung 1", "Ausbildung 2"}:
-                   # If it's a weekend, no shifts allowed
-                   if current_date.weekday() >= 5:
-                        for s in required_shifts.keys():
-                             solver.Add(x[(e_id, d, s)] == 0)
-                   else:
-                        # On weekdays, only B Dienst or C Dienst allowed
-                        for s in required_shifts.keys():
-                             if s not in {"B Dienst", "C Dienst"}:
-                                  solver.Add(x[(e_id, d, s)] == 0)
-
+    # Weekday-only work and the B/C Dienst restriction for Ausbildung 1/2 are part of the domains.
     # For Lehrlinge with qualification "Ausbildung 2":
     for emp in employees:
          e_id = emp["id"]
          if employee_qualifications.get(e_id) == "Ausbildung 2":
               # Limit worked weekends to at most 1 (override default 2 weekend limit).
-              solver.Add(sum(weekend_worked[(e_id, w_idx)] for w_idx in range(len(weekend_groups))) <= MAX_WEEKENDS_AUSB2)
+              worked = [weekend_worked[(e_id, w_idx)] for w_idx in range(len(weekend_groups))
+                        if (e_id, w_idx) in weekend_worked]
+              if len(worked) > MAX_WEEKENDS_AUSB2:
+                   solver.Add(sum(worked) <= MAX_WEEKENDS_AUSB2)
 
               # Limit work on Sundays or Feiertage (holidays) to at most 1 day per month.
               sunday_or_holiday_work = []
@@ -392,26 +569,19 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
                    current_date = datetime.date(year, month, d)
                    if current_date.weekday() == 6 or current_date in ch_holidays:
                         # Each day is either worked (1) or not (0) since max one shift per day.
-                        sunday_or_holiday_work.append(sum(x[(e_id, d, s)] for s in required_shifts.keys()))
-              if sunday_or_holiday_work:
+                        sunday_or_holiday_work.extend(day_vars(e_id, d))
+              if len(sunday_or_holiday_work) > 1:
                    solver.Add(sum(sunday_or_holiday_work) <= 1)
 
     # ------------------------------------------
     # Split Shift Constraints:
-    # 1. For each day, the total number of split shift assignments (BS Dienst and C4 Dienst)
-    #    across all employees must be at most 3.
-    # 2. Only PH and HF are allowed to be assigned split shifts.
+    # For each day, the total number of split shift assignments (BS Dienst and C4 Dienst)
+    # across all employees must be at most 3. Only PH and HF have split shifts in their domains.
     for d in range(1, num_days + 1):
-         # Limit total split shifts per day
-         solver.Add(sum(x[(emp["id"], d, "BS Dienst")] + x[(emp["id"], d, "C4 Dienst")] 
-                       for emp in employees) <= MAX_SPLIT_SHIFTS)
-         
-         # Only PH and HF can work split shifts
-         for emp in employees:
-              e_id = emp["id"]
-              if employee_qualifications.get(e_id) not in {"PH", "HF"}:
-                   solver.Add(x[(e_id, d, "BS Dienst")] == 0)
-                   solver.Add(x[(e_id, d, "C4 Dienst")] == 0)
+         split_vars = [x[(emp["id"], d, s)] for emp in employees for s in ("BS Dienst", "C4 Dienst")
+                       if (emp["id"], d, s) in x]
+         if len(split_vars) > MAX_SPLIT_SHIFTS:
+              solver.Add(sum(split_vars) <= MAX_SPLIT_SHIFTS)
 
     # ------------------------------------------
     # Consecutive Shift Constraints (soft):
@@ -420,12 +590,15 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
     # For each employee and each window of 5 consecutive days (days d to d+4),
     # we introduce a binary variable Z[(e_id, d)] that equals 1 if the employee works all days in that block.
     # Then, if Z[(e_id, d)] = 1, we force the employee to be off on days d+5 and d+6.
+    # Windows containing a day without any assignable shift can never be fully worked, so they are skipped.
     consecutive_block = {}
     consecutive_violation = {}  # Slack variables for violations
     
     for emp in employees:
          e_id = emp["id"]
          for d in range(1, num_days - 4 + 1):  # d from 1 to num_days-4
+              if not all(day_vars(e_id, day) for day in range(d, d+5)):
+                   continue
               # Create the binary variable for a full 5-day block starting at day d
               Z = solver.BoolVar(f"{e_id}_consec_{d}")
               consecutive_block[(e_id, d)] = Z
@@ -435,8 +608,7 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
               consecutive_violation[(e_id, d)] = V
               
               # Calculate the sum of shifts for all 5 days in the block
-              block_sum = sum(sum(x[(e_id, day, s)] for s in required_shifts.keys()) 
-                            for day in range(d, d+5))
+              block_sum = sum(sum(day_vars(e_id, day)) for day in range(d, d+5))
               
               # If all 5 days are worked, Z must be 1
               solver.Add(5 * Z <= block_sum)
@@ -445,10 +617,9 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
               
               # If Z is 1 (all 5 days worked), the next two days should be off
               # Use slack variable for violations
-              if d + 5 <= num_days:
-                   solver.Add(sum(x[(e_id, d+5, s)] for s in required_shifts.keys()) <= 1 - Z + V)
-              if d + 6 <= num_days:
-                   solver.Add(sum(x[(e_id, d+6, s)] for s in required_shifts.keys()) <= 1 - Z + V)
+              for rest_day in (d + 5, d + 6):
+                   if rest_day <= num_days and day_vars(e_id, rest_day):
+                        solver.Add(sum(day_vars(e_id, rest_day)) <= 1 - Z + V)
 
     # ------------------------------------------
     # Target Workday Constraints (soft):
@@ -457,24 +628,6 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
     workday_deviation_over = {}   # Slack variables for working more than target
     workday_deviation_excessive = {}  # Slack variables for excessive overwork
     
-    # Helper function to check if an employee has a specific absence type on a given day
-    def has_absence_type(e_id, day, month, absences, absence_type):
-        if e_id not in absences:
-            return False
-        for record in absences[e_id]:
-            # record[0] is a date string in the format "DD.MM." (e.g. "7.2.")
-            # record[1] is the absence type
-            parts = record[0].split('.')
-            if len(parts) >= 2:
-                try:
-                    absence_day = int(parts[0])
-                    absence_month = int(parts[1])
-                    if absence_day == day and absence_month == month and record[1] == absence_type:
-                        return True
-                except ValueError:
-                    continue
-        return False
-    
     for emp in employees:
         e_id = emp["id"]
         target_days = employee_workload.get(e_id, 0)
@@ -488,17 +641,14 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
         workday_deviation_excessive[e_id] = excessive
         
         # Total shifts worked by this employee in the month
-        total_shifts = sum(x[(e_id, d, s)] for d in range(1, num_days + 1) 
-                         for s in required_shifts.keys())
+        total_shifts = sum(sum(day_vars(e_id, d)) for d in range(1, num_days + 1))
         
         # For Leitung, include Bü Dienst in the total
         if employee_qualifications.get(e_id) == "Leitung":
-            total_shifts += sum(y[(e_id, d)] for d in range(1, num_days + 1))
+            total_shifts += sum(y[(e_id, d)] for d in range(1, num_days + 1) if (e_id, d) in y)
         
         # Count Ferien (Fe) and Schule (SL) as workdays
-        total_absences = sum(1 for d in range(1, num_days + 1) 
-                           if has_absence_type(e_id, d, month, absences, "Fe") or 
-                              has_absence_type(e_id, d, month, absences, "SL"))
+        total_absences = absence_index.credited_days(e_id)
         
         # The difference between actual and target should equal the slack variables
         # Include both shifts worked and counted absences
@@ -513,7 +663,7 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
     # Add penalties for coverage slack variables
     for d in range(1, num_days + 1):
         # Qualification requirements (highest priority)
-        for shift_code in required_shifts.keys():
+        for shift_code in REQUIRED_SHIFTS.keys():
             if (d, shift_code, "fach") in slack_variables:
                 objective.SetCoefficient(slack_variables[(d, shift_code, "fach")], FACH_PENALTY)
             if (d, shift_code, "nonfach") in slack_variables:
@@ -536,23 +686,18 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
             objective.SetCoefficient(slack_variables[(d, "late_extra_fach")], EXTRA_FACH_LATE_PENALTY)
     
     # Regular assignment costs with shift preferences
-    for d in range(1, num_days + 1):
-        for shift_code in required_shifts.keys():
-            for emp in employees:
-                e_id = emp["id"]
-                # Apply different costs based on shift type
-                if shift_code in {"B Dienst", "C Dienst"}:
-                    objective.SetCoefficient(x[(e_id, d, shift_code)], EARLY_SHIFT_COST)
-                elif shift_code in {"S Dienst", "VS Dienst"}:
-                    objective.SetCoefficient(x[(e_id, d, shift_code)], LATE_SHIFT_COST)
-                else:  # Split shifts
-                    objective.SetCoefficient(x[(e_id, d, shift_code)], SPLIT_SHIFT_COST)
+    for (e_id, d, shift_code), var in x.items():
+        # Apply different costs based on shift type
+        if shift_code in {"B Dienst", "C Dienst"}:
+            objective.SetCoefficient(var, EARLY_SHIFT_COST)
+        elif shift_code in {"S Dienst", "VS Dienst"}:
+            objective.SetCoefficient(var, LATE_SHIFT_COST)
+        else:  # Split shifts
+            objective.SetCoefficient(var, SPLIT_SHIFT_COST)
     
     # Penalties for consecutive shift violations
-    for emp in employees:
-        e_id = emp["id"]
-        for d in range(1, num_days - 4 + 1):
-            objective.SetCoefficient(consecutive_violation[(e_id, d)], CONSECUTIVE_SHIFT_PENALTY)
+    for violation in consecutive_violation.values():
+        objective.SetCoefficient(violation, CONSECUTIVE_SHIFT_PENALTY)
     
     # Add penalties for workday target deviations
     for emp in employees:
@@ -564,23 +709,4 @@ def generate_schedule_highs(employees, shifts, absences, employee_qualifications
 
     objective.SetMinimization()
 
-    # Solve with a longer time limit
-    solver.SetTimeLimit(60000)  # 60 seconds
-    status = solver.Solve()
-
-    # Check if a solution was found (accepting both optimal and feasible solutions)
-    if status in [pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE]:
-        # Extract solution
-        solution_values = []
-        print(f"Number of variables in variable_names: {len(variable_names)}")
-        print(f"First few variable_names: {variable_names[:5]}")
-        for var_tuple in variable_names:
-            if var_tuple[2] == "Bü Dienst":
-                solution_values.append(y[(var_tuple[0], var_tuple[1])].solution_value())
-            else:
-                solution_values.append(x[var_tuple].solution_value())
-        print(f"Number of solution values: {len(solution_values)}")
-        return ScheduleSolution(solution_values)
-    else:
-        print("No optimal solution found.")
-        return None
+    return x, y
@@ -0,0 +1,167 @@
+# solve_cache.py
+"""
+Persistent cache of solved schedules, keyed on the normalized solver inputs.
+
+The key is a SHA-256 hash of everything the model is built from: the employees with their
+qualification and workload, their absences in the month (as per-day absence bitmasks, so the
+order and format of the records do not matter), the holidays of the month, all constants in
+rules.py (penalties, minimum staffing, limits), the backend and the number of schedules
+requested. Re-running the same month with unchanged data returns the stored schedules without
+building or solving the model.
+
+Entries live in an SQLite file; when there are more than max_entries, the least recently used
+ones are evicted.
+"""
+import calendar
+import contextlib
+import datetime
+import hashlib
+import json
+import sqlite3
+import time
+
+import rules
+from absence_index import AbsenceIndex
+
+CACHE_FILE = "solve_cache.db"
+MAX_ENTRIES = 200
+# Bump when the model changes in a way the key does not capture (e.g. a new constraint).
+CACHE_VERSION = 1
+
+
+def _normalized(value):
+    """JSON fallback for the rules constants: sets become sorted lists."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Cannot normalize {type(value).__name__}")
+
+
+def cache_key(employees, absences, employee_qualifications, employee_workload, year, month,
+              ch_holidays, backend=None, num_schedules=1, solver_settings=None):
+    """
+    Stable hash of the inputs of one month's solve.
+
+    Args:
+        employees, absences, employee_qualifications, employee_workload, year, month,
+        ch_holidays: As for scheduler.generate_schedule_highs.
+        backend: Name of the solver backend.
+        num_schedules: Number of (alternative) schedules requested.
+        solver_settings: Solver settings {setting: value} (see solver_backends.solver_options).
+            The thread count is left out; it does not change what a solve may return.
+
+    Returns:
+        Hex digest string.
+    """
+    index = AbsenceIndex.for_month(absences, year, month)
+    num_days = calendar.monthrange(year, month)[1]
+    employee_ids = sorted(emp["id"] for emp in employees)
+    absence_masks = index.matrix(employee_ids).tolist()
+    rule_constants = {name: getattr(rules, name) for name in dir(rules) if name.isupper()}
+    inputs = {
+        "version": CACHE_VERSION,
+        "year": year,
+        "month": month,
+        "employees": [
+            [e_id, employee_qualifications.get(e_id), employee_workload.get(e_id), masks]
+            for e_id, masks in zip(employee_ids, absence_masks)
+        ],
+        "holidays": [day for day in range(1, num_days + 1)
+                     if datetime.date(year, month, day) in ch_holidays],
+        "rules": rule_constants,
+        "backend": backend,
+        "num_schedules": num_schedules,
+    }
+    settings = {name: value for name, value in (solver_settings or {}).items()
+                if name != "threads" and value is not None}
+    if settings:
+        inputs["solver_settings"] = settings
+    encoded = json.dumps(inputs, sort_keys=True, default=_normalized).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class CachedSolve:
+    """Schedules stored for a key, the best first, with their objectives."""
+
+    def __init__(self, schedules, objectives, status, backend, wall_time):
+        self.schedules = schedules
+        self.objectives = objectives
+        self.status = status
+        self.backend = backend
+        self.wall_time = wall_time
+
+
+class SolveCache:
+    """
+    SQLite-backed LRU cache of solved schedules.
+
+    Args:
+        path: SQLite file.
+        max_entries: Number of entries kept; the least recently used are evicted.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS solve_cache (
+                    key TEXT PRIMARY KEY,
+                    schedules TEXT NOT NULL,
+                    objectives TEXT NOT NULL,
+                    status TEXT,
+                    backend TEXT,
+                    wall_time REAL,
+                    last_used REAL NOT NULL
+                )
+            """)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """Returns the CachedSolve for the key, or None. Counts a hit or a miss."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT schedules, objectives, status, backend, wall_time FROM solve_cache "
+                "WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE solve_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        schedules_json, objectives_json, status, backend, wall_time = row
+        schedules = [{(e_id, day): shift_code for e_id, day, shift_code in schedule}
+                     for schedule in json.loads(schedules_json)]
+        return CachedSolve(schedules, json.loads(objectives_json), status, backend, wall_time)
+
+    def put(self, key, schedules, objectives, status=None, backend=None, wall_time=None):
+        """Stores the schedules {(employee_id, day): shift_code} for the key."""
+        encoded = json.dumps([[[e_id, day, shift_code]
+                               for (e_id, day), shift_code in sorted(schedule.items())]
+                              for schedule in schedules])
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO solve_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, encoded, json.dumps(list(objectives)), status, backend, wall_time,
+                 time.time()))
+            conn.execute(
+                "DELETE FROM solve_cache WHERE key NOT IN "
+                "(SELECT key FROM solve_cache ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,))
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM solve_cache").fetchone()[0]
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM solve_cache")
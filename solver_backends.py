@@ -0,0 +1,498 @@
+# solver_backends.py
+"""
+Solvers for a model_builder.MatrixModel. The model arrays are passed to the solver in bulk.
+
+All backends share one interface, solve(model, options) -> SolverResult, and are registered by
+name in BACKENDS (see register_backend). Available: "cbc", "scip", "highs", "cp-sat", the
+racing "portfolio" (portfolio.py), the large neighborhood search "lns" (lns.py), the
+staged solve by priority tier "lexicographic" (lexicographic.py) and the cut loop over the
+transition rows "lazy" (lazy_constraints.py).
+"""
+import contextlib
+import logging
+import os
+import re
+import threading
+import time
+import highspy
+import numpy as np
+from ortools.linear_solver import pywraplp
+from ortools.linear_solver import linear_solver_pb2
+from ortools.sat.python import cp_model
+
+OPTIMAL = "optimal"
+FEASIBLE = "feasible"
+INFEASIBLE = "infeasible"
+NOT_SOLVED = "not_solved"
+
+
+class SolverOptions:
+    """
+    Solver settings shared by all backends.
+
+    Args:
+        time_limit: Time limit in seconds.
+        threads: Number of threads / parallel workers (None: backend default, i.e. a single
+            thread for SCIP, all cores for HiGHS, lns and portfolio, and all cores but at least
+            MIN_CP_SAT_WORKERS for CP-SAT). The CBC shipped with OR-Tools is built without
+            threads and always runs on one; use "highs" or "cp-sat" to solve on several.
+        rel_gap: Relative MIP gap at which the solver may stop (None: backend default).
+        abs_gap: Absolute MIP gap (objective - bound) at which the solver may stop (None:
+            backend default). CBC ignores it.
+        node_limit: Maximum number of branch-and-bound nodes (None: no limit). CBC and CP-SAT
+            ignore it.
+        hint: Starting solution, an array of length model.num_cols with NaN for columns that are
+            not hinted (see warm_start.py). CBC ignores hints passed through OR-Tools.
+        seed: Random seed (None: backend default). CBC ignores it.
+        on_solution: Called with a SolverResult (status FEASIBLE, wall_time the elapsed time) for
+            every improving solution found during the solve. Only the STREAMING_BACKENDS report
+            solutions before the solve ends.
+        stop: threading.Event; once it is set, the solve ends and returns the best solution
+            found so far. CBC cannot be interrupted and runs to its time limit.
+        presolve: True/False to switch presolve on or off (None: backend default).
+    """
+
+    def __init__(self, time_limit=60.0, threads=None, rel_gap=None, hint=None, seed=None,
+                 on_solution=None, stop=None, abs_gap=None, node_limit=None, presolve=None):
+        self.time_limit = time_limit
+        self.threads = threads
+        self.rel_gap = rel_gap
+        self.hint = hint
+        self.seed = seed
+        self.on_solution = on_solution
+        self.stop = stop
+        self.abs_gap = abs_gap
+        self.node_limit = node_limit
+        self.presolve = presolve
+
+    def hinted_columns(self):
+        """Returns (indices, values) of the hinted columns; both empty without a hint."""
+        if self.hint is None:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        indices = np.flatnonzero(~np.isnan(self.hint)).astype(np.int32)
+        return indices, self.hint[indices]
+
+
+# Solver settings a planner can choose (app.py, batch.py): names of SolverOptions attributes.
+SOLVER_SETTINGS = ("threads", "rel_gap", "abs_gap", "node_limit", "seed", "presolve")
+
+
+def solver_options(settings=None, **kwargs):
+    """
+    SolverOptions from solver settings.
+
+    Args:
+        settings: Dictionary {setting (see SOLVER_SETTINGS): value}; None values are left to the
+            backend, as is a missing "threads" entry (see SolverOptions.threads).
+        **kwargs: Further SolverOptions arguments (time_limit, hint, ...).
+    """
+    settings = dict(settings or {})
+    unknown = set(settings) - set(SOLVER_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown solver settings: {sorted(unknown)}")
+    return SolverOptions(**{**settings, **kwargs})
+
+
+class SolverResult:
+    """
+    Outcome of solving a MatrixModel.
+
+    stats holds the search statistics the backend reports: nodes, iterations (simplex or LP
+    iterations), conflicts (CP-SAT) and the size of the presolved model (presolved_rows,
+    presolved_cols, presolved_nonzeros; HiGHS).
+    """
+
+    def __init__(self, status, col_value=None, objective=None, bound=None, wall_time=0.0,
+                 backend=None, stats=None):
+        self.status = status
+        self.col_value = col_value
+        self.objective = objective
+        self.bound = bound
+        self.wall_time = wall_time
+        self.backend = backend
+        self.stats = stats or {}
+
+    @property
+    def has_solution(self):
+        return self.status in (OPTIMAL, FEASIBLE) and self.col_value is not None
+
+    @property
+    def gap(self):
+        """Relative gap between objective and bound (None if unknown)."""
+        if self.objective is None or self.bound is None or not np.isfinite(self.bound):
+            return None
+        return abs(self.objective - self.bound) / max(abs(self.objective), 1e-9)
+
+
+# Seconds between checks of SolverOptions.stop for solvers interrupted from outside.
+STOP_POLL_INTERVAL = 0.2
+
+
+def _watch_stop(stop, interrupt):
+    """
+    Calls interrupt() as soon as the stop event is set. Returns an event that ends the watch
+    once the solve is over.
+    """
+    done = threading.Event()
+    if stop is None:
+        return done
+
+    def watch():
+        while not done.wait(STOP_POLL_INTERVAL):
+            if stop.is_set():
+                interrupt()
+                return
+
+    threading.Thread(target=watch, daemon=True).start()
+    return done
+
+
+def to_mp_model_proto(model, options=None):
+    """Converts a MatrixModel into an MPModelProto for the pywraplp solvers, including the hint."""
+    proto = linear_solver_pb2.MPModelProto()
+    proto.objective_offset = model.offset
+    for lower, upper, cost, integer in zip(model.col_lower.tolist(), model.col_upper.tolist(),
+                                           model.col_cost.tolist(), model.col_integer.tolist()):
+        var = proto.variable.add()
+        var.lower_bound = lower
+        var.upper_bound = upper
+        var.objective_coefficient = cost
+        var.is_integer = integer
+    a_start = model.a_start.tolist()
+    a_index = model.a_index.tolist()
+    a_value = model.a_value.tolist()
+    for row, (lower, upper) in enumerate(zip(model.row_lower.tolist(), model.row_upper.tolist())):
+        constraint = proto.constraint.add()
+        constraint.lower_bound = lower
+        constraint.upper_bound = upper
+        constraint.var_index.extend(a_index[a_start[row]:a_start[row + 1]])
+        constraint.coefficient.extend(a_value[a_start[row]:a_start[row + 1]])
+    if options is not None:
+        indices, values = options.hinted_columns()
+        proto.solution_hint.var_index.extend(indices.tolist())
+        proto.solution_hint.var_value.extend(values.tolist())
+    return proto
+
+
+def solve_pywraplp(model, solver_id, options=None, backend=None):
+    """Solves the model with one of the pywraplp MIP solvers (e.g. 'CBC_MIXED_INTEGER_PROGRAMMING')."""
+    options = options or SolverOptions()
+    backend = backend or solver_id
+    start = time.time()
+    solver = pywraplp.Solver.CreateSolver(solver_id)
+    if not solver:
+        logging.error(f"Solver {solver_id} not available.")
+        return SolverResult(NOT_SOLVED, backend=backend)
+    error = solver.LoadModelFromProto(to_mp_model_proto(model, options))
+    if error:
+        logging.error(f"Could not load model into {solver_id}: {error}")
+        return SolverResult(NOT_SOLVED, backend=backend)
+    solver.SetTimeLimit(int(options.time_limit * 1000))
+    # CBC is built without threads (see solve_cbc).
+    if options.threads and not solver_id.startswith("CBC"):
+        solver.SetNumThreads(options.threads)
+    if solver_id.startswith("SCIP"):
+        scip_params = []
+        if options.seed is not None:
+            scip_params.append(f"randomization/randomseedshift = {options.seed}")
+        if options.abs_gap is not None:
+            scip_params.append(f"limits/absgap = {options.abs_gap}")
+        if options.node_limit is not None:
+            scip_params.append(f"limits/nodes = {options.node_limit}")
+        if scip_params:
+            solver.SetSolverSpecificParametersAsString("\n".join(scip_params))
+    elif options.abs_gap is not None or options.node_limit is not None:
+        logging.warning(f"{backend} ignores abs_gap and node_limit")
+    params = pywraplp.MPSolverParameters()
+    if options.rel_gap is not None:
+        params.SetDoubleParam(params.RELATIVE_MIP_GAP, options.rel_gap)
+    if options.presolve is not None:
+        params.SetIntegerParam(params.PRESOLVE,
+                               params.PRESOLVE_ON if options.presolve else params.PRESOLVE_OFF)
+    done = _watch_stop(options.stop, solver.InterruptSolve)
+    status = solver.Solve(params)
+    done.set()
+    stats = {"nodes": solver.nodes(), "iterations": solver.iterations()}
+
+    if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        result_status = INFEASIBLE if status == pywraplp.Solver.INFEASIBLE else NOT_SOLVED
+        return SolverResult(result_status, wall_time=time.time() - start, backend=backend,
+                            stats=stats)
+    response = linear_solver_pb2.MPSolutionResponse()
+    solver.FillSolutionResponseProto(response)
+    return SolverResult(
+        OPTIMAL if status == pywraplp.Solver.OPTIMAL else FEASIBLE,
+        col_value=np.array(response.variable_value, dtype=np.float64),
+        objective=response.objective_value,
+        bound=response.best_objective_bound,
+        wall_time=time.time() - start,
+        backend=backend,
+        stats=stats,
+    )
+
+
+# Backends selectable by name, e.g. generate_schedule_highs(..., backend="cp-sat").
+BACKENDS = {}
+# HiGHS uses threads and hints and reports incumbents, which the CBC of OR-Tools does not.
+DEFAULT_BACKEND = "highs"
+# Backends that call SolverOptions.on_solution for every improving solution during the solve.
+STREAMING_BACKENDS = ("highs", "cp-sat", "lns", "lexicographic")
+# Backends that use SolverOptions.hint; the CBC of OR-Tools ignores it, so building one for CBC
+# is wasted time.
+HINT_BACKENDS = ("highs", "scip", "cp-sat", "portfolio", "lns", "lexicographic", "lazy")
+
+
+def register_backend(name):
+    """Decorator registering a solve(model, options) -> SolverResult function under a name."""
+    def decorator(solve):
+        BACKENDS[name] = solve
+        return solve
+    return decorator
+
+
+@register_backend("cbc")
+def solve_cbc(model, options=None):
+    """Solves the model with CBC (single-threaded, see SolverOptions.threads)."""
+    if options is not None and (options.threads or 1) > 1:
+        logging.warning(f"CBC runs on one thread; use the highs or cp-sat backend to solve with "
+                        f"{options.threads} threads.")
+    return solve_pywraplp(model, 'CBC_MIXED_INTEGER_PROGRAMMING', options, backend="cbc")
+
+
+@register_backend("scip")
+def solve_scip(model, options=None):
+    """Solves the model with SCIP."""
+    return solve_pywraplp(model, 'SCIP_MIXED_INTEGER_PROGRAMMING', options, backend="scip")
+
+
+# Size of the presolved model in the HiGHS log.
+_HIGHS_PRESOLVED = re.compile(r"Solving MIP model with:\s+(\d+) rows\s+(\d+) cols.*?(\d+) nonzeros",
+                              re.DOTALL)
+
+
+def _highs_stats(h, log):
+    info = h.getInfo()
+    stats = {"nodes": int(info.mip_node_count), "iterations": int(info.simplex_iteration_count)}
+    presolved = _HIGHS_PRESOLVED.search("".join(log))
+    if presolved:
+        stats["presolved_rows"], stats["presolved_cols"], stats["presolved_nonzeros"] = (
+            int(value) for value in presolved.groups())
+    return stats
+
+
+# Thread count the global HiGHS scheduler of this process was started with (0: automatic) and
+# the number of HiGHS solves running on it.
+_highs_threads = 0
+_highs_running = 0
+_highs_condition = threading.Condition()
+
+
+@contextlib.contextmanager
+def _highs_scheduler(threads):
+    """
+    Holds the global HiGHS scheduler for a solve with a thread count. HiGHS starts one scheduler
+    per process with the thread count of the first solve and fails solves with another count,
+    so it is restarted on a change, but only once no other HiGHS solve is running on it.
+    Solves with the current count run concurrently.
+    """
+    global _highs_threads, _highs_running
+    with _highs_condition:
+        while threads != _highs_threads and _highs_running:
+            _highs_condition.wait()
+        if threads != _highs_threads:
+            highspy.Highs.resetGlobalScheduler(True)
+            _highs_threads = threads
+        _highs_running += 1
+    try:
+        yield
+    finally:
+        with _highs_condition:
+            _highs_running -= 1
+            _highs_condition.notify_all()
+
+
+@register_backend("highs")
+def solve_highs(model, options=None):
+    """Solves the model with HiGHS through highspy, passing the CSR arrays directly."""
+    options = options or SolverOptions()
+    start = time.time()
+    h = highspy.Highs()
+    # The log is only read for the statistics (see _highs_stats), never printed.
+    h.setOptionValue("log_to_console", False)
+    h.setOptionValue("log_file", os.devnull)
+    log = []
+    h.cbLogging.subscribe(lambda event: log.append(event.message))
+    h.setOptionValue("time_limit", float(options.time_limit))
+    threads = int(options.threads or 0)
+    h.setOptionValue("threads", threads)
+    if options.rel_gap is not None:
+        h.setOptionValue("mip_rel_gap", float(options.rel_gap))
+    if options.abs_gap is not None:
+        h.setOptionValue("mip_abs_gap", float(options.abs_gap))
+    if options.node_limit is not None:
+        h.setOptionValue("mip_max_nodes", int(options.node_limit))
+    if options.seed is not None:
+        h.setOptionValue("random_seed", int(options.seed))
+    if options.presolve is not None:
+        h.setOptionValue("presolve", "on" if options.presolve else "off")
+    h.passModel(
+        model.num_cols, model.num_rows, model.num_nonzeros,
+        int(highspy.MatrixFormat.kRowwise), int(highspy.ObjSense.kMinimize), float(model.offset),
+        model.col_cost, model.col_lower, model.col_upper, model.row_lower, model.row_upper,
+        model.a_start, model.a_index, model.a_value, model.col_integer.astype(np.int32))
+    indices, values = options.hinted_columns()
+    if len(indices):
+        # HiGHS completes a partial solution itself by solving the sub-MIP of the free columns.
+        h.setSolution(len(indices), indices, values)
+    if options.on_solution is not None:
+        h.cbMipImprovingSolution.subscribe(lambda event: options.on_solution(SolverResult(
+            FEASIBLE, col_value=np.array(event.data_out.mip_solution, dtype=np.float64),
+            objective=event.data_out.objective_function_value,
+            bound=event.data_out.mip_dual_bound, wall_time=time.time() - start,
+            backend="highs")))
+    if options.stop is not None:
+        h.cbMipInterrupt.subscribe(lambda event: event.interrupt(options.stop.is_set()))
+    with _highs_scheduler(threads):
+        h.run()
+
+    model_status = h.getModelStatus()
+    info = h.getInfo()
+    stats = _highs_stats(h, log)
+    if model_status == highspy.HighsModelStatus.kInfeasible:
+        return SolverResult(INFEASIBLE, wall_time=time.time() - start, backend="highs",
+                            stats=stats)
+    if info.primal_solution_status != 2:  # kSolutionStatusFeasible
+        return SolverResult(NOT_SOLVED, wall_time=time.time() - start, backend="highs",
+                            stats=stats)
+    return SolverResult(
+        OPTIMAL if model_status == highspy.HighsModelStatus.kOptimal else FEASIBLE,
+        col_value=np.array(h.getSolution().col_value, dtype=np.float64),
+        objective=info.objective_function_value,
+        bound=info.mip_dual_bound,
+        wall_time=time.time() - start,
+        backend="highs",
+        stats=stats,
+    )
+
+
+MIN_CP_SAT_WORKERS = 8
+# Decimal places of the objective weights that CP-SAT is given; costs are scaled to integers.
+MAX_COST_DECIMALS = 6
+
+
+def _to_int_bound(value):
+    if value == np.inf:
+        return cp_model.INT_MAX
+    if value == -np.inf:
+        return cp_model.INT_MIN
+    return int(round(value))
+
+
+def to_cp_model(model):
+    """
+    Converts a MatrixModel into a CP-SAT model.
+
+    CP-SAT only supports integer variables and coefficients. All columns of the scheduling
+    model (assignments, slacks, indicators) take integer values at the optimum and have finite
+    bounds, so every column becomes an integer variable. Fractional costs (tuned weights such
+    as 1.5) are scaled by a power of ten to integers; the objective's scaling factor undoes
+    that, so CP-SAT reports objectives and bounds in the model's units.
+    """
+    if not np.all(model.a_value == np.round(model.a_value)):
+        raise ValueError("CP-SAT requires integer coefficients.")
+    scale = next((10 ** decimals for decimals in range(MAX_COST_DECIMALS + 1)
+                  if np.all(np.abs(model.col_cost * 10 ** decimals
+                                   - np.round(model.col_cost * 10 ** decimals)) < 1e-6)), None)
+    if scale is None:
+        raise ValueError(f"CP-SAT requires costs with at most {MAX_COST_DECIMALS} decimals.")
+
+    cp = cp_model.CpModel()
+    proto = cp.proto
+    for lower, upper in zip(model.col_lower.tolist(), model.col_upper.tolist()):
+        proto.variables.add().domain.extend([_to_int_bound(lower), _to_int_bound(upper)])
+    a_start = model.a_start.tolist()
+    a_index = model.a_index.tolist()
+    a_value = model.a_value.astype(np.int64).tolist()
+    for row, (lower, upper) in enumerate(zip(model.row_lower.tolist(), model.row_upper.tolist())):
+        linear = proto.constraints.add().linear
+        linear.vars.extend(a_index[a_start[row]:a_start[row + 1]])
+        linear.coeffs.extend(a_value[a_start[row]:a_start[row + 1]])
+        linear.domain.extend([_to_int_bound(lower), _to_int_bound(upper)])
+    costed = np.flatnonzero(model.col_cost)
+    proto.objective.vars.extend(costed.tolist())
+    proto.objective.coeffs.extend(
+        np.round(model.col_cost[costed] * scale).astype(np.int64).tolist())
+    proto.objective.offset = float(model.offset) * scale
+    proto.objective.scaling_factor = 1 / scale
+    return cp
+
+
+class _SolutionCallback(cp_model.CpSolverSolutionCallback):
+    """Passes every CP-SAT solution on to SolverOptions.on_solution."""
+
+    def __init__(self, on_solution, start):
+        super().__init__()
+        self.on_solution = on_solution
+        self.start = start
+
+    def on_solution_callback(self):
+        self.on_solution(SolverResult(
+            FEASIBLE, col_value=np.array(self.response_proto.solution, dtype=np.float64),
+            objective=self.objective_value, bound=self.best_objective_bound,
+            wall_time=time.time() - self.start, backend="cp-sat"))
+
+
+@register_backend("cp-sat")
+def solve_cp_sat(model, options=None):
+    """
+    Solves the model with the CP-SAT solver.
+
+    options.threads is the number of parallel search workers. It defaults to all cores, but at
+    least MIN_CP_SAT_WORKERS: the portfolio of LP, LNS and search workers is what makes CP-SAT
+    effective on this model, even when the workers have to share cores.
+    """
+    options = options or SolverOptions()
+    start = time.time()
+    cp = to_cp_model(model)
+    indices, values = options.hinted_columns()
+    cp.proto.solution_hint.vars.extend(indices.tolist())
+    cp.proto.solution_hint.values.extend(np.round(values).astype(np.int64).tolist())
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(options.time_limit)
+    solver.parameters.num_workers = options.threads or max(os.cpu_count() or 1, MIN_CP_SAT_WORKERS)
+    if options.rel_gap is not None:
+        solver.parameters.relative_gap_limit = float(options.rel_gap)
+    if options.abs_gap is not None:
+        solver.parameters.absolute_gap_limit = float(options.abs_gap)
+    if options.seed is not None:
+        solver.parameters.random_seed = int(options.seed)
+    if options.presolve is not None:
+        solver.parameters.cp_model_presolve = bool(options.presolve)
+    callback = _SolutionCallback(options.on_solution, start) if options.on_solution else None
+    done = _watch_stop(options.stop, solver.stop_search)
+    status = solver.solve(cp, callback)
+    done.set()
+    stats = {"nodes": solver.num_branches, "conflicts": solver.num_conflicts,
+             "iterations": solver.response_proto.num_lp_iterations}
+
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result_status = INFEASIBLE if status == cp_model.INFEASIBLE else NOT_SOLVED
+        return SolverResult(result_status, wall_time=time.time() - start, backend="cp-sat",
+                            stats=stats)
+    return SolverResult(
+        OPTIMAL if status == cp_model.OPTIMAL else FEASIBLE,
+        col_value=np.array(solver.response_proto.solution, dtype=np.float64),
+        objective=solver.objective_value,
+        bound=solver.best_objective_bound,
+        wall_time=time.time() - start,
+        backend="cp-sat",
+        stats=stats,
+    )
+
+
+# The racing portfolio, the LNS and the staged solve register themselves as the "portfolio",
+# "lns" and "lexicographic" backends.
+import portfolio  # noqa: E402,F401
+import lns  # noqa: E402,F401
+import lexicographic  # noqa: E402,F401
+import lazy_constraints  # noqa: E402,F401
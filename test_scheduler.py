@@ -2,7 +2,7 @@ import csv
 import datetime
 import os
 import unittest
-from scheduler import generate_schedule_highs, variable_names, ScheduleSolution
+from scheduler import generate_schedule_highs, ScheduleSolution
 
 class TestScheduler(unittest.TestCase):
     # Initialize instance variables at class level
@@ -41,7 +41,7 @@ class TestScheduler(unittest.TestCase):
         self.ch_holidays = []
 
     def test_schedule_feasibility(self):
-        """Ensure that the scheduler returns a ScheduleSolution with the expected number of decision variables."""
+        """Ensure that the scheduler returns a ScheduleSolution with one row per employee and one column per day."""
         solution = generate_schedule_highs(
             self.employees, 
             self.shifts,
@@ -52,9 +52,9 @@ class TestScheduler(unittest.TestCase):
             self.month, 
             self.ch_holidays)
         self.assertIsNotNone(solution, "No solution was found.")
-        # Verify that the count of solution values equals the count of declared variables.
-        self.assertEqual(len(solution.col_value), len(variable_names),
-                         "Mismatch between solution variables and extracted variable names.")
+        self.assertIsInstance(solution, ScheduleSolution)
+        self.assertEqual(solution.assignments.shape, (len(self.employees), 28),
+                         "Mismatch between the assignment matrix and employees x days.")
     
     def test_lehrlinge_weekday_restriction(self):
         """
@@ -72,21 +72,16 @@ class TestScheduler(unittest.TestCase):
             self.month, 
             self.ch_holidays)
         
-        num_days = 28  # February 2023 has 28 days
-        for var, val in zip(variable_names, solution.col_value):
-            emp_id, day, shift_code = var
+        for (emp_id, day), shift_code in solution.schedule.items():
             qual = self.employee_qualifications.get(emp_id)
             if qual in {"Ausbildung 1", "Ausbildung 2"}:
                 date = datetime.date(self.year, self.month, day)
                 # If it is a weekend, no shift should be assigned.
-                if date.weekday() >= 5:
-                    self.assertEqual(val, 0,
-                                     f"Employee {emp_id} ({qual}) assigned on weekend {date} for shift {shift_code}.")
-                else:
-                    # On weekdays, ensure that only "B Dienst" or "C Dienst" are possible.
-                    if shift_code not in {"B Dienst", "C Dienst"}:
-                        self.assertEqual(val, 0,
-                                         f"Employee {emp_id} ({qual}) assigned to non-B/C weekday shift {shift_code}.")
+                self.assertLess(date.weekday(), 5,
+                                f"Employee {emp_id} ({qual}) assigned on weekend {date} for shift {shift_code}.")
+                # On weekdays, ensure that only "B Dienst" or "C Dienst" are possible.
+                self.assertIn(shift_code, {"B Dienst", "C Dienst"},
+                              f"Employee {emp_id} ({qual}) assigned to non-B/C weekday shift {shift_code}.")
     
     def test_split_shift_penalty_application(self):
         """
@@ -0,0 +1,41 @@
+import unittest
+from absence_index import AbsenceIndex
+
+
+class TestAbsenceIndex(unittest.TestCase):
+    def setUp(self):
+        self.absences = {
+            1: [("07.02.", "w"), ("10.02.", "Fe"), ("11.02.", "Fe"), ("11.02.", "SL")],
+            2: [("5.2.", "SL"), ("28.01.", "Fe"), ("invalid", "Fe"), ("x.2.", "w")],
+            3: [("03.02.", "Kr"), ("04.02.", "unknown")],
+        }
+        self.index = AbsenceIndex.for_month(self.absences, 2025, 2)
+
+    def test_is_absent(self):
+        self.assertTrue(self.index.is_absent(1, 7))
+        self.assertTrue(self.index.is_absent(1, 10))
+        self.assertFalse(self.index.is_absent(1, 8))
+        self.assertFalse(self.index.is_absent(4, 1))  # Employee without absences
+
+    def test_other_months_are_ignored(self):
+        self.assertFalse(self.index.is_absent(2, 28))
+        self.assertTrue(self.index.is_absent(2, 5))
+
+    def test_has_type(self):
+        self.assertTrue(self.index.has_type(1, 11, "SL"))
+        self.assertTrue(self.index.has_type(1, 11, "Fe"))
+        self.assertFalse(self.index.has_type(1, 7, "Fe", "SL"))
+        self.assertTrue(self.index.has_type(3, 3, "Kr"))
+
+    def test_unknown_type_blocks_day(self):
+        self.assertTrue(self.index.is_absent(3, 4))
+        self.assertFalse(self.index.has_type(3, 4, "Fe", "SL"))
+
+    def test_credited_days_counts_each_day_once(self):
+        self.assertEqual(self.index.credited_days(1), 2)
+        self.assertEqual(self.index.credited_days(2), 1)
+        self.assertEqual(self.index.credited_days(3), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
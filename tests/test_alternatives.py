@@ -0,0 +1,69 @@
+import itertools
+import time
+import unittest
+
+import numpy as np
+
+import alternatives
+import model_builder
+import solver_backends
+from benchmark import make_synthetic_ward
+
+OPTIONS = solver_backends.SolverOptions(time_limit=60)
+
+
+class TestAlternatives(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = model_builder.build_model(*make_synthetic_ward(16, seed=4))
+        cls.reference = solver_backends.solve_highs(cls.model, OPTIONS)
+        cls.schedule = model_builder.extract_schedule(cls.model, cls.reference.col_value)
+
+    def test_distance_row_counts_changed_cells(self):
+        cols, vals, lower, _ = alternatives.distance_row(self.model, self.schedule, 0)
+        values = self.reference.col_value
+        self.assertAlmostEqual(float(vals @ values[cols]) - lower, 0.0)
+        other = dict(self.schedule)
+        cell = next(iter(other))
+        del other[cell]
+        x = values.copy()
+        x[self.model.x_index[self.model.x_index >= 0]] = 0
+        x[self.model.y_index[self.model.y_index >= 0]] = 0
+        for (e_id, day), shift in other.items():
+            e = self.model.employee_ids.index(e_id)
+            col = (self.model.y_index[e, day - 1] if shift == "Bü Dienst"
+                   else self.model.x_index[e, day - 1, self.model.shift_codes.index(shift)])
+            x[col] = 1
+        self.assertAlmostEqual(float(vals @ x[cols]) - lower, 1.0)
+
+    def test_alternatives_are_diverse_and_good(self):
+        result = alternatives.generate_alternatives(self.model, 3, min_distance=10,
+                                                    backend="highs", options=OPTIONS)
+        self.assertEqual(len(result), 3)
+        self.assertAlmostEqual(result[0].objective, self.reference.objective, places=3)
+        self.assertTrue(np.all(np.diff([a.objective for a in result]) >= -1e-6))
+        for a, b in itertools.combinations(result, 2):
+            self.assertGreaterEqual(alternatives.cell_distance(a.schedule, b.schedule), 10)
+
+    def test_cp_sat_alternatives(self):
+        perturbed = alternatives.perturbed(self.model, 1)
+        self.assertTrue(np.all(perturbed.col_cost == np.round(perturbed.col_cost)))
+        result = alternatives.generate_alternatives(self.model, 2, min_distance=10,
+                                                    backend="cp-sat", options=OPTIONS)
+        self.assertEqual(len(result), 2)
+        self.assertAlmostEqual(result[0].objective, self.reference.objective, places=3)
+        self.assertGreaterEqual(alternatives.cell_distance(result[0].schedule,
+                                                           result[1].schedule), 10)
+
+    def test_phases_share_the_time_limit(self):
+        # The optimum of this ward takes HiGHS about two seconds, so every phase runs into the
+        # limit; only starting the worker processes may come on top of it.
+        model = model_builder.build_model(*make_synthetic_ward(60, seed=1))
+        start = time.time()
+        alternatives.generate_alternatives(model, 3, backend="highs",
+                                           options=solver_backends.SolverOptions(time_limit=4))
+        self.assertLess(time.time() - start, 4 + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import time
+import unittest
+
+import anytime
+import model_builder
+from benchmark import make_synthetic_ward
+
+
+class TestAnytime(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = model_builder.build_model(*make_synthetic_ward(20, seed=20))
+
+    def test_incumbents_improve_to_optimum(self):
+        job = anytime.AnytimeSolve(self.model, "highs").start()
+        self.assertTrue(job.wait(60))
+        objectives = [incumbent.objective for incumbent in job.incumbents]
+        self.assertEqual(objectives, sorted(objectives, reverse=True))
+        self.assertAlmostEqual(job.best.objective, 1090.0, places=3)
+        self.assertTrue(job.best.schedule)
+
+    def test_stop_keeps_current_best(self):
+        model = model_builder.build_model(*make_synthetic_ward(60, seed=3))
+        job = anytime.AnytimeSolve(model, "cp-sat").start()
+        while job.best is None and job.running:
+            time.sleep(0.1)
+        job.stop()
+        self.assertTrue(job.wait(10))
+        self.assertIsNotNone(job.best)
+        self.assertIsNone(job.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+import pandas as pd
+
+import batch
+import solver_backends
+from benchmark import make_synthetic_ward
+
+
+class TestBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.wards = []
+        for name, size, seed in (("A", 20, 20), ("B", 30, 1)):
+            employees, absences, quals, workload, cls.year, cls.month, cls.holidays = \
+                make_synthetic_ward(size, seed=seed)
+            cls.wards.append(batch.Ward(name, employees, absences, quals, workload))
+
+    def test_ward_from_dataframe(self):
+        df = pd.DataFrame({
+            "name": ["Anna", "Ben"],
+            "pensum": [100, float("nan")],
+            "diensttage": [20.0, 10.0],
+            "qualifikation": ["HF", "PH"],
+            "SL": ["03.02.-04.02.", ""],
+            "Fe": ["", "10.02."],
+            "UW": ["", ""],
+        })
+        ward = batch.Ward.from_dataframe("Ward 1", df)
+        self.assertEqual([emp["id"] for emp in ward.employees], [1, 2])
+        self.assertEqual(ward.employee_qualifications, {1: "HF", 2: "PH"})
+        self.assertEqual(ward.employee_workload, {1: 20, 2: 10})
+        self.assertEqual(ward.absences, {1: [("03.02.", "SL"), ("04.02.", "SL")],
+                                         2: [("10.02.", "Fe")]})
+
+    def test_solve_wards_in_parallel(self):
+        results = batch.solve_wards(self.wards, self.year, self.month, self.holidays,
+                                    backend="highs", time_limit={"A": 60, "B": 60}, workers=2)
+        self.assertEqual([result.ward.name for result in results], ["A", "B"])
+        self.assertEqual([result.status for result in results], [solver_backends.OPTIMAL] * 2)
+        self.assertAlmostEqual(results[0].objective, 1090.0, places=3)
+        self.assertAlmostEqual(results[1].objective, 581.0, places=3)
+        summary = batch.summary_table(results)
+        self.assertEqual(list(summary["ward"]), ["A", "B"])
+        self.assertTrue((summary["wall_time"] >= summary["solve_time"]).all())
+
+    def test_failed_ward_is_reported(self):
+        result = batch.solve_ward(self.wards[0], self.year, self.month, self.holidays,
+                                  backend="no-such-backend")
+        self.assertEqual(result.status, solver_backends.NOT_SOLVED)
+        self.assertFalse(result.has_solution)
+        self.assertIn("no-such-backend", result.error)
+
+    def test_schedule_table(self):
+        ward = self.wards[0]
+        result = batch.solve_ward(ward, self.year, self.month, self.holidays, backend="highs",
+                                  use_warm_start=False)
+        table, totals = batch.schedule_table(ward, result.schedule, self.year, self.month)
+        self.assertEqual(len(table), len(ward.employees))
+        self.assertEqual(table.index.get_level_values("qualification")[0], "Leitung")
+        worked = sum(code not in batch.NOT_WORKED for code in result.schedule.values())
+        self.assertLessEqual(worked, table["Ist"].sum())
+        self.assertEqual(totals.loc["Soll/Ist", "Soll"], str(sum(ward.employee_workload.values())))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+import benchmark
+import solver_backends
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_synthetic_ward_is_seeded(self):
+        self.assertEqual(benchmark.make_synthetic_ward(30, seed=5),
+                         benchmark.make_synthetic_ward(30, seed=5))
+        self.assertNotEqual(benchmark.make_synthetic_ward(30, seed=5),
+                            benchmark.make_synthetic_ward(30, seed=6))
+
+    def test_synthetic_ward_variants(self):
+        employees, absences, quals, _, year, month, ch_holidays = benchmark.make_synthetic_ward(
+            200, month=12, seed=1, qual_weights={"HF": 1, "PH": 0}, absence_rate=0.3,
+            ch_holidays=benchmark.SCALING_SCENARIOS["holidays"]["ch_holidays"])
+        self.assertEqual(set(quals.values()), {"Leitung", "HF"})
+        days = sum(len(records) for records in absences.values())
+        self.assertAlmostEqual(days / (len(employees) * 31), 0.3, delta=0.03)
+        self.assertTrue(all(record[0].endswith(".12.") for records in absences.values()
+                            for record in records))
+        self.assertEqual(sum(day.month == 12 for day in ch_holidays), 2)
+
+    def test_scaling_results_round_trip(self):
+        row = benchmark.scaling_case("base", 20, "highs", time_limit=60, seed=20)
+        self.assertEqual(row["status"], solver_backends.OPTIMAL)
+        self.assertAlmostEqual(row["objective"], 1090.0, places=3)
+        self.assertIsNotNone(row["first_feasible_s"])
+        self.assertEqual(row["optimal_s"], row["solve_s"])
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("results.json", "results.csv"):
+                path = os.path.join(directory, name)
+                benchmark.write_results([row], path, time_limit=60)
+                rows = benchmark.read_results(path)
+                self.assertEqual(rows[0]["variables"], row["variables"])
+                self.assertAlmostEqual(rows[0]["objective"], row["objective"])
+                comparison = benchmark.compare_results([row], rows)
+                self.assertEqual(comparison[0]["objective_ratio"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
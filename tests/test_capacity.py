@@ -0,0 +1,63 @@
+import copy
+import unittest
+
+import capacity
+import model_builder
+import solver_backends
+from benchmark import make_synthetic_ward
+from rules import FACH_QUALIFICATIONS, PENALTIES
+
+
+class TestCapacity(unittest.TestCase):
+    def setUp(self):
+        self.ward = make_synthetic_ward(20, seed=20)
+        (self.employees, self.absences, self.qualifications, self.workload,
+         self.year, self.month, self.ch_holidays) = self.ward
+
+    def with_absent(self, employee_ids, day):
+        absences = copy.deepcopy(self.absences)
+        for e_id in employee_ids:
+            absences.setdefault(e_id, []).append((f"{day:02d}.{self.month:02d}.", "Fe"))
+        return (self.employees, absences, self.qualifications, self.workload, self.year,
+                self.month, self.ch_holidays)
+
+    def test_staffed_ward(self):
+        report = capacity.analyze_capacity(*self.ward)
+        self.assertTrue(report.feasible)
+        self.assertEqual(report.unmeetable_days, [])
+        self.assertEqual(report.min_penalty, 0)
+
+    def test_understaffed_day_is_infeasible(self):
+        ids = [emp["id"] for emp in self.employees]
+        ward = self.with_absent(ids[:-3], 10)
+        report = capacity.analyze_capacity(*ward)
+        self.assertFalse(report.feasible)
+        self.assertEqual(report.unmeetable_days, [10])
+        self.assertTrue(any("infeasible" in line for line in report.messages()))
+        model = model_builder.build_model(*ward)
+        result = solver_backends.BACKENDS["highs"](model, solver_backends.SolverOptions(10))
+        self.assertEqual(result.status, solver_backends.INFEASIBLE)
+
+    def test_missing_fach_tightens_slack(self):
+        fach = [e_id for e_id, qual in self.qualifications.items()
+                if qual in FACH_QUALIFICATIONS]
+        ward = self.with_absent(fach, 12)
+        report = capacity.analyze_capacity(*ward)
+        self.assertTrue(report.feasible)
+        self.assertEqual(report.unmeetable_days, [12])
+        self.assertGreaterEqual(report.min_penalty,
+                                PENALTIES["FACH_PENALTY"] + PENALTIES["EARLY_FACH_PENALTY"])
+
+        # The slack columns start at the shortfall; the optimum pays at least its penalties.
+        model = model_builder.build_model(*ward)
+        slack = (model.col_penalty >= 0) & (model.col_lower > 0)
+        self.assertTrue(slack.any())
+        self.assertAlmostEqual((model.col_cost[slack] * model.col_lower[slack]).sum(),
+                               report.min_penalty)
+        result = solver_backends.BACKENDS["highs"](model, solver_backends.SolverOptions(60))
+        self.assertEqual(result.status, solver_backends.OPTIMAL)
+        self.assertGreaterEqual(result.objective, report.min_penalty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+
+import heuristic
+import model_builder
+import solver_backends
+import validator
+import warm_start
+from benchmark import make_synthetic_ward
+
+
+class TestHeuristic(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.ward = make_synthetic_ward(30, seed=1)
+        cls.result = heuristic.heuristic_schedule(*cls.ward)
+
+    def test_feasible_within_budget(self):
+        self.assertTrue(self.result.feasible)
+        self.assertGreater(self.result.iterations, 0)
+        self.assertLess(self.result.wall_time, 1.5)
+        # The MIP optimum of this ward is 581.
+        self.assertGreaterEqual(self.result.objective, 581)
+        self.assertLess(self.result.objective, 2000)
+
+    def test_objective_matches_validator(self):
+        evaluation = validator.ScheduleValidator(*self.ward).evaluate(self.result.schedule)
+        self.assertEqual(evaluation.objective, self.result.objective)
+        self.assertTrue(evaluation.feasible)
+
+    def test_search_cost_matches_validator(self):
+        # Random rosters with long blocks: every penalty, including the consecutive-days one,
+        # and every unit of hard violation must be charged like the validator does.
+        checker = validator.ScheduleValidator(*self.ward)
+        search = heuristic._Search(checker, 0)
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            codes = np.full((search.num_emp, search.num_days), heuristic.OFF)
+            for e, d in zip(*np.nonzero(rng.random(codes.shape) < 0.7)):
+                codes[e, d] = rng.choice(np.flatnonzero(search.allowed[e, d]))
+            search.set_codes(codes)
+            evaluation = checker.evaluate(np.where(codes == heuristic.OFF, validator.OFF, codes))
+            self.assertGreater(evaluation.breakdown["CONSECUTIVE_SHIFT_PENALTY"], 0)
+            hard = sum(violation.amount for violation in evaluation.hard_violations)
+            self.assertEqual(search.cost, evaluation.objective + heuristic.HARD_PENALTY * hard)
+
+    def test_row_deltas_match_full_rows(self):
+        # The delta table is built from the three day categories; it must equal the cost of
+        # every changed row evaluated in full.
+        search = heuristic._Search(validator.ScheduleValidator(*self.ward), 0)
+        rng = np.random.default_rng(1)
+        codes = np.where(rng.random((search.num_emp, search.num_days)) < 0.6,
+                         rng.integers(0, heuristic.NUM_CODES, (search.num_emp, search.num_days)),
+                         heuristic.OFF)
+        search.set_codes(codes)
+        shape = (search.num_emp, search.num_days, heuristic.NUM_CODES)
+        rows = np.broadcast_to(codes[:, None, None], shape + (search.num_days,)).copy()
+        rows[:, search.days, :, search.days] = np.arange(heuristic.NUM_CODES)
+        costs = search._row_costs(rows.reshape(-1, search.num_days),
+                                  np.repeat(np.arange(search.num_emp), search.num_days
+                                            * heuristic.NUM_CODES)).reshape(shape)
+        np.testing.assert_array_equal(search.row_delta, costs - search.row_cost[:, None, None])
+
+    def test_parallel_restarts(self):
+        result = heuristic.heuristic_schedule(*self.ward, restarts=2)
+        self.assertIn(result.seed, (0, 1))
+        self.assertTrue(result.feasible)
+
+    def test_warm_start_for_exact_solver(self):
+        model = model_builder.build_model(*self.ward)
+        options = solver_backends.SolverOptions(
+            time_limit=60, hint=warm_start.hint_from_schedule(model, self.result.schedule))
+        result = solver_backends.BACKENDS["highs"](model, options)
+        self.assertAlmostEqual(result.objective, 581.0, places=3)
+
+
+class TestLargeWard(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.ward = make_synthetic_ward(200, seed=1)
+
+    def test_budget_includes_construction(self):
+        result = heuristic.heuristic_schedule(*self.ward, time_limit=0.5)
+        self.assertLess(result.wall_time, 1.0)
+
+    def test_default_budget_leaves_time_for_search(self):
+        # The default budget does not grow with the ward.
+        result = heuristic.heuristic_schedule(*self.ward)
+        self.assertLess(result.wall_time, heuristic.TIME_LIMIT + 0.5)
+        self.assertGreater(result.iterations, 0)
+        self.assertTrue(result.feasible)
+        evaluation = validator.ScheduleValidator(*self.ward).evaluate(result.schedule)
+        self.assertEqual(evaluation.objective, result.objective)
+
+
+if __name__ == '__main__':
+    unittest.main()
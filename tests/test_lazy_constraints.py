@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+import lazy_constraints
+import model_builder
+import solver_backends
+import validator
+from benchmark import make_synthetic_ward
+
+
+class TestLazyConstraints(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.ward = make_synthetic_ward(20, seed=20)
+        cls.model = model_builder.build_model(*cls.ward)
+        cls.full = solver_backends.BACKENDS["highs"](cls.model, solver_backends.SolverOptions(60))
+
+    def test_select_rows(self):
+        rows = self.model.rows_of_family("transitions")
+        selected = model_builder.select_rows(self.model, rows)
+        self.assertEqual(selected.num_rows, len(rows))
+        activity = model_builder.row_activity(self.model, self.full.col_value)
+        np.testing.assert_allclose(model_builder.row_activity(selected, self.full.col_value),
+                                   activity[rows])
+        self.assertEqual(len(lazy_constraints.violated_rows(self.model, self.full.col_value)), 0)
+
+    def test_cut_loop_matches_full_model(self):
+        result = solver_backends.BACKENDS["lazy"](self.model, solver_backends.SolverOptions(120))
+        self.assertEqual(result.status, solver_backends.OPTIMAL)
+        self.assertAlmostEqual(result.objective, self.full.objective, places=3)
+        self.assertEqual(len(lazy_constraints.violated_rows(self.model, result.col_value)), 0)
+        self.assertGreater(len(result.stats["rounds"]), 1)
+        self.assertLessEqual(result.stats["rows_added"], result.stats["pool_rows"])
+
+        schedule = model_builder.extract_schedule(self.model, result.col_value)
+        evaluation = validator.ScheduleValidator(*self.ward).evaluate(schedule)
+        self.assertTrue(evaluation.feasible, evaluation.hard_violations)
+        self.assertAlmostEqual(evaluation.objective, self.full.objective, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
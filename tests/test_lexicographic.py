@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+import lexicographic
+import model_builder
+import solver_backends
+from benchmark import make_synthetic_ward
+from rules import PRIORITY_TIERS
+
+
+class TestLexicographic(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = model_builder.build_model(*make_synthetic_ward(16, seed=4))
+        cls.weighted = solver_backends.BACKENDS["highs"](cls.model,
+                                                         solver_backends.SolverOptions(60))
+
+    def test_tiers_cover_objective(self):
+        columns = lexicographic.tier_columns(self.model)
+        np.testing.assert_array_equal(np.sum(columns, axis=0), 1)
+        values = lexicographic.tier_values(self.model, self.weighted.col_value)
+        self.assertEqual(list(values), [tier for tier, _ in PRIORITY_TIERS])
+        self.assertAlmostEqual(sum(values.values()) + self.model.offset,
+                               self.weighted.objective, places=3)
+
+    def test_staged_solve(self):
+        solutions = []
+        result = lexicographic.solve_lexicographic(
+            self.model, solver_backends.SolverOptions(60, on_solution=solutions.append))
+        self.assertEqual(result.status, solver_backends.OPTIMAL)
+        self.assertEqual(len(result.stats["stages"]), len(PRIORITY_TIERS))
+        self.assertEqual(len(solutions), len(PRIORITY_TIERS))
+        self.assertAlmostEqual(self.model.col_cost @ result.col_value + self.model.offset,
+                               result.objective, places=3)
+        # No higher tier is worse than in the weighted optimum.
+        staged = lexicographic.tier_values(self.model, result.col_value)
+        weighted = lexicographic.tier_values(self.model, self.weighted.col_value)
+        self.assertLessEqual(tuple(np.round(list(staged.values()))),
+                             tuple(np.round(list(weighted.values()))))
+
+    def test_infeasible(self):
+        model = model_builder.build_model(*make_synthetic_ward(12, seed=0))
+        result = lexicographic.solve_lexicographic(model, solver_backends.SolverOptions(10))
+        self.assertEqual(result.status, solver_backends.INFEASIBLE)
+        self.assertFalse(result.has_solution)
+
+
+if __name__ == '__main__':
+    unittest.main()
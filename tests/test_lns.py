@@ -0,0 +1,57 @@
+import threading
+import unittest
+
+import numpy as np
+
+import heuristic
+import lns
+import model_builder
+import solver_backends
+import warm_start
+from benchmark import make_synthetic_ward
+
+
+class TestLNS(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.ward = make_synthetic_ward(30, seed=1)
+        cls.model = model_builder.build_model(*cls.ward)
+        cls.hint = warm_start.hint_from_schedule(
+            cls.model, heuristic.heuristic_schedule(*cls.ward).schedule)
+
+    def test_fixed_neighborhood_keeps_incumbent(self):
+        incumbent = lns.initial_solution(self.model, solver_backends.SolverOptions(hint=self.hint),
+                                         deadline=float("inf"))
+        free = np.zeros((len(self.model.employee_ids), len(self.model.dates)), dtype=bool)
+        col_lower, col_upper = lns.fix_outside(self.model, incumbent.col_value, free)
+        cells = lns.cell_columns(self.model)
+        cols = cells[cells >= 0]
+        np.testing.assert_array_equal(col_lower[cols], col_upper[cols])
+        np.testing.assert_array_equal(col_lower[cols], np.round(incumbent.col_value[cols]))
+
+    def test_reaches_optimum_from_heuristic(self):
+        options = solver_backends.SolverOptions(time_limit=8, hint=self.hint, seed=0)
+        result = lns.solve_lns(self.model, options, workers=1)
+        self.assertTrue(result.has_solution)
+        self.assertAlmostEqual(result.objective, 581.0, places=3)
+        self.assertAlmostEqual(self.model.col_cost @ result.col_value + self.model.offset,
+                               result.objective, places=3)
+
+    def test_stop_returns_incumbent(self):
+        incumbents = []
+        stop = threading.Event()
+
+        def on_solution(result):
+            incumbents.append(result.objective)
+            stop.set()
+
+        options = solver_backends.SolverOptions(time_limit=60, hint=self.hint,
+                                                on_solution=on_solution, stop=stop)
+        result = solver_backends.BACKENDS["lns"](self.model, options)
+        self.assertTrue(result.has_solution)
+        self.assertLess(result.wall_time, 20)
+        self.assertEqual(result.objective, incumbents[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import datetime
+import unittest
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+import model_builder
+import scheduler
+import solver_backends
+from benchmark import make_synthetic_ward, exported_proto, solve_proto
+
+
+class TestModelBuilder(unittest.TestCase):
+    def setUp(self):
+        self.ward = make_synthetic_ward(20, seed=20)
+        (self.employees, self.absences, self.qualifications, self.workload,
+         self.year, self.month, self.ch_holidays) = self.ward
+        self.model = model_builder.build_model(*self.ward)
+
+    def test_csr_shape(self):
+        model = self.model
+        self.assertEqual(len(model.a_start), model.num_rows + 1)
+        self.assertEqual(model.a_start[-1], model.num_nonzeros)
+        self.assertTrue(np.all(np.diff(model.a_start) >= 0))
+        self.assertTrue(np.all((model.a_index >= 0) & (model.a_index < model.num_cols)))
+        self.assertEqual(len(model.row_family), model.num_rows)
+
+    def test_build_profile_adds_up(self):
+        model = model_builder.build_model(*self.ward, symmetry_breaking=True)
+        profile = {entry["family"]: entry for entry in model.build_profile}
+        self.assertEqual(sum(entry["variables"] for entry in profile.values()), model.num_cols)
+        self.assertEqual(sum(entry["rows"] for entry in profile.values()), model.num_rows)
+        self.assertEqual(sum(entry["nonzeros"] for entry in profile.values()),
+                         model.num_nonzeros)
+        for family in model.families:
+            self.assertEqual(profile[family]["rows"], len(model.rows_of_family(family)))
+        self.assertTrue(all(entry["seconds"] >= 0 for entry in profile.values()))
+
+    def test_no_variables_for_pruned_cells(self):
+        model = self.model
+        for e, e_id in enumerate(model.employee_ids):
+            qual = self.qualifications[e_id]
+            for d, day in enumerate(model.dates):
+                allowed = {s for i, s in enumerate(model.shift_codes) if model.x_index[e, d, i] >= 0}
+                absent = any(int(rec[0].split('.')[0]) == day.day for rec in self.absences.get(e_id, []))
+                if absent or (day.weekday() >= 5 and qual in {"Leitung", "Ausbildung 1", "Ausbildung 2"}):
+                    self.assertEqual(allowed, set())
+                    self.assertEqual(model.y_index[e, d], -1)
+                elif qual == "Leitung":
+                    self.assertEqual(allowed, {"B Dienst"})
+                elif qual in {"Ausbildung 1", "Ausbildung 2"}:
+                    self.assertEqual(allowed, {"B Dienst", "C Dienst"})
+                if qual not in {"PH", "HF"}:
+                    self.assertFalse(allowed & {"BS Dienst", "C4 Dienst"})
+
+    def test_shift_domain_mask_matches_reference_domains(self):
+        index = scheduler.AbsenceIndex.for_month(self.absences, self.year, self.month)
+        domain, buero = scheduler.build_shift_domains(
+            self.employees, model_builder.SHIFT_CODES, self.qualifications, self.year, self.month,
+            index.is_absent)
+        model = self.model
+        for e, e_id in enumerate(model.employee_ids):
+            for d in range(len(model.dates)):
+                allowed = [s for i, s in enumerate(model.shift_codes) if model.x_index[e, d, i] >= 0]
+                self.assertEqual(allowed, domain.get((e_id, d + 1), []))
+                self.assertEqual(model.y_index[e, d] >= 0, (e_id, d + 1) in buero)
+
+    def test_weekend_groups(self):
+        # March 2025 starts on a Saturday and ends on a Monday.
+        dates = [datetime.date(2025, 3, d) for d in range(1, 32)]
+        groups = model_builder.weekend_groups(dates)
+        self.assertEqual(groups[0], [0, 1])
+        self.assertEqual(groups[-1], [28, 29])
+        self.assertEqual(len(groups), 5)
+
+    def test_same_optimum_as_reference_model(self):
+        result = solver_backends.solve_cbc(self.model, solver_backends.SolverOptions(time_limit=60))
+        self.assertEqual(result.status, solver_backends.OPTIMAL)
+
+        solver = pywraplp.Solver.CreateSolver('CBC_MIXED_INTEGER_PROGRAMMING')
+        scheduler.build_reference_model(solver, *self.ward)
+        solver.SetTimeLimit(60000)
+        self.assertEqual(solver.Solve(), pywraplp.Solver.OPTIMAL)
+        self.assertAlmostEqual(result.objective, solver.Objective().Value(), places=4)
+
+    def test_lp_bound_at_least_reference(self):
+        ward = make_synthetic_ward(16, seed=4)
+        reference = pywraplp.Solver.CreateSolver('CBC_MIXED_INTEGER_PROGRAMMING')
+        scheduler.build_reference_model(reference, *ward)
+        proto = solver_backends.to_mp_model_proto(model_builder.build_model(*ward))
+        bound, _ = solve_proto(proto, "CLP", True, 60)
+        reference_bound, _ = solve_proto(exported_proto(reference), "CLP", True, 60)
+        self.assertGreaterEqual(bound, reference_bound - 1e-6)
+
+    def test_symmetry_breaking_keeps_optimum(self):
+        # Same workload and no absences: employees of one qualification are interchangeable.
+        workload = {e_id: 16 for e_id in self.workload}
+        ward = (self.employees, {}, self.qualifications, workload, self.year, self.month,
+                self.ch_holidays)
+        plain = model_builder.build_model(*ward)
+        ordered = model_builder.build_model(*ward, symmetry_breaking=True)
+        self.assertIn("symmetry", ordered.families)
+        self.assertGreater(ordered.num_rows, plain.num_rows)
+        options = solver_backends.SolverOptions(time_limit=60)
+        plain_result = solver_backends.BACKENDS["highs"](plain, options)
+        ordered_result = solver_backends.BACKENDS["highs"](ordered, options)
+        self.assertEqual(ordered_result.status, solver_backends.OPTIMAL)
+        self.assertAlmostEqual(plain_result.objective, ordered_result.objective, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
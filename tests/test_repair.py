@@ -0,0 +1,45 @@
+import unittest
+
+import model_builder
+import repair
+import solver_backends
+from benchmark import make_synthetic_ward
+
+
+class TestRepair(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.ward = make_synthetic_ward(20, seed=20)
+        model = model_builder.build_model(*cls.ward)
+        result = solver_backends.solve_highs(model, solver_backends.SolverOptions(time_limit=60))
+        cls.schedule = model_builder.extract_schedule(model, result.col_value)
+        cls.month = cls.ward[5]
+
+    def test_sick_employee_is_replaced_locally(self):
+        e_id = next(e for (e, day) in sorted(self.schedule) if day == 10)
+        new_absences = {e_id: [(f"{day:02d}.{self.month:02d}.", "Kr") for day in (10, 11)]}
+        result = repair.repair_schedule(*self.ward, self.schedule, new_absences=new_absences)
+        self.assertTrue(result.has_solution)
+        self.assertEqual(result.scope, "neighborhood")
+        self.assertLess(result.wall_time, repair.REPAIR_TIME_LIMIT + 0.5)
+        self.assertNotIn((e_id, 10), result.schedule)
+        self.assertNotIn((e_id, 11), result.schedule)
+        self.assertIn((e_id, 10), result.changed_cells)
+        for e, day in result.changed_cells:
+            self.assertTrue(10 - repair.REPAIR_WINDOW_DAYS <= day <= 11 + repair.REPAIR_WINDOW_DAYS)
+
+    def test_locked_cells_are_kept(self):
+        cell = next(c for c in sorted(self.schedule) if c[1] == 5)
+        result = repair.repair_schedule(*self.ward, self.schedule, locked={cell: None})
+        self.assertTrue(result.has_solution)
+        self.assertNotIn(cell, result.schedule)
+        self.assertLessEqual(len(result.changed_cells), 4)
+
+    def test_no_changes_without_conflicts(self):
+        result = repair.repair_schedule(*self.ward, self.schedule)
+        self.assertEqual(result.schedule, self.schedule)
+        self.assertEqual(result.changed_cells, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import datetime
+import unittest
+
+import model_builder
+import rolling
+import solver_backends
+from benchmark import make_synthetic_ward
+
+
+class TestRolling(unittest.TestCase):
+    def setUp(self):
+        self.employees, self.absences, self.qualifications, self.workload, *_ = \
+            make_synthetic_ward(20, seed=20)
+        self.data = (self.employees, self.absences, self.qualifications, self.workload)
+
+    def test_history_and_lookahead_days(self):
+        history = {(2, datetime.date(2025, 1, 31)): "S Dienst",
+                   (3, datetime.date(2025, 1, 27)): "B Dienst"}
+        model = model_builder.build_model(*self.data, 2025, 2, [], history=history,
+                                          lookahead_days=7)
+        self.assertEqual(model.day_offset, 5)
+        self.assertEqual(model.num_month_days, 28)
+        self.assertEqual(len(model.dates), 5 + 28 + 7)
+        self.assertEqual(model.dates[model.day_offset], datetime.date(2025, 2, 1))
+        col = model.x_index[1, 4, model.shift_codes.index("S Dienst")]
+        self.assertEqual((model.col_lower[col], model.col_upper[col]), (1.0, 1.0))
+
+        result = solver_backends.solve_highs(model, solver_backends.SolverOptions(time_limit=60))
+        self.assertEqual(result.status, solver_backends.OPTIMAL)
+        schedule = model_builder.extract_schedule(model, result.col_value)
+        self.assertEqual(max(day for _, day in schedule), 28)
+        # No early shift after the S Dienst on January 31st.
+        self.assertNotIn(schedule.get((2, 1)), {"B Dienst", "C Dienst", "BS Dienst", "C4 Dienst"})
+
+    def test_boundary_conflicts(self):
+        tail = {(1, datetime.date(2025, 1, d)): "B Dienst" for d in range(27, 32)}
+        tail[(2, datetime.date(2025, 1, 31))] = "S Dienst"
+        state = rolling.BoundaryState.from_schedule(
+            {(e_id, date.day): shift for (e_id, date), shift in tail.items()}, 2025, 1)
+        self.assertEqual(state.trailing_streak(1), 5)
+        self.assertEqual(state.last_shift(2), "S Dienst")
+        self.assertEqual(rolling.boundary_conflicts(state, {(1, 1): "C Dienst", (2, 1): "C Dienst"}),
+                         {1, 2})
+        self.assertEqual(rolling.boundary_conflicts(state, {(1, 3): "C Dienst", (2, 2): "B Dienst"}),
+                         set())
+
+    def test_weekend_across_the_boundary(self):
+        # May 31st, 2025 is a Saturday: the weekend with Sunday, June 1st belongs to May.
+        may = {(1, 3): "B Dienst", (1, 10): "B Dienst",
+               (2, 4): "S Dienst",
+               (3, 3): "B Dienst", (3, 31): "S Dienst",
+               (4, 15): "B Dienst"}
+        state = rolling.BoundaryState.from_schedule(may, 2025, 5)
+        self.assertEqual(state.weekends, {1: 2, 2: 1, 3: 2})
+        june = {(e_id, 1): "S Dienst" for e_id in (1, 2, 3, 4)}
+        # Employee 1 has no weekend left in May, nor has employee 2 as Ausbildung 2; employee 3
+        # worked the Saturday, so the weekend was already counted.
+        self.assertEqual(rolling.boundary_conflicts(state, june, {2: "Ausbildung 2"}), {1, 2})
+        self.assertEqual(rolling.boundary_conflicts(state, june), {1})
+
+    def test_plan_horizon_has_no_boundary_conflicts(self):
+        plans = rolling.plan_horizon(*self.data, 2025, 1, 2, [], backend="highs")
+        self.assertEqual([plan.status for plan in plans], [solver_backends.OPTIMAL] * 2)
+        state = rolling.BoundaryState.from_schedule(plans[0].schedule, 2025, 1)
+        self.assertEqual(rolling.boundary_conflicts(state, plans[1].schedule), set())
+
+    def test_parallel_horizon_keeps_the_boundary_weekend(self):
+        # Solved independently, June works Sunday the 1st for employees without a weekend left
+        # in May; the stitching frees it.
+        employees, absences, qualifications, workload, *_ = make_synthetic_ward(30, seed=20)
+        plans = rolling.plan_horizon(employees, absences, qualifications, workload, 2025, 5, 2,
+                                     [], backend="highs", workers=2)
+        self.assertEqual([plan.status for plan in plans], [solver_backends.OPTIMAL] * 2)
+        self.assertTrue(plans[1].resolved)
+        state = rolling.BoundaryState.from_schedule(plans[0].schedule, 2025, 5)
+        self.assertEqual(rolling.boundary_conflicts(state, plans[1].schedule, qualifications),
+                         set())
+
+
+if __name__ == '__main__':
+    unittest.main()
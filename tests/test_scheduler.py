@@ -0,0 +1,174 @@
+import calendar
+import datetime
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+from ortools.linear_solver import pywraplp
+
+import scheduler
+from absence_index import AbsenceIndex
+from benchmark import make_synthetic_ward
+from rules import REQUIRED_SHIFTS
+
+
+def _solve(ward):
+    employees, absences, quals, workload, year, month, ch_holidays = ward
+    return scheduler.generate_schedule_highs(employees, [], absences, quals, workload, year, month,
+                                             ch_holidays, backend="highs")
+
+
+class TestScheduleSolution(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.wards = [make_synthetic_ward(20, seed=20), make_synthetic_ward(16, seed=4)]
+        cls.expected = [_solve(ward) for ward in cls.wards]
+
+    def test_result_is_self_contained(self):
+        solution = self.expected[0]
+        self.assertEqual(solution.assignments.shape, (20, 28))
+        self.assertAlmostEqual(sum(solution.objective_breakdown.values()), solution.objective,
+                               places=3)
+        self.assertEqual(solution.stats["backend"], "highs")
+        worked = sum(1 for code in solution.assignments.ravel() if code is not None)
+        self.assertEqual(len(solution.schedule), worked)
+
+    def test_profile_log(self):
+        employees, absences, quals, workload, year, month, ch_holidays = self.wards[0]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.jsonl")
+            solution = scheduler.generate_schedule_highs(
+                employees, [], absences, quals, workload, year, month, ch_holidays,
+                backend="highs", profile_log=path)
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+        families = [line["family"] for line in lines if line["event"] == "build"]
+        self.assertEqual(families, [entry["family"] for entry in solution.stats["build_profile"]])
+        self.assertIn("transitions", families)
+        solve = lines[-1]
+        self.assertEqual(solve["event"], "solve")
+        self.assertEqual((solve["year"], solve["month"]), (year, month))
+        self.assertAlmostEqual(solve["objective"], solution.objective, places=3)
+        stats = solution.stats["solver_stats"]
+        self.assertGreater(stats["iterations"], 0)
+        self.assertLess(stats["presolved_rows"], solution.stats["constraints"])
+
+    def test_entry_points_share_penalties_and_capacity_check(self):
+        employees, absences, quals, workload, year, month, ch_holidays = self.wards[1]
+        args = (employees, [], absences, quals, workload, year, month, ch_holidays)
+        penalties = {"WORKDAY_DEVIATION_PENALTY": 0}
+        expected = scheduler.generate_schedule_highs(*args, backend="highs", penalties=penalties)
+        alternatives = scheduler.generate_schedule_alternatives(
+            *args, num_alternatives=1, backend="highs", penalties=penalties)
+        self.assertAlmostEqual(alternatives[0].objective, expected.objective, places=3)
+        job = scheduler.start_anytime_schedule(*args, backend="highs", penalties=penalties)
+        job.wait()
+        self.assertAlmostEqual(job.best.objective, expected.objective, places=3)
+
+        # Everyone but two employees is absent on the 10th: no schedule is possible.
+        absent = {e_id: list(records) for e_id, records in absences.items()}
+        for emp in employees[2:]:
+            absent.setdefault(emp["id"], []).append((f"10.{month:02d}.", "Fe"))
+        args = (employees, [], absent, quals, workload, year, month, ch_holidays)
+        self.assertIsNone(scheduler.generate_schedule_highs(*args, backend="highs"))
+        self.assertEqual(scheduler.generate_schedule_alternatives(*args, backend="highs"), [])
+        self.assertIsNone(scheduler.start_anytime_schedule(*args, backend="highs"))
+
+    def test_concurrent_solves(self):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            in_threads = list(pool.map(_solve, self.wards))
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=2, mp_context=context) as pool:
+            in_processes = list(pool.map(_solve, self.wards))
+        for ward, expected, threaded, spawned in zip(self.wards, self.expected, in_threads,
+                                                     in_processes):
+            ids = {emp["id"] for emp in ward[0]}
+            for solution in (threaded, spawned):
+                self.assertAlmostEqual(solution.objective, expected.objective, places=3)
+                self.assertEqual(set(solution.employee_ids), ids)
+                self.assertTrue({e_id for e_id, _ in solution.schedule} <= ids)
+
+
+def _baseline_zeroed(qual, day, shift_code, absent):
+    """Whether the unpruned model fixed the variable to 0 (shift_code None: Bü Dienst)."""
+    if absent:
+        return True
+    weekend = day.weekday() >= 5
+    if shift_code is None:
+        return weekend or qual != "Leitung"
+    if qual == "Leitung":
+        return weekend or shift_code != "B Dienst"
+    if qual in {"Ausbildung 1", "Ausbildung 2"}:
+        return weekend or shift_code not in {"B Dienst", "C Dienst"}
+    return qual not in {"PH", "HF"} and shift_code in {"BS Dienst", "C4 Dienst"}
+
+
+class TestShiftDomains(unittest.TestCase):
+    def setUp(self):
+        employees, absences, quals, workload, year, month, ch_holidays = make_synthetic_ward(
+            20, seed=20)
+        # Cover all qualification rules: Lehrlinge of both years and a qualification
+        # without split shifts.
+        quals = dict(quals)
+        ph = [e_id for e_id, qual in quals.items() if qual == "PH"]
+        quals[ph[0]], quals[ph[1]] = "Ausbildung 1", "FaGe"
+        self.ward = (employees, absences, quals, workload, year, month, ch_holidays)
+        self.index = AbsenceIndex.for_month(absences, year, month)
+
+    def test_domains_match_baseline_zero_variables(self):
+        employees, _, quals, _, year, month, _ = self.ward
+        domain, buero = scheduler.build_shift_domains(employees, REQUIRED_SHIFTS.keys(), quals,
+                                                      year, month, self.index.is_absent)
+        for emp in employees:
+            e_id = emp["id"]
+            for d in range(1, calendar.monthrange(year, month)[1] + 1):
+                day = datetime.date(year, month, d)
+                absent = self.index.is_absent(e_id, d)
+                for shift_code in REQUIRED_SHIFTS:
+                    self.assertEqual(
+                        shift_code in domain.get((e_id, d), ()),
+                        not _baseline_zeroed(quals[e_id], day, shift_code, absent),
+                        (e_id, d, shift_code))
+                self.assertEqual((e_id, d) in buero,
+                                 not _baseline_zeroed(quals[e_id], day, None, absent))
+
+    def test_same_objective_as_unpruned_model(self):
+        employees, _, quals, _, year, month, _ = self.ward
+        full_domain = {(emp["id"], d): list(REQUIRED_SHIFTS)
+                       for emp in employees
+                       for d in range(1, calendar.monthrange(year, month)[1] + 1)}
+
+        def solve(unpruned):
+            solver = pywraplp.Solver.CreateSolver("CBC_MIXED_INTEGER_PROGRAMMING")
+            if not unpruned:
+                scheduler.build_reference_model(solver, *self.ward)
+            else:
+                # All variables, with the baseline's "== 0" rows instead of the pruning.
+                with mock.patch.object(scheduler, "build_shift_domains",
+                                       return_value=(full_domain, set(full_domain))):
+                    x, y = scheduler.build_reference_model(solver, *self.ward)
+                for (e_id, d, shift_code), var in x.items():
+                    day = datetime.date(year, month, d)
+                    if _baseline_zeroed(quals[e_id], day, shift_code,
+                                        self.index.is_absent(e_id, d)):
+                        solver.Add(var == 0)
+                for (e_id, d), var in y.items():
+                    if _baseline_zeroed(quals[e_id], datetime.date(year, month, d), None,
+                                        self.index.is_absent(e_id, d)):
+                        solver.Add(var == 0)
+            solver.SetTimeLimit(120000)
+            self.assertEqual(solver.Solve(), pywraplp.Solver.OPTIMAL)
+            return solver.Objective().Value(), solver.NumVariables()
+
+        pruned, pruned_vars = solve(False)
+        unpruned, unpruned_vars = solve(True)
+        self.assertLess(pruned_vars, unpruned_vars)
+        self.assertAlmostEqual(pruned, unpruned, places=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
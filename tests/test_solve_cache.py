@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import rules
+import solve_cache
+from benchmark import make_synthetic_ward
+
+
+class TestSolveCache(unittest.TestCase):
+    def setUp(self):
+        self.ward = make_synthetic_ward(10, seed=1)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key_ignores_record_order_and_other_months(self):
+        employees, absences, quals, workload, year, month, ch_holidays = self.ward
+        key = solve_cache.cache_key(*self.ward)
+        shuffled = {e_id: list(reversed(records)) + [("03.03.", "Fe")]
+                    for e_id, records in reversed(list(absences.items()))}
+        self.assertEqual(key, solve_cache.cache_key(list(reversed(employees)), shuffled, quals,
+                                                    workload, year, month, ch_holidays))
+
+    def test_key_changes_with_inputs(self):
+        employees, absences, quals, workload, year, month, ch_holidays = self.ward
+        key = solve_cache.cache_key(*self.ward)
+        changed = {**workload, 1: workload[1] + 1}
+        self.assertNotEqual(key, solve_cache.cache_key(employees, absences, quals, changed, year,
+                                                       month, ch_holidays))
+        self.assertNotEqual(key, solve_cache.cache_key(*self.ward, backend="highs"))
+        with mock.patch.dict(rules.PENALTIES, {"FACH_PENALTY": 1}):
+            self.assertNotEqual(key, solve_cache.cache_key(*self.ward))
+
+    def test_roundtrip_counters_and_eviction(self):
+        cache = solve_cache.SolveCache(self.path, max_entries=2)
+        schedule = {(1, 1): "B Dienst", (2, 3): rules.BUERO_SHIFT}
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", [schedule], [12.0], "optimal", "cbc", 1.5)
+        cached = cache.get("a")
+        self.assertEqual(cached.schedules, [schedule])
+        self.assertEqual(cached.objectives, [12.0])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.put("b", [schedule], [13.0])
+        cache.get("a")
+        cache.put("c", [schedule], [14.0])
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(solve_cache.SolveCache(self.path).get("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
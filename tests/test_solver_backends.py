@@ -0,0 +1,92 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import model_builder
+import solver_backends
+from benchmark import make_synthetic_ward
+from rules import penalty_weights
+
+OPTIONS = solver_backends.SolverOptions(time_limit=60)
+
+
+class TestSolverBackends(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = model_builder.build_model(*make_synthetic_ward(16, seed=4))
+        cls.reference = solver_backends.solve_cbc(cls.model, OPTIONS)
+
+    def test_reference_is_optimal(self):
+        self.assertEqual(self.reference.status, solver_backends.OPTIMAL)
+
+    def test_backends_agree_on_optimum(self):
+        for name in ("scip", "highs", "cp-sat"):
+            with self.subTest(backend=name):
+                result = solver_backends.BACKENDS[name](self.model, OPTIONS)
+                self.assertEqual(result.status, solver_backends.OPTIMAL)
+                self.assertAlmostEqual(result.objective, self.reference.objective, places=3)
+                self.assertEqual(len(result.col_value), self.model.num_cols)
+
+    def test_portfolio_returns_conclusive_result(self):
+        result = solver_backends.BACKENDS["portfolio"](self.model, OPTIONS)
+        self.assertEqual(result.status, solver_backends.OPTIMAL)
+        self.assertAlmostEqual(result.objective, self.reference.objective, places=3)
+        self.assertIn(result.backend, ("cbc", "highs", "cp-sat"))
+
+    def test_cp_sat_fractional_weights(self):
+        # Tuned weights need not be integers; CP-SAT scales them and reports the same optimum.
+        model = model_builder.build_model(*make_synthetic_ward(16, seed=4), penalties=(
+            penalty_weights({"LATE_SHIFT_COST": 1.5, "EARLY_SHIFT_COST": 0.25})))
+        reference = solver_backends.solve_highs(model, OPTIONS)
+        result = solver_backends.solve_cp_sat(model, OPTIONS)
+        self.assertEqual(result.status, solver_backends.OPTIMAL)
+        self.assertAlmostEqual(result.objective, reference.objective, places=3)
+        self.assertAlmostEqual(result.bound, reference.objective, places=3)
+
+    def test_cp_sat_solution_is_feasible(self):
+        result = solver_backends.solve_cp_sat(self.model, OPTIONS)
+        values = result.col_value
+        model = self.model
+        for row in range(model.num_rows):
+            cols = model.a_index[model.a_start[row]:model.a_start[row + 1]]
+            vals = model.a_value[model.a_start[row]:model.a_start[row + 1]]
+            activity = float(vals @ values[cols])
+            self.assertGreaterEqual(activity, model.row_lower[row] - 1e-6)
+            self.assertLessEqual(activity, model.row_upper[row] + 1e-6)
+
+    def test_solver_settings(self):
+        options = solver_backends.solver_options({"threads": 1, "node_limit": 1000},
+                                                 time_limit=60)
+        self.assertEqual((options.threads, options.node_limit, options.time_limit), (1, 1000, 60))
+        # Without a thread count each backend applies its own default.
+        self.assertIsNone(solver_backends.solver_options({}).threads)
+        with self.assertRaises(ValueError):
+            solver_backends.solver_options({"thread": 2})
+
+    def test_default_backend_takes_hints_and_streams(self):
+        self.assertLessEqual(set(solver_backends.HINT_BACKENDS), set(solver_backends.BACKENDS))
+        self.assertNotIn("cbc", solver_backends.HINT_BACKENDS)
+        self.assertIn(solver_backends.DEFAULT_BACKEND, solver_backends.HINT_BACKENDS)
+        self.assertIn(solver_backends.DEFAULT_BACKEND, solver_backends.STREAMING_BACKENDS)
+
+    def test_highs_changes_thread_count(self):
+        for threads in (1, 2, None):
+            with self.subTest(threads=threads):
+                options = solver_backends.SolverOptions(60, threads=threads, presolve=False)
+                result = solver_backends.solve_highs(self.model, options)
+                self.assertEqual(result.status, solver_backends.OPTIMAL)
+                self.assertAlmostEqual(result.objective, self.reference.objective, places=3)
+
+    def test_concurrent_highs_solves_with_other_thread_counts(self):
+        def solve(threads):
+            return solver_backends.solve_highs(
+                self.model, solver_backends.SolverOptions(60, threads=threads))
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(solve, (2, 1, 2)))
+        for result in results:
+            self.assertEqual(result.status, solver_backends.OPTIMAL)
+            self.assertAlmostEqual(result.objective, self.reference.objective, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+import model_builder
+import solver_backends
+import tuning
+from benchmark import make_synthetic_ward
+from rules import PENALTIES, penalty_weights
+
+
+class TestTuning(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.ward = make_synthetic_ward(20, seed=20)
+
+    def test_set_penalties_matches_rebuild(self):
+        weights = penalty_weights({"LATE_SHIFT_COST": 1, "CONSECUTIVE_SHIFT_PENALTY": 500})
+        model = model_builder.build_model(*self.ward)
+        changed = model_builder.set_penalties(model, weights)
+        rebuilt = model_builder.build_model(*self.ward, penalties=weights)
+        np.testing.assert_array_equal(changed.col_cost, rebuilt.col_cost)
+        self.assertIs(model.penalties, PENALTIES)
+        self.assertFalse(np.array_equal(model.col_cost, changed.col_cost))
+
+    def test_penalty_weights(self):
+        self.assertEqual(penalty_weights(), PENALTIES)
+        self.assertEqual(penalty_weights({"LATE_SHIFT_COST": 1})["LATE_SHIFT_COST"], 1)
+        with self.assertRaises(ValueError):
+            penalty_weights({"NO_SUCH_PENALTY": 1})
+        with self.assertRaises(ValueError):
+            penalty_weights({"LATE_SHIFT_COST": -1})
+
+    def test_weight_grid(self):
+        grid = tuning.weight_grid(LATE_SHIFT_COST=[1, 3], FACH_PENALTY=[5000])
+        self.assertEqual(grid, [{"LATE_SHIFT_COST": 1, "FACH_PENALTY": 5000},
+                                {"LATE_SHIFT_COST": 3, "FACH_PENALTY": 5000}])
+
+    def test_session_and_sweep(self):
+        with tuning.TuningSession(*self.ward, backend="highs") as session:
+            default = session.solve()
+            cheaper = session.solve({"LATE_SHIFT_COST": 1})
+        self.assertEqual(default.status, solver_backends.OPTIMAL)
+        self.assertAlmostEqual(default.objective, 1090.0, places=3)
+        self.assertAlmostEqual(cheaper.objective, 922.0, places=3)
+        self.assertAlmostEqual(sum(cheaper.breakdown.values()), cheaper.objective, places=3)
+
+        results = tuning.sweep_weights(*self.ward, tuning.weight_grid(LATE_SHIFT_COST=[1, 3]),
+                                       backend="highs", workers=2)
+        self.assertEqual([result.penalties for result in results],
+                         [{"LATE_SHIFT_COST": 1}, {"LATE_SHIFT_COST": 3}])
+        self.assertAlmostEqual(results[0].objective, 922.0, places=3)
+        self.assertAlmostEqual(results[1].objective, 1090.0, places=3)
+        self.assertTrue(all(result.has_solution for result in results))
+
+    def test_unstaffable_month_is_not_solved(self):
+        # Everyone but two employees is absent on the 10th, like for the other entry points.
+        employees, absences, quals, workload, year, month, ch_holidays = self.ward
+        absent = {e_id: list(records) for e_id, records in absences.items()}
+        for emp in employees[2:]:
+            absent.setdefault(emp["id"], []).append((f"10.{month:02d}.", "Fe"))
+        with tuning.TuningSession(employees, absent, quals, workload, year, month, ch_holidays,
+                                  backend="highs") as session:
+            result = session.solve()
+        self.assertEqual(result.status, solver_backends.INFEASIBLE)
+        self.assertFalse(result.has_solution)
+
+
+if __name__ == '__main__':
+    unittest.main()
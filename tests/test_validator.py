@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+import model_builder
+import solver_backends
+import validator
+from benchmark import make_synthetic_ward
+
+
+class TestValidator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.ward = make_synthetic_ward(16, seed=4)
+        cls.model = model_builder.build_model(*cls.ward)
+        cls.result = solver_backends.solve_highs(cls.model, solver_backends.SolverOptions(time_limit=60))
+        cls.schedule = model_builder.extract_schedule(cls.model, cls.result.col_value)
+        cls.validator = validator.ScheduleValidator(*cls.ward)
+
+    def test_agrees_with_solver(self):
+        evaluation = self.validator.evaluate(self.schedule)
+        self.assertTrue(evaluation.feasible, evaluation.hard_violations)
+        self.assertAlmostEqual(evaluation.objective, self.result.objective, places=3)
+        expected = model_builder.objective_breakdown(self.model, self.result.col_value)
+        for name, value in evaluation.breakdown.items():
+            self.assertAlmostEqual(value, expected[name], places=3, msg=name)
+
+    def test_matrix_and_dictionary_agree(self):
+        matrix = model_builder.assignment_matrix(self.model, self.result.col_value)
+        codes = self.validator.encode(matrix)
+        np.testing.assert_array_equal(codes, self.validator.encode(self.schedule))
+
+    def test_detects_hand_edits(self):
+        codes = self.validator.encode(self.schedule)
+        s_dienst = validator.CODES.index("S Dienst")
+        b_dienst = validator.CODES.index("B Dienst")
+        # An employee who may work S Dienst on day 1 and B Dienst on day 2.
+        e = next(e for e in range(codes.shape[0])
+                 if self.validator.allowed[e, 0, s_dienst] and self.validator.allowed[e, 1, b_dienst])
+        codes[e, 0], codes[e, 1] = s_dienst, b_dienst
+        # A shift on a day the employee is absent or not qualified for.
+        ne, nd = np.argwhere(~self.validator.allowed[:, :, b_dienst])[0]
+        codes[ne, nd] = b_dienst
+        rules = {(v.rule, v.employee_id) for v in self.validator.evaluate(codes).hard_violations}
+        self.assertIn(("transitions", self.validator.employee_ids[e]), rules)
+        self.assertIn(("domain", self.validator.employee_ids[ne]), rules)
+
+    def test_empty_schedule_misses_coverage(self):
+        evaluation = self.validator.evaluate({})
+        self.assertIn("coverage", {v.rule for v in evaluation.hard_violations})
+        self.assertGreater(evaluation.breakdown["WORKDAY_DEVIATION_PENALTY"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
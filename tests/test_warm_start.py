@@ -0,0 +1,54 @@
+import datetime
+import unittest
+
+import numpy as np
+
+import model_builder
+import solver_backends
+import warm_start
+from benchmark import make_synthetic_ward
+
+
+class TestWarmStart(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = model_builder.build_model(*make_synthetic_ward(16, seed=4))
+        cls.reference = solver_backends.solve_cbc(cls.model, solver_backends.SolverOptions(time_limit=60))
+        cls.schedule = model_builder.extract_schedule(cls.model, cls.reference.col_value)
+
+    def test_hint_reproduces_assignments(self):
+        hint = warm_start.hint_from_schedule(self.model, self.schedule)
+        assignment_cols = np.concatenate([self.model.x_index[self.model.x_index >= 0],
+                                          self.model.y_index[self.model.y_index >= 0]])
+        np.testing.assert_array_equal(hint[assignment_cols],
+                                      np.round(self.reference.col_value[assignment_cols]))
+        self.assertEqual(np.count_nonzero(~np.isnan(hint)), len(assignment_cols))
+
+    def test_partial_hint_covers_only_given_days(self):
+        hint = warm_start.hint_from_schedule(self.model, self.schedule, days=[1, 2])
+        self.assertFalse(np.isnan(hint[self.model.x_index[:, :2][self.model.x_index[:, :2] >= 0]]).any())
+        self.assertTrue(np.isnan(hint[self.model.x_index[:, 2:][self.model.x_index[:, 2:] >= 0]]).all())
+
+    def test_hinted_backends_reach_optimum(self):
+        options = solver_backends.SolverOptions(
+            time_limit=60, hint=warm_start.hint_from_schedule(self.model, self.schedule))
+        for name in ("highs", "cp-sat"):
+            with self.subTest(backend=name):
+                result = solver_backends.BACKENDS[name](self.model, options)
+                self.assertEqual(result.status, solver_backends.OPTIMAL)
+                self.assertAlmostEqual(result.objective, self.reference.objective, places=3)
+
+    def test_seed_from_previous_month_keeps_weekdays(self):
+        # January 2025 ends on a Friday; February 1st is a Saturday.
+        previous = {(1, day): f"shift {day}" for day in range(1, 32)}
+        seeded, days = warm_start.seed_from_previous_month(previous, 2025, 2)
+        self.assertEqual(days, list(range(1, 8)))
+        for day in days:
+            source = int(seeded[(1, day)].split()[1])
+            self.assertGreaterEqual(source, 25)
+            self.assertEqual(datetime.date(2025, 1, source).weekday(),
+                             datetime.date(2025, 2, day).weekday())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+# tuning.py
+"""
+Penalty tuning: re-solve a month with other objective weights without rebuilding the model.
+
+The weights only enter the objective coefficients of the penalized columns, so the model is
+built once and every change of weights just resets them (model_builder.set_penalties):
+
+  - TuningSession keeps the model of one month alive in a worker process. Each solve() with new
+    weights starts warm from the last solution of the session.
+  - sweep_weights solves a grid of weight vectors (see weight_grid) in parallel. Every worker
+    process builds the model once and starts each solve from its last solution.
+
+Both return TuningResult with the objective breakdown of each schedule, so the trade-offs of
+the weights can be compared.
+"""
+import itertools
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import heuristic
+import model_builder
+import scheduler
+import solver_backends
+import warm_start
+from rules import penalty_weights
+
+TIME_LIMIT = 60
+
+# Model, backend and last solution of a worker process (see _init_worker).
+_worker = {}
+
+
+class TuningResult:
+    """
+    Outcome of one solve with a weight vector.
+
+    Attributes:
+        penalties: The overrides of the weights that were solved {penalty name: weight}.
+        status: Solver status (see solver_backends).
+        objective: Objective value with these weights.
+        breakdown: Objective contribution per penalty (see model_builder.objective_breakdown).
+        schedule: Dictionary {(employee_id, day): shift_code}, or None without a solution.
+        wall_time: Solve time in seconds.
+    """
+
+    def __init__(self, penalties, status, objective=None, breakdown=None, schedule=None,
+                 wall_time=0.0):
+        self.penalties = penalties
+        self.status = status
+        self.objective = objective
+        self.breakdown = breakdown
+        self.schedule = schedule
+        self.wall_time = wall_time
+
+    @property
+    def has_solution(self):
+        return self.schedule is not None
+
+
+def weight_grid(**values):
+    """
+    All combinations of the given weights.
+
+    Example: weight_grid(CONSECUTIVE_SHIFT_PENALTY=[500, 1000], LATE_SHIFT_COST=[1, 3]) gives
+    four dictionaries {penalty name: weight}.
+    """
+    names = list(values)
+    return [dict(zip(names, combination))
+            for combination in itertools.product(*(values[name] for name in names))]
+
+
+def _init_worker(data, year, month, ch_holidays, backend, solver_settings, use_warm_start):
+    """
+    Builds the model of a worker process once, after the same capacity check as the other
+    entry points (None if the month cannot be staffed); a heuristic schedule is its first hint
+    for the backends that use hints.
+    """
+    model = scheduler._month_model(*data, year, month, ch_holidays)
+    hint = None
+    if model is not None and use_warm_start and backend in solver_backends.HINT_BACKENDS:
+        hint = warm_start.hint_from_schedule(
+            model, heuristic.heuristic_schedule(*data, year, month, ch_holidays).schedule)
+    _worker.update(model=model, backend=backend, solver_settings=solver_settings, hint=hint)
+
+
+def _solve_weights(args):
+    """Solves the worker's model with other weights, warm from its last solution."""
+    penalties, time_limit = args
+    if _worker["model"] is None:
+        return TuningResult(penalties, solver_backends.INFEASIBLE)
+    model = model_builder.set_penalties(_worker["model"], penalty_weights(penalties))
+    result = solver_backends.BACKENDS[_worker["backend"]](model, solver_backends.solver_options(
+        _worker["solver_settings"], time_limit=time_limit, hint=_worker["hint"]))
+    if not result.has_solution:
+        return TuningResult(penalties, result.status, wall_time=result.wall_time)
+    _worker["hint"] = result.col_value
+    return TuningResult(penalties, result.status, result.objective,
+                        model_builder.objective_breakdown(model, result.col_value),
+                        model_builder.extract_schedule(model, result.col_value),
+                        result.wall_time)
+
+
+def _pool(workers, data, year, month, ch_holidays, backend, solver_settings, use_warm_start):
+    # "spawn" keeps the workers independent of the (threaded) Streamlit process.
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(data, year, month, sorted(ch_holidays), backend or solver_backends.DEFAULT_BACKEND,
+                  solver_settings, use_warm_start))
+
+
+class TuningSession:
+    """
+    The model of one month, kept in a worker process for solves with changing weights.
+
+    Use as a context manager or call close() to end the worker.
+    """
+
+    def __init__(self, employees, absences, employee_qualifications, employee_workload, year,
+                 month, ch_holidays, backend=None, solver_settings=None, use_warm_start=True):
+        """
+        Args:
+            employees, absences, employee_qualifications, employee_workload, year, month,
+                ch_holidays: The month to plan, as for scheduler.generate_schedule_highs.
+            backend: Name of the solver backend (default: solver_backends.DEFAULT_BACKEND).
+            solver_settings: Solver settings {setting: value} (see
+                solver_backends.solver_options).
+            use_warm_start: Start the first solve from a heuristic schedule (see heuristic.py),
+                if the backend uses hints (solver_backends.HINT_BACKENDS).
+        """
+        data = (employees, absences, employee_qualifications, employee_workload)
+        self.pool = _pool(1, data, year, month, ch_holidays, backend, solver_settings,
+                          use_warm_start)
+
+    def solve(self, penalties=None, time_limit=TIME_LIMIT):
+        """
+        Solves the month with changed weights.
+
+        Args:
+            penalties: Dictionary {penalty name: weight} of the weights that differ from
+                rules.PENALTIES.
+            time_limit: Time limit of the solve in seconds.
+
+        Returns:
+            A TuningResult, with status solver_backends.INFEASIBLE if the month cannot be
+            staffed (see capacity.py).
+        """
+        penalty_weights(penalties)  # Fails here rather than in the worker.
+        return self.pool.submit(_solve_weights, (penalties or {}, time_limit)).result()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def sweep_weights(employees, absences, employee_qualifications, employee_workload, year, month,
+                  ch_holidays, grid, backend=None, time_limit=TIME_LIMIT, workers=None,
+                  use_warm_start=True, solver_settings=None):
+    """
+    Solves the month for every weight vector of a grid in parallel.
+
+    Args:
+        employees, absences, employee_qualifications, employee_workload, year, month,
+            ch_holidays: The month to plan, as for scheduler.generate_schedule_highs.
+        grid: List of dictionaries {penalty name: weight} (see weight_grid).
+        backend: Name of the solver backend (default: solver_backends.DEFAULT_BACKEND).
+        time_limit: Time limit per solve in seconds.
+        workers: Worker processes, each with its own copy of the model (default: one per core,
+            at most one per weight vector).
+        use_warm_start: Start the first solve of each worker from a heuristic schedule, if the
+            backend uses hints (solver_backends.HINT_BACKENDS).
+        solver_settings: Solver settings {setting: value} (see solver_backends.solver_options).
+            Without threads the cores are shared evenly by the workers.
+
+    Returns:
+        List of TuningResult in the order of grid.
+    """
+    for penalties in grid:
+        penalty_weights(penalties)
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, len(grid)))
+    data = (employees, absences, employee_qualifications, employee_workload)
+    start = time.time()
+    solver_settings = {"threads": max(1, cores // workers), **(solver_settings or {})}
+    with _pool(workers, data, year, month, ch_holidays, backend, solver_settings,
+               use_warm_start) as pool:
+        results = list(pool.map(_solve_weights, [(penalties, time_limit) for penalties in grid]))
+    for result in results:
+        objective = f"{result.objective:.0f}" if result.objective is not None else "-"
+        logging.info(f"Weights {result.penalties}: {result.status}, objective {objective}, "
+                     f"{result.wall_time:.1f} s")
+    logging.info(f"Weight sweep of {len(grid)} vectors with {workers} workers: "
+                 f"{time.time() - start:.1f} s")
+    return results
@@ -0,0 +1,283 @@
+# validator.py
+"""
+Solver-independent validation and scoring of a month schedule.
+
+The schedule is an employee × day matrix of shift codes, encoded as integers: 0..S-1 for
+SHIFT_CODES, S for the Bü Dienst and OFF (-1) for a day off. Every rule of the MIP
+(model_builder.build_model) is checked with array operations on that matrix, so a hand-edited
+schedule can be re-checked on every edit in a few milliseconds.
+
+Hard rules of the MIP are reported as violations of kind "hard" under the name of their
+constraint family; soft rules are reported as kind "soft" under the name of their penalty
+(rules.PENALTY_NAMES). The objective is the same penalty-weighted sum the MIP minimizes, so for
+a solver result validator and solver agree on the objective and its breakdown
+(model_builder.objective_breakdown).
+"""
+import calendar
+import datetime
+
+import numpy as np
+
+import model_builder
+from absence_index import AbsenceIndex, absence_mask, WORKDAY_CREDIT_TYPES
+from rules import (
+    PENALTIES, PENALTY_NAMES, REQUIRED_SHIFTS, SHIFT_CODES, SHIFT_COST_NAMES, BUERO_SHIFT,
+    EARLY_SHIFTS, LATE_SHIFTS, PURE_LATE_SHIFTS, SPLIT_SHIFTS, NO_EARLY_AFTER, ONLY_C_AFTER,
+    FACH_QUALIFICATIONS, MIN_EARLY_TOTAL_WEEKDAY, MIN_EARLY_TOTAL_WEEKEND, MIN_EARLY_FACH,
+    MIN_LATE_TOTAL, MIN_LATE_HF, MIN_B_DIENST, MAX_SPLIT_SHIFTS, MAX_CONSECUTIVE_DAYS,
+    MIN_REST_AFTER_MAX, MAX_WEEKENDS, MAX_WEEKENDS_AUSB2, BURO_DAYS_PER_MONTH,
+)
+
+OFF = -1
+CODES = SHIFT_CODES + (BUERO_SHIFT,)
+BUERO = len(SHIFT_CODES)
+HARD = "hard"
+SOFT = "soft"
+
+
+class Violation:
+    """
+    One broken rule.
+
+    Args:
+        rule: Constraint family for hard rules, penalty name for soft rules.
+        kind: HARD or SOFT.
+        employee_id: Affected employee, or None for rules about a whole day.
+        day: Affected day of the month (1-based), or None for rules about the whole month.
+        amount: Size of the violation (e.g. missing employees); soft rules cost
+            amount * PENALTIES[rule].
+        detail: Human-readable description.
+    """
+
+    def __init__(self, rule, kind, employee_id, day, amount, detail):
+        self.rule = rule
+        self.kind = kind
+        self.employee_id = employee_id
+        self.day = day
+        self.amount = amount
+        self.detail = detail
+
+    def __repr__(self):
+        return f"Violation({self.rule}, {self.kind}, employee {self.employee_id}, day {self.day}: {self.detail})"
+
+
+class Evaluation:
+    """Violations of a schedule with its objective value and objective per penalty name."""
+
+    def __init__(self, violations, objective, breakdown):
+        self.violations = violations
+        self.objective = objective
+        self.breakdown = breakdown
+
+    @property
+    def hard_violations(self):
+        return [v for v in self.violations if v.kind == HARD]
+
+    @property
+    def feasible(self):
+        return not self.hard_violations
+
+
+def _code_mask(codes):
+    """Boolean mask over CODES."""
+    return np.array([code in codes for code in CODES])
+
+
+class ScheduleValidator:
+    """
+    Checks schedules of one month against the rules.
+
+    The month data (domains, absences, weekends, targets) is prepared once; evaluate() then
+    only works on the shift-code matrix.
+
+    Args:
+        employees, absences, employee_qualifications, employee_workload, year, month,
+        ch_holidays: As for scheduler.generate_schedule_highs.
+    """
+
+    def __init__(self, employees, absences, employee_qualifications, employee_workload, year,
+                 month, ch_holidays):
+        num_days = calendar.monthrange(year, month)[1]
+        self.dates = [datetime.date(year, month, d) for d in range(1, num_days + 1)]
+        self.employee_ids = [emp["id"] for emp in employees]
+        self.row_of = {e_id: e for e, e_id in enumerate(self.employee_ids)}
+        quals = np.array([employee_qualifications.get(e_id) for e_id in self.employee_ids],
+                         dtype=object)
+
+        absence_masks = AbsenceIndex(absences, self.dates).matrix(self.employee_ids)
+        credited = ((absence_masks & absence_mask(*WORKDAY_CREDIT_TYPES)) != 0).sum(axis=1)
+        allowed, buero_allowed = model_builder.shift_domain_mask(list(quals), self.dates,
+                                                                 absence_masks)
+        self.allowed = np.concatenate([allowed, buero_allowed[:, :, None]], axis=2)
+
+        self.is_fach = np.isin(quals, list(FACH_QUALIFICATIONS))
+        self.is_hf = quals == "HF"
+        self.is_leitung = quals == "Leitung"
+        self.is_ausb2 = quals == "Ausbildung 2"
+        is_weekend = np.array([day.weekday() >= 5 for day in self.dates], dtype=bool)
+        self.sunday_or_holiday = np.array(
+            [day.weekday() == 6 or day in ch_holidays for day in self.dates], dtype=bool)
+        self.weekend_groups = model_builder.weekend_groups(self.dates)
+        self.weekend_limit = np.where(self.is_ausb2, MAX_WEEKENDS_AUSB2, MAX_WEEKENDS)
+
+        target = np.array([employee_workload.get(e_id) or 0 for e_id in self.employee_ids],
+                          dtype=np.float64)
+        self.remaining = target - credited
+
+        everyone = np.ones(len(quals), dtype=bool)
+        min_early = np.where(is_weekend, MIN_EARLY_TOTAL_WEEKEND, MIN_EARLY_TOTAL_WEEKDAY)
+        self.group_rules = (
+            # (shift mask, employees, requirement per day, sense, penalty name)
+            (_code_mask(EARLY_SHIFTS), everyone, min_early, 1, "EARLY_COVERAGE_PENALTY"),
+            (_code_mask(EARLY_SHIFTS), self.is_fach, MIN_EARLY_FACH, 1, "EARLY_FACH_PENALTY"),
+            (_code_mask(LATE_SHIFTS), everyone, MIN_LATE_TOTAL, 1, "LATE_COVERAGE_PENALTY"),
+            (_code_mask(LATE_SHIFTS), self.is_hf, MIN_LATE_HF, 1, "LATE_HF_PENALTY"),
+            (_code_mask(PURE_LATE_SHIFTS), self.is_fach, 1, -1, "EXTRA_FACH_LATE_PENALTY"),
+            (_code_mask({"B Dienst"}), everyone, MIN_B_DIENST, 1, "B_DIENST_PENALTY"),
+        )
+        # Cost of a regular assignment by code; the Bü Dienst has none.
+        self.code_cost_name = [SHIFT_COST_NAMES[code] for code in SHIFT_CODES] + [None]
+
+    # ------------------------------------------
+    # Encoding
+    # ------------------------------------------
+    def encode(self, schedule):
+        """
+        Converts a schedule {(employee_id, day): shift_code} or an object matrix of shift codes
+        (e.g. scheduler.ScheduleSolution.assignments, None for a day off) into the code matrix.
+        Entries that are not shifts (e.g. absence codes) count as days off.
+        """
+        index = {code: c for c, code in enumerate(CODES)}
+        if isinstance(schedule, np.ndarray):
+            lookup = np.vectorize(lambda code: index.get(code, OFF), otypes=[np.int64])
+            return lookup(schedule) if schedule.size else np.full(schedule.shape, OFF)
+        codes = np.full((len(self.employee_ids), len(self.dates)), OFF, dtype=np.int64)
+        for (e_id, day), shift_code in schedule.items():
+            e = self.row_of.get(e_id)
+            if e is not None and 1 <= int(day) <= len(self.dates):
+                codes[e, int(day) - 1] = index.get(shift_code, OFF)
+        return codes
+
+    # ------------------------------------------
+    # Evaluation
+    # ------------------------------------------
+    def evaluate(self, schedule):
+        """
+        Checks all rules and scores the schedule.
+
+        Args:
+            schedule: Code matrix (employees × days, see encode), a schedule dictionary or an
+                object matrix of shift codes.
+
+        Returns:
+            An Evaluation.
+        """
+        codes = schedule if isinstance(schedule, np.ndarray) and schedule.dtype.kind == "i" \
+            else self.encode(schedule)
+        onehot = codes[:, :, None] == np.arange(len(CODES))
+        shifts = onehot[:, :, :BUERO]
+        worked = shifts.any(axis=2)
+        violations = []
+        amounts = dict.fromkeys(PENALTY_NAMES, 0.0)
+
+        def report(rule, kind, e, d, amount, detail):
+            employee_id = None if e is None else self.employee_ids[e]
+            violations.append(Violation(rule, kind, employee_id, None if d is None else d + 1,
+                                        amount, detail))
+            if kind == SOFT:
+                amounts[rule] += amount
+
+        # Shifts the employee may not work (qualification, weekday-only, absence).
+        for e, d, c in zip(*np.nonzero(onehot & ~self.allowed)):
+            report("domain", HARD, e, d, 1, f"{CODES[c]} not allowed")
+
+        # Leitung: exactly BURO_DAYS_PER_MONTH Büro days.
+        buero_days = onehot[:, :, BUERO].sum(axis=1)
+        for e in np.flatnonzero(self.is_leitung & (buero_days != BURO_DAYS_PER_MONTH)):
+            report("leitung", HARD, e, None, abs(int(buero_days[e]) - BURO_DAYS_PER_MONTH),
+                   f"{buero_days[e]} Büro days instead of {BURO_DAYS_PER_MONTH}")
+
+        # Coverage per day and shift: hard total, soft fach/non-fach minimums.
+        for s, (shift_code, req) in enumerate(REQUIRED_SHIFTS.items()):
+            if req.get("optional", False):
+                continue
+            count = shifts[:, :, s].sum(axis=0)
+            for d in np.flatnonzero(count < req["total"]):
+                report("coverage", HARD, None, d, int(req["total"] - count[d]),
+                       f"{shift_code}: {count[d]} of {req['total']}")
+            for key, emp_sel, penalty in (("fach", self.is_fach, "FACH_PENALTY"),
+                                          ("nonfach", ~self.is_fach, "NONFACH_PENALTY")):
+                if key not in req:
+                    continue
+                count = shifts[emp_sel, :, s].sum(axis=0)
+                for d in np.flatnonzero(count < req[key]):
+                    report(penalty, SOFT, None, d, int(req[key] - count[d]),
+                           f"{shift_code}: {count[d]} {key} of {req[key]}")
+
+        # Group-level early and late coverage.
+        for code_mask, emp_sel, required, sense, penalty in self.group_rules:
+            count = (onehot[emp_sel] & code_mask).any(axis=2).sum(axis=0)
+            excess = sense * (np.broadcast_to(required, count.shape) - count)
+            for d in np.flatnonzero(excess > 0):
+                report(penalty, SOFT, None, d, int(excess[d]), f"{count[d]} assigned")
+
+        # Late-to-early transitions: only VS->C and C4->C are allowed.
+        early = _code_mask(EARLY_SHIFTS)
+        early_not_c = _code_mask(EARLY_SHIFTS - {"C Dienst"})
+        today, tomorrow = onehot[:, :-1], onehot[:, 1:]
+        forbidden = ((today & _code_mask(NO_EARLY_AFTER)).any(axis=2)
+                     & (tomorrow & early).any(axis=2))
+        forbidden |= ((today & _code_mask(ONLY_C_AFTER)).any(axis=2)
+                      & (tomorrow & early_not_c).any(axis=2))
+        for e, d in zip(*np.nonzero(forbidden)):
+            report("transitions", HARD, e, d + 1, 1,
+                   f"{CODES[codes[e, d]]} followed by {CODES[codes[e, d + 1]]}")
+
+        # Weekends: at most MAX_WEEKENDS (MAX_WEEKENDS_AUSB2) worked weekends.
+        if self.weekend_groups:
+            worked_weekends = np.stack([worked[:, g].any(axis=1) for g in self.weekend_groups],
+                                       axis=1).sum(axis=1)
+            for e in np.flatnonzero(worked_weekends > self.weekend_limit):
+                report("weekends", HARD, e, None, int(worked_weekends[e] - self.weekend_limit[e]),
+                       f"{worked_weekends[e]} weekends worked, limit {self.weekend_limit[e]}")
+
+        # Ausbildung 2: at most one Sunday or holiday.
+        sundays = (worked & self.sunday_or_holiday).sum(axis=1)
+        for e in np.flatnonzero(self.is_ausb2 & (sundays > 1)):
+            report("lehrlinge", HARD, e, None, int(sundays[e] - 1),
+                   f"{sundays[e]} Sundays/holidays worked")
+
+        # At most MAX_SPLIT_SHIFTS split shifts per day.
+        split_count = (onehot & _code_mask(SPLIT_SHIFTS)).any(axis=2).sum(axis=0)
+        for d in np.flatnonzero(split_count > MAX_SPLIT_SHIFTS):
+            report("split_shifts", HARD, None, d, int(split_count[d] - MAX_SPLIT_SHIFTS),
+                   f"{split_count[d]} split shifts")
+
+        # A block of MAX_CONSECUTIVE_DAYS worked days followed by a worked rest day.
+        block, num_days = MAX_CONSECUTIVE_DAYS, worked.shape[1]
+        if num_days >= block:
+            blocks = np.lib.stride_tricks.sliding_window_view(worked, block, axis=1).all(axis=2)
+            rest_worked = np.zeros_like(blocks)
+            for rest in range(block, block + MIN_REST_AFTER_MAX):
+                rest_worked[:, :num_days - rest] |= worked[:, rest:]
+            for e, d in zip(*np.nonzero(blocks & rest_worked)):
+                report("CONSECUTIVE_SHIFT_PENALTY", SOFT, e, d, 1,
+                       f"{block} days from day {d + 1} followed by a worked rest day")
+
+        # Workload: shifts + Bü + credited absences against the target.
+        deviation = (codes != OFF).sum(axis=1) - self.remaining
+        for e in np.flatnonzero(deviation < 0):
+            report("WORKDAY_DEVIATION_PENALTY", SOFT, e, None, float(-deviation[e]),
+                   f"{-deviation[e]:.0f} days under target")
+        for e in np.flatnonzero(deviation > 0):
+            report("EXCESSIVE_WORKDAY_PENALTY", SOFT, e, None, float(deviation[e]),
+                   f"{deviation[e]:.0f} days over target")
+
+        # Regular assignment costs.
+        per_code = onehot.sum(axis=(0, 1))
+        for c, name in enumerate(self.code_cost_name):
+            if name is not None:
+                amounts[name] += float(per_code[c])
+
+        breakdown = {name: amounts[name] * PENALTIES[name] for name in PENALTY_NAMES}
+        return Evaluation(violations, float(sum(breakdown.values())), breakdown)
@@ -0,0 +1,100 @@
+# warm_start.py
+"""
+Solution hints for warm-starting the solvers.
+
+A schedule is a dictionary {(employee_id, day): shift_code} as used by app.py. Hints are turned
+into a column vector for a MatrixModel; entries that are not hinted are NaN and left to the
+solver to complete.
+"""
+import calendar
+import datetime
+import numpy as np
+
+from rules import BUERO_SHIFT
+
+# Number of days at the start of a month that are seeded from the previous month.
+SEED_DAYS = 7
+
+
+def hint_from_schedule(model, schedule, days=None):
+    """
+    Converts a schedule into a hint vector for the model.
+
+    Args:
+        model: The MatrixModel.
+        schedule: Dictionary {(employee_id, day): shift_code}.
+        days: Day numbers (1-based) the schedule covers; assignment columns on these days that
+            are not in the schedule are hinted as 0. Defaults to all days of the month.
+
+    Returns:
+        Array of length model.num_cols with 0/1 for hinted columns and NaN elsewhere.
+    """
+    hint = np.full(model.num_cols, np.nan)
+    num_days = model.num_month_days
+    first = model.day_offset
+    covered = np.zeros(len(model.dates), dtype=bool)
+    if days is None:
+        covered[first:first + num_days] = True
+    else:
+        covered[[first + d - 1 for d in days if 1 <= d <= num_days]] = True
+
+    x_cols = model.x_index[:, covered, :]
+    hint[x_cols[x_cols >= 0]] = 0.0
+    y_cols = model.y_index[:, covered]
+    hint[y_cols[y_cols >= 0]] = 0.0
+
+    row_of = {e_id: e for e, e_id in enumerate(model.employee_ids)}
+    for (e_id, day), shift_code in schedule.items():
+        e = row_of.get(e_id)
+        if e is None or not 1 <= int(day) <= num_days or not covered[first + int(day) - 1]:
+            continue
+        d = first + int(day) - 1
+        if shift_code == BUERO_SHIFT:
+            col = model.y_index[e, d]
+        elif shift_code in model.shift_codes:
+            col = model.x_index[e, d, model.shift_codes.index(shift_code)]
+        else:
+            continue
+        # Assignments that are no longer possible (e.g. a new absence) are dropped.
+        if col >= 0:
+            hint[col] = 1.0
+    return hint
+
+
+def previous_month(year, month):
+    return (year - 1, 12) if month == 1 else (year, month - 1)
+
+
+def seed_from_previous_month(previous_schedule, year, month, days=SEED_DAYS):
+    """
+    Seeds the first days of a month from the tail of the previous month's schedule.
+
+    Every day among the first `days` days of the new month repeats the assignment of the same
+    weekday in the last week of the previous month, which continues the weekly rhythm across
+    the month boundary.
+
+    Args:
+        previous_schedule: Schedule {(employee_id, day): shift_code} of the previous month.
+        year: Year of the new month.
+        month: The new month.
+        days: Number of days to seed.
+
+    Returns:
+        Tuple (schedule, seeded_days) with the seeded assignments and the seeded day numbers.
+    """
+    prev_year, prev_month = previous_month(year, month)
+    prev_days = calendar.monthrange(prev_year, prev_month)[1]
+    num_days = calendar.monthrange(year, month)[1]
+    last_week = {
+        datetime.date(prev_year, prev_month, d).weekday(): d
+        for d in range(max(1, prev_days - 6), prev_days + 1)
+    }
+    seeded_days = list(range(1, min(days, num_days) + 1))
+    source_day = {d: last_week[datetime.date(year, month, d).weekday()] for d in seeded_days}
+
+    schedule = {}
+    for (e_id, day), shift_code in previous_schedule.items():
+        for d, source in source_day.items():
+            if int(day) == source:
+                schedule[(e_id, d)] = shift_code
+    return schedule, seeded_days